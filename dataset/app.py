@@ -36,9 +36,28 @@ MENU_TEMPLATES = {
 
 ADDRESSES = ["逢甲路", "文華路", "福星路", "西安街", "河南路二段"]
 
+# 離線地理編碼：各路段起點與終點座標（約略沿路線走向），門牌 1~300 號線性內插
+ROAD_SEGMENTS = {
+    "逢甲路": ((24.1745, 120.6472), (24.1832, 120.6458)),
+    "文華路": ((24.1816, 120.6430), (24.1799, 120.6508)),
+    "福星路": ((24.1845, 120.6497), (24.1738, 120.6503)),
+    "西安街": ((24.1803, 120.6408), (24.1742, 120.6427)),
+    "河南路二段": ((24.1758, 120.6562), (24.1852, 120.6531)),
+}
+MAX_HOUSE_NUMBER = 300
+
 # ==========================================
 # 2. 生成邏輯
 # ==========================================
+def geocode_address(address):
+    """依路名與門牌號碼推估經緯度，無法辨識時返回 (None, None)"""
+    for road, ((lat1, lng1), (lat2, lng2)) in ROAD_SEGMENTS.items():
+        if road in address:
+            number = int(address.split(road)[1].rstrip("號") or 1)
+            ratio = (min(number, MAX_HOUSE_NUMBER) - 1) / (MAX_HOUSE_NUMBER - 1)
+            return round(lat1 + (lat2 - lat1) * ratio, 6), round(lng1 + (lng2 - lng1) * ratio, 6)
+    return None, None
+
 def generate_mock_data(total_restaurants=30):
     restaurants = []
     menu_items = []
@@ -56,13 +75,17 @@ def generate_mock_data(total_restaurants=30):
             veg_opt = "葷食"
             
         # 餐廳物件（不包含 restaurantID，由資料庫自動產生）
+        address = f"台中市西屯區{random.choice(ADDRESSES)}{random.randint(1, MAX_HOUSE_NUMBER)}號"
+        latitude, longitude = geocode_address(address)
         restaurants.append({
             "name": r_name,
-            "address": f"台中市西屯區{random.choice(ADDRESSES)}{random.randint(1, 300)}號",
+            "address": address,
             "averageRating": round(random.uniform(3.5, 4.9), 1),
             "priceRange": 3 if f_type in ["日式", "義式"] else (2 if f_type in ["韓式", "健康餐"] else 1),
             "foodType": f_type,
-            "vegetarianOption": veg_opt
+            "vegetarianOption": veg_opt,
+            "latitude": latitude,
+            "longitude": longitude
         })
         
         # 菜單物件
@@ -102,7 +125,7 @@ if __name__ == "__main__":
     r_data, m_data = generate_mock_data(30)
     
     # 定義欄位順序（不包含自動產生的 ID 欄位）
-    r_cols = ["name", "address", "averageRating", "priceRange", "foodType", "vegetarianOption"]
+    r_cols = ["name", "address", "averageRating", "priceRange", "foodType", "vegetarianOption", "latitude", "longitude"]
     m_cols = ["restaurantID", "name", "description", "price", "calories", "protein", "carbs", "fat"]
     
     save_to_csv("restaurants.csv", r_data, r_cols)
@@ -34,6 +34,14 @@ echo "================================================"
 
 clear
 
+echo "Compiling dataset..."
+python3 src/scripts/compile_dataset.py
+echo "================================================"
+echo "Done"
+echo "================================================"
+
+clear
+
 echo "================================================"
 echo "All done!"
 echo "================================================"
\ No newline at end of file
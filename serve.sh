@@ -0,0 +1,19 @@
+#!/bin/bash
+
+set -e
+
+clear
+
+echo "Activating virtual environment..."
+source venv/bin/activate
+echo "================================================"
+echo "Done"
+echo "================================================"
+
+clear
+
+echo "Running application (gunicorn)..."
+gunicorn -c src/gunicorn.conf.py
+echo "================================================"
+echo "Done"
+echo "================================================"
@@ -19,9 +19,15 @@ CREATE TABLE IF NOT EXISTS restaurants (
     name             VARCHAR(100) NOT NULL,
     address          VARCHAR(255),
     averageRating    FLOAT DEFAULT 0,
+    ratingSum        INT NOT NULL DEFAULT 0,    -- 評論評分總和（新增評論時累加）
+    reviewCount      INT NOT NULL DEFAULT 0,    -- 評論數
+    priorRating      FLOAT NOT NULL DEFAULT 0,  -- 匯入的評分（先驗）
+    priorWeight      INT NOT NULL DEFAULT 0,    -- 先驗相當於幾則評論，averageRating = (priorRating * priorWeight + ratingSum) / (priorWeight + reviewCount)
     priceRange       TINYINT,           -- 1 平價, 2 中等, 3 高檔
     foodType         VARCHAR(50),       -- 日式、義式...
-    vegetarianOption ENUM('全素', '蛋奶素', '葷食')
+    vegetarianOption ENUM('全素', '蛋奶素', '葷食'),
+    latitude         DOUBLE,            -- 緯度（由 dataset/restaurants.csv 匯入）
+    longitude        DOUBLE             -- 經度
 ) ENGINE=InnoDB;
 
 -- 建立餐點資料表
@@ -76,7 +82,43 @@ CREATE TABLE IF NOT EXISTS reviews (
         ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+-- 建立菜單目錄版本資料表與觸發程序（目錄資料改變時加一，見 007_catalog_version.sql）
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    name     VARCHAR(50) PRIMARY KEY,
+    version  BIGINT NOT NULL DEFAULT 1
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO catalog_versions (name, version) VALUES ('menu_catalog', 1);
+
+-- 觸發程序以任何方式寫入都會生效（包含匯入腳本與手動修改）；
+-- 刪除餐廳時 ON DELETE CASCADE 刪除的菜單不會觸發 menu_items 的觸發程序，由餐廳的觸發程序計入
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_insert AFTER INSERT ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
+
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_update AFTER UPDATE ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1
+    WHERE name = 'menu_catalog'
+      AND NOT (OLD.itemID <=> NEW.itemID AND OLD.restaurantID <=> NEW.restaurantID
+               AND OLD.name <=> NEW.name AND OLD.price <=> NEW.price
+               AND OLD.calories <=> NEW.calories AND OLD.protein <=> NEW.protein
+               AND OLD.carbs <=> NEW.carbs AND OLD.fat <=> NEW.fat);
+
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_delete AFTER DELETE ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
+
+-- 餐廳只有目錄用到的欄位改變時才計入（新增評論更新評分不會使快照失效）
+CREATE TRIGGER IF NOT EXISTS trg_restaurants_catalog_update AFTER UPDATE ON restaurants FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1
+    WHERE name = 'menu_catalog'
+      AND NOT (OLD.restaurantID <=> NEW.restaurantID AND OLD.name <=> NEW.name
+               AND OLD.foodType <=> NEW.foodType AND OLD.vegetarianOption <=> NEW.vegetarianOption);
+
+CREATE TRIGGER IF NOT EXISTS trg_restaurants_catalog_delete AFTER DELETE ON restaurants FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
+
 -- 建議索引
 CREATE INDEX idx_menu_restaurant    ON menu_items(restaurantID);
 CREATE INDEX idx_diet_user_time     ON diet_logs(userID, timestamp);
-CREATE INDEX idx_review_restaurant  ON reviews(restaurantID);
+CREATE INDEX idx_review_restaurant_time ON reviews(restaurantID, timestamp);
+CREATE INDEX idx_restaurant_rating  ON restaurants(averageRating);
+CREATE INDEX idx_restaurant_location ON restaurants(latitude, longitude);
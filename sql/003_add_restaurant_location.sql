@@ -0,0 +1,6 @@
+USE data;
+
+-- 為既有的 restaurants 資料表加入經緯度欄位（新建資料庫已包含於 001_create_tables.sql）
+ALTER TABLE restaurants
+    ADD COLUMN IF NOT EXISTS latitude  DOUBLE,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE;
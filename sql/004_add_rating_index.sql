@@ -0,0 +1,4 @@
+USE data;
+
+-- 搜尋預設依評分排序並以 LIMIT 取前 K 筆，此索引讓資料庫可沿索引順序提早結束
+CREATE INDEX IF NOT EXISTS idx_restaurant_rating ON restaurants(averageRating);
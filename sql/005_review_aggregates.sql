@@ -0,0 +1,38 @@
+USE data;
+
+-- 評分改由評論累加維護：新增評論時在同一個交易中累加 ratingSum 與 reviewCount。
+-- 匯入的評分作為先驗（priorRating，權重 priorWeight 相當於幾則評論），
+-- averageRating = (priorRating * priorWeight + ratingSum) / (priorWeight + reviewCount)，
+-- 第一則評論不會直接取代匯入的評分（新建資料庫已包含於 001_create_tables.sql）
+ALTER TABLE restaurants
+    ADD COLUMN IF NOT EXISTS ratingSum   INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS reviewCount INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS priorRating FLOAT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS priorWeight INT NOT NULL DEFAULT 0;
+
+-- 以匯入的評分作為先驗，權重與 services/review_service.py 的 RATING_PRIOR_WEIGHT 相同
+-- （只設定尚未回填評論的餐廳，重複執行不會把已包含評論的平均當成先驗）
+UPDATE restaurants
+SET priorRating = averageRating,
+    priorWeight = 10
+WHERE priorWeight = 0 AND reviewCount = 0 AND averageRating > 0;
+
+-- 以既有評論回填並重算平均（完整重算，可重複執行；匯入範例資料後也執行一次）
+UPDATE restaurants r
+LEFT JOIN (
+    SELECT restaurantID, SUM(rating) AS ratingSum, COUNT(*) AS reviewCount
+    FROM reviews
+    GROUP BY restaurantID
+) agg ON agg.restaurantID = r.restaurantID
+SET r.ratingSum     = COALESCE(agg.ratingSum, 0),
+    r.reviewCount   = COALESCE(agg.reviewCount, 0),
+    r.averageRating = COALESCE(
+        (r.priorRating * r.priorWeight + COALESCE(agg.ratingSum, 0))
+            / NULLIF(r.priorWeight + COALESCE(agg.reviewCount, 0), 0),
+        r.averageRating
+    );
+
+-- 評論列表以 (timestamp, reviewID) 做 keyset 分頁；InnoDB 的次要索引已包含主鍵 reviewID，
+-- 取代只有 restaurantID 的 idx_review_restaurant
+CREATE INDEX IF NOT EXISTS idx_review_restaurant_time ON reviews(restaurantID, timestamp);
+DROP INDEX IF EXISTS idx_review_restaurant ON reviews;
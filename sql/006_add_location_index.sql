@@ -0,0 +1,4 @@
+USE data;
+
+-- 半徑查詢以經緯度的外接矩形篩選（latitude/longitude BETWEEN），此索引讓資料庫只掃描該緯度範圍
+CREATE INDEX IF NOT EXISTS idx_restaurant_location ON restaurants(latitude, longitude);
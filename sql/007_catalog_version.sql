@@ -0,0 +1,37 @@
+USE data;
+
+-- 菜單目錄的版本：menu_items 或目錄用到的餐廳欄位改變時由觸發程序加一，
+-- 各 worker 比對快照時只需以主鍵讀取這一列（見 src/services/menu_catalog.py 的 _fingerprint），
+-- 不必對兩個資料表做全表的總和檢查碼（新建資料庫已包含於 001_create_tables.sql）
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    name     VARCHAR(50) PRIMARY KEY,
+    version  BIGINT NOT NULL DEFAULT 1
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO catalog_versions (name, version) VALUES ('menu_catalog', 1);
+
+-- 觸發程序以任何方式寫入都會生效（包含匯入腳本與手動修改）；
+-- 刪除餐廳時 ON DELETE CASCADE 刪除的菜單不會觸發 menu_items 的觸發程序，由餐廳的觸發程序計入
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_insert AFTER INSERT ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
+
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_update AFTER UPDATE ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1
+    WHERE name = 'menu_catalog'
+      AND NOT (OLD.itemID <=> NEW.itemID AND OLD.restaurantID <=> NEW.restaurantID
+               AND OLD.name <=> NEW.name AND OLD.price <=> NEW.price
+               AND OLD.calories <=> NEW.calories AND OLD.protein <=> NEW.protein
+               AND OLD.carbs <=> NEW.carbs AND OLD.fat <=> NEW.fat);
+
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_catalog_delete AFTER DELETE ON menu_items FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
+
+-- 餐廳只有目錄用到的欄位改變時才計入（新增評論更新評分不會使快照失效）
+CREATE TRIGGER IF NOT EXISTS trg_restaurants_catalog_update AFTER UPDATE ON restaurants FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1
+    WHERE name = 'menu_catalog'
+      AND NOT (OLD.restaurantID <=> NEW.restaurantID AND OLD.name <=> NEW.name
+               AND OLD.foodType <=> NEW.foodType AND OLD.vegetarianOption <=> NEW.vegetarianOption);
+
+CREATE TRIGGER IF NOT EXISTS trg_restaurants_catalog_delete AFTER DELETE ON restaurants FOR EACH ROW
+    UPDATE catalog_versions SET version = version + 1 WHERE name = 'menu_catalog';
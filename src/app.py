@@ -6,6 +6,7 @@ Flask 主應用程式
 from flask import Flask
 import os
 import importlib
+import time
 from dotenv import load_dotenv
 from utils.debug import DEBUG_PRINT, WARN_PRINT, ERROR_PRINT, INFO_PRINT
 
@@ -16,6 +17,7 @@ load_dotenv(env_path)
 
 def create_app():
     """創建並配置 Flask 應用程式"""
+    started = time.perf_counter()
     app = Flask(__name__)
 
     app.config.from_mapping(
@@ -28,44 +30,97 @@ def create_app():
             # SQL 腳本使用的資料庫名稱為 data，預設值與之對齊
             "database": os.getenv("DB_NAME", "data"),
         },
+        # 啟動分析：[(步驟, 毫秒), ...]
+        STARTUP_PROFILE=[],
     )
+    _record_startup_step(app, "flask", started)
 
     # 載入所有模組
     register_blueprints(app)
 
+    _record_startup_step(app, "create_app total", started)
+    INFO_PRINT("[OK] 啟動完成", **{step: f"{ms:.1f}ms" for step, ms in app.config["STARTUP_PROFILE"]})
     return app
 
 
-def register_blueprints(app):
+def _record_startup_step(app, step, started):
+    app.config["STARTUP_PROFILE"].append((step, (time.perf_counter() - started) * 1000))
+
+
+def scan_modules():
     """
-    自動註冊所有模組的 Blueprint
+    掃描 modules 資料夾，返回模組名稱（依名稱排序）
 
-    此函數會掃描 modules 資料夾，自動載入所有模組的 Blueprint
-    每個模組應該在 __init__.py 中導出一個 Blueprint 物件
-    命名規則：{模組名}_bp
+    只在產生 Blueprint 清單（scripts/build_blueprint_manifest.py）
+    或清單不存在時使用
     """
     modules_path = os.path.join(os.path.dirname(__file__), "modules")
+    return sorted(
+        name for name in os.listdir(modules_path)
+        # 只處理資料夾且不是 __pycache__
+        if os.path.isdir(os.path.join(modules_path, name)) and not name.startswith("__")
+    )
 
-    # 遍歷 modules 資料夾中的所有子資料夾
-    for module_name in os.listdir(modules_path):
-        module_path = os.path.join(modules_path, module_name)
 
-        # 只處理資料夾且不是 __pycache__
-        if os.path.isdir(module_path) and not module_name.startswith("__"):
-            try:
-                # 動態導入模組
-                module = importlib.import_module(f"modules.{module_name}")
-
-                # 查找 Blueprint（命名規則：{模組名}_bp）
-                blueprint_name = f"{module_name}_bp"
-                if hasattr(module, blueprint_name):
-                    blueprint = getattr(module, blueprint_name)
-                    app.register_blueprint(blueprint)
-                    INFO_PRINT(f"[OK] 已載入模組: {module_name}")
-                else:
-                    WARN_PRINT(f"[WARN] 模組 {module_name} 未找到 Blueprint ({blueprint_name})")
-            except Exception as e:
-                ERROR_PRINT(f"[ERROR] 載入模組 {module_name} 時發生錯誤: {str(e)}")
+def _load_manifest(app):
+    """讀取預先產生的 Blueprint 清單，不存在時退回掃描資料夾"""
+    try:
+        from modules.manifest import BLUEPRINT_MANIFEST
+    except ImportError:
+        WARN_PRINT("[WARN] 找不到 modules/manifest.py，改為掃描 modules 資料夾")
+        return [(name, f"{name}_bp") for name in scan_modules()]
+    _check_manifest(app, BLUEPRINT_MANIFEST)
+    return BLUEPRINT_MANIFEST
+
+
+def _check_manifest(app, manifest):
+    """
+    比對清單與 modules 資料夾（只列出目錄，不導入模組）
+
+    有未列入清單或已不存在的模組時，除錯模式（FLASK_DEBUG）下直接失敗，
+    否則照清單載入並記錄錯誤（WARN_PRINT 預設不輸出，模組缺少時不能不被發現）
+    """
+    listed = {module_name for module_name, _ in manifest}
+    present = set(scan_modules())
+    missing = sorted(present - listed)
+    removed = sorted(listed - present)
+    if not missing and not removed:
+        return
+
+    message = (
+        f"modules/manifest.py 已過期（未列入: {', '.join(missing) or '無'}；"
+        f"已不存在: {', '.join(removed) or '無'}），"
+        "請執行 python3 src/scripts/build_blueprint_manifest.py"
+    )
+    if app.debug:
+        raise RuntimeError(message)
+    ERROR_PRINT(f"[ERROR] {message}")
+
+
+def register_blueprints(app):
+    """
+    註冊所有模組的 Blueprint
+
+    依 modules/manifest.py 的清單載入模組（清單與資料夾不一致時見 _check_manifest），
+    每個模組應該在 __init__.py 中導出一個 Blueprint 物件
+    命名規則：{模組名}_bp
+    各模組的載入時間記錄在 app.config["STARTUP_PROFILE"]
+    """
+    for module_name, blueprint_name in _load_manifest(app):
+        started = time.perf_counter()
+        try:
+            # 動態導入模組
+            module = importlib.import_module(f"modules.{module_name}")
+
+            if hasattr(module, blueprint_name):
+                blueprint = getattr(module, blueprint_name)
+                app.register_blueprint(blueprint)
+                INFO_PRINT(f"[OK] 已載入模組: {module_name}")
+            else:
+                WARN_PRINT(f"[WARN] 模組 {module_name} 未找到 Blueprint ({blueprint_name})")
+        except Exception as e:
+            ERROR_PRINT(f"[ERROR] 載入模組 {module_name} 時發生錯誤: {str(e)}")
+        _record_startup_step(app, f"module {module_name}", started)
 
 
 # 創建應用程式實例
@@ -73,4 +128,6 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    from services.search_service import start_dataset_watch_from_env
+    start_dataset_watch_from_env()
     app.run(debug=True, host="0.0.0.0", port=5000)
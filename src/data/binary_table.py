@@ -0,0 +1,213 @@
+"""
+二進位欄式資料表
+固定寬度的數值欄位（array typecode）加上字串表，寫成單一檔案後以 mmap 唯讀對應，
+讀取端直接在對應的記憶體上建立 memoryview，不複製也不解析。
+
+檔案格式（little-endian）：
+    MAGIC (8 bytes) | 標頭長度 (uint32) | 標頭 JSON | 各欄位資料（8 bytes 對齊）
+
+標頭記錄筆數、各欄位的型別與位置以及自訂的 meta；
+字串欄位存成 offsets（筆數 + 1 個，內容小於 4 GB 時為 'I'，否則為 'q'）與 UTF-8 內容兩段。
+
+寫入時先寫到同目錄的暫存檔並 fsync，再以 os.replace 原子地取代舊檔；
+已對應舊檔的程序不受影響，直到自行重新開啟。
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+MAGIC = b"BINTBL01"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+Column = Union[array, Sequence[str]]
+
+
+class TableFormatError(ValueError):
+    """檔案不是有效的二進位資料表"""
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+
+class StringColumn(Sequence[str]):
+    """字串欄位的唯讀檢視，取值時才解碼"""
+
+    __slots__ = ("_offsets", "_data")
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._decode_range(start, stop)
+        if index < 0:
+            index += len(self)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return str(self._data[start:end], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decode_range(0, len(self)))
+
+    def _decode_range(self, start: int, stop: int) -> List[str]:
+        """一次解碼連續的一段（整段轉為 str 後依字元位置切開）"""
+        if start >= stop:
+            return []
+        offsets = self._offsets
+        base = offsets[start]
+        raw = bytes(self._data[base:offsets[stop]])
+        text = raw.decode("utf-8")
+        if len(text) == len(raw):  # 純 ASCII，位元組位置即字元位置
+            return [text[offsets[i] - base:offsets[i + 1] - base] for i in range(start, stop)]
+        return [raw[offsets[i] - base:offsets[i + 1] - base].decode("utf-8") for i in range(start, stop)]
+
+
+def write_table(path: str, count: int, columns: Dict[str, Column], meta: Optional[Dict[str, Any]] = None) -> None:
+    """
+    寫入二進位資料表（原子取代）
+
+    Args:
+        path: 目標檔案
+        count: 筆數，每個欄位的長度都必須等於 count
+        columns: 欄位名稱 -> array（數值）或字串序列
+        meta: 寫入標頭的自訂資料（需可轉為 JSON）
+    """
+    blocks = []
+    layout = []
+    offset = 0
+
+    def add_block(payload: bytes) -> int:
+        nonlocal offset
+        start = offset
+        blocks.append(payload)
+        blocks.append(b"\0" * _padding(len(payload)))
+        offset += len(payload) + _padding(len(payload))
+        return start
+
+    for name, values in columns.items():
+        if len(values) != count:
+            raise ValueError(f"欄位 {name} 的長度 {len(values)} 與筆數 {count} 不符")
+        if isinstance(values, array):
+            data = values if sys.byteorder == "little" else _byteswapped(values)
+            layout.append({"name": name, "type": values.typecode, "offset": add_block(data.tobytes())})
+        else:
+            encoded = [value.encode("utf-8") for value in values]
+            total = sum(map(len, encoded))
+            offsets = array("I" if total < 2 ** 32 else "q", [0])
+            position = 0
+            for item in encoded:
+                position += len(item)
+                offsets.append(position)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            layout.append({
+                "name": name,
+                "type": "str",
+                "offsets_type": offsets.typecode,
+                "offset": add_block(offsets.tobytes()),
+                "data_offset": add_block(b"".join(encoded)),
+                "data_length": total,
+            })
+
+    header = json.dumps({"count": count, "columns": layout, "meta": meta or {}}, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + _HEADER_LENGTH.pack(len(header)) + header
+    prefix += b"\0" * _padding(len(prefix))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(prefix)
+            for block in blocks:
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _byteswapped(values: array) -> array:
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
+
+
+class MappedTable:
+    """
+    以 mmap 唯讀開啟的二進位資料表
+
+    欄位直接指向對應的記憶體，多個程序開啟同一個檔案時共用作業系統的頁面快取。
+    只要還有欄位檢視被引用，對應就會保留（即使檔案已被新版本取代）。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < len(MAGIC) + _HEADER_LENGTH.size:
+                raise TableFormatError(f"{path} 長度不足")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # 用於判斷檔案是否已被取代
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise TableFormatError(f"{path} 不是二進位資料表")
+        (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+        base = header_start + header_length
+        base += _padding(base)
+
+        if sys.byteorder != "little":  # pragma: no cover
+            raise TableFormatError("目前只支援 little-endian 平台直接對應")
+
+        self.count: int = header["count"]
+        self.meta: Dict[str, Any] = header["meta"]
+        self._columns: Dict[str, Any] = {}
+        for spec in header["columns"]:
+            start = base + spec["offset"]
+            if spec["type"] == "str":
+                offsets_type = spec.get("offsets_type", "q")
+                itemsize = array(offsets_type).itemsize
+                offsets = buffer[start:start + (self.count + 1) * itemsize].cast(offsets_type)
+                data_start = base + spec["data_offset"]
+                data = buffer[data_start:data_start + spec["data_length"]]
+                self._columns[spec["name"]] = StringColumn(offsets, data)
+            else:
+                itemsize = array(spec["type"]).itemsize
+                self._columns[spec["name"]] = buffer[start:start + self.count * itemsize].cast(spec["type"])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def column(self, name: str):
+        """取得欄位（數值欄位為 memoryview，字串欄位為 StringColumn）"""
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"{self.path} 沒有欄位 {name}") from None
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
@@ -0,0 +1,249 @@
+"""
+已編譯的資料集
+把 dataset/ 的 CSV 轉成二進位資料表（見 data/binary_table.py），
+載入時直接對應檔案，不必逐行解析 CSV。
+
+    dataset/compiled/restaurants.bin   餐廳（依 CSV 順序）
+    dataset/compiled/menu_items.bin    菜單項目（依 restaurantID 穩定排序）
+
+每個二進位檔記錄來源 CSV 的大小、mtime 與 SHA-256；
+大小或 mtime 改變時重新計算雜湊，雜湊不符即視為過期，由呼叫端改讀 CSV。
+
+編譯：
+    python3 src/scripts/compile_dataset.py
+"""
+
+import bisect
+import csv
+import hashlib
+import math
+import os
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from data.binary_table import MappedTable, TableFormatError, write_table
+from utils.debug import INFO_PRINT, WARN_PRINT
+
+COMPILED_DIR = "compiled"
+RESTAURANTS_CSV = "restaurants.csv"
+MENU_ITEMS_CSV = "menu_items.csv"
+
+# 二進位格式有變動時遞增，舊版本的檔案視為過期
+FORMAT_VERSION = 1
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _compiled_path(dataset_path: str, csv_name: str) -> str:
+    return os.path.join(dataset_path, COMPILED_DIR, os.path.splitext(csv_name)[0] + ".bin")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: str) -> Dict[str, Any]:
+    """來源 CSV 的指紋（大小、mtime、SHA-256）"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _sha256(path)}
+
+
+def is_fresh(table: MappedTable, csv_path: str) -> bool:
+    """二進位檔是否與來源 CSV 一致"""
+    source = table.meta.get("source") or {}
+    if table.meta.get("format") != FORMAT_VERSION:
+        return False
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return False
+    # 大小與 mtime 都相同時不必重新計算雜湊
+    if stat.st_size == source.get("size") and stat.st_mtime_ns == source.get("mtime_ns"):
+        return True
+    return stat.st_size == source.get("size") and _sha256(csv_path) == source.get("sha256")
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _parse_coordinate(value: Optional[str]) -> float:
+    # 沒有座標時存 NaN
+    if value is None or not value.strip():
+        return math.nan
+    return float(value)
+
+
+def compile_dataset(dataset_path: str) -> Dict[str, int]:
+    """
+    編譯資料集
+
+    Args:
+        dataset_path: dataset 資料夾路徑
+
+    Returns:
+        {檔名: 筆數}
+    """
+    counts = {}
+
+    # 餐廳：依 CSV 順序（restaurant_id 由行號產生）
+    csv_path = os.path.join(dataset_path, RESTAURANTS_CSV)
+    fingerprint = source_fingerprint(csv_path)
+    names, addresses, food_types, vegetarian_options = [], [], [], []
+    ratings, latitudes, longitudes = array("d"), array("d"), array("d")
+    price_ranges = array("q")
+    for row in _read_csv(csv_path):
+        names.append(row["name"])
+        addresses.append(row["address"])
+        ratings.append(float(row["averageRating"]))
+        price_ranges.append(int(row.get("priceRange", 1)))
+        food_types.append(row.get("foodType", ""))
+        vegetarian_options.append(row.get("vegetarianOption", "葷食"))
+        latitudes.append(_parse_coordinate(row.get("latitude")))
+        longitudes.append(_parse_coordinate(row.get("longitude")))
+    write_table(
+        _compiled_path(dataset_path, RESTAURANTS_CSV),
+        len(names),
+        {
+            "name": names, "address": addresses, "average_rating": ratings,
+            "price_range": price_ranges, "food_type": food_types,
+            "vegetarian_option": vegetarian_options, "latitude": latitudes, "longitude": longitudes,
+        },
+        {"format": FORMAT_VERSION, "source": fingerprint},
+    )
+    counts[RESTAURANTS_CSV] = len(names)
+
+    # 菜單：依 restaurantID 穩定排序，載入時以二分搜尋取出各餐廳的範圍
+    csv_path = os.path.join(dataset_path, MENU_ITEMS_CSV)
+    fingerprint = source_fingerprint(csv_path)
+    rows = [
+        (int(row["restaurantID"]), row["name"], row.get("description") or "", float(row["price"]),
+         float(row.get("calories", 0)), float(row.get("protein", 0)),
+         float(row.get("carbs", 0)), float(row.get("fat", 0)))
+        for row in _read_csv(csv_path)
+    ]
+    rows.sort(key=lambda r: r[0])
+    columns = list(zip(*rows)) or [()] * 8
+    write_table(
+        _compiled_path(dataset_path, MENU_ITEMS_CSV),
+        len(rows),
+        {
+            "restaurant_id": array("q", columns[0]),
+            "name": columns[1],
+            "description": columns[2],
+            "price": array("d", columns[3]),
+            "calories": array("d", columns[4]),
+            "protein": array("d", columns[5]),
+            "carbs": array("d", columns[6]),
+            "fat": array("d", columns[7]),
+        },
+        {"format": FORMAT_VERSION, "source": fingerprint},
+    )
+    counts[MENU_ITEMS_CSV] = len(rows)
+    return counts
+
+
+class MenuItemList(Sequence):
+    """
+    單一餐廳的菜單（唯讀）
+
+    指向已編譯菜單表的一段範圍，取值時才建立 MenuItem
+    """
+
+    __slots__ = ("_columns", "_start", "_stop")
+
+    # 與 MenuItem 欄位順序一致
+    FIELDS = ("name", "price", "description", "calories", "protein", "carbs", "fat")
+
+    def __init__(self, columns: Sequence[Sequence[Any]], start: int, stop: int):
+        self._columns = columns
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("menu item index out of range")
+        from data.sample_data import MenuItem
+        i = self._start + index
+        return MenuItem(*(column[i] for column in self._columns))
+
+    def __iter__(self):
+        from data.sample_data import MenuItem
+        # 整段切片後一次建立，比逐筆取值快
+        start, stop = self._start, self._stop
+        return map(MenuItem, *(column[start:stop] for column in self._columns))
+
+
+def load_compiled(dataset_path: str) -> Optional[List[Any]]:
+    """
+    從已編譯的資料集載入餐廳
+
+    Returns:
+        餐廳列表；尚未編譯或已過期時返回 None（呼叫端改讀 CSV）
+    """
+    from data.sample_data import Restaurant
+
+    tables = {}
+    for csv_name in (RESTAURANTS_CSV, MENU_ITEMS_CSV):
+        compiled_path = _compiled_path(dataset_path, csv_name)
+        if not os.path.exists(compiled_path):
+            return None
+        try:
+            table = MappedTable(compiled_path)
+        except (OSError, TableFormatError, ValueError) as e:
+            WARN_PRINT(f"[WARN] 無法讀取 {compiled_path}，改為讀取 CSV:", e)
+            return None
+        if not is_fresh(table, os.path.join(dataset_path, csv_name)):
+            WARN_PRINT(
+                f"[WARN] {compiled_path} 已過期，改為讀取 CSV"
+                "（請執行 python3 src/scripts/compile_dataset.py）"
+            )
+            return None
+        tables[csv_name] = table
+
+    restaurant_table, menu_table = tables[RESTAURANTS_CSV], tables[MENU_ITEMS_CSV]
+    menu_restaurant_ids = menu_table.column("restaurant_id")
+    menu_columns = tuple(menu_table.column(name) for name in MenuItemList.FIELDS)
+
+    names = restaurant_table.column("name")
+    addresses = restaurant_table.column("address")
+    ratings = restaurant_table.column("average_rating")
+    price_ranges = restaurant_table.column("price_range")
+    food_types = restaurant_table.column("food_type")
+    vegetarian_options = restaurant_table.column("vegetarian_option")
+    latitudes = restaurant_table.column("latitude")
+    longitudes = restaurant_table.column("longitude")
+
+    restaurants = []
+    for i in range(len(restaurant_table)):
+        idx = i + 1  # CSV 沒有 ID，用行號當 ID
+        start = bisect.bisect_left(menu_restaurant_ids, idx)
+        stop = bisect.bisect_right(menu_restaurant_ids, idx, start)
+        latitude, longitude = latitudes[i], longitudes[i]
+        restaurants.append(Restaurant(
+            restaurant_id=f"rest_{idx:03d}",
+            name=names[i],
+            address=addresses[i],
+            average_rating=ratings[i],
+            food_type=food_types[i],
+            price_range=price_ranges[i],
+            vegetarian_option=vegetarian_options[i],
+            latitude=None if math.isnan(latitude) else latitude,
+            longitude=None if math.isnan(longitude) else longitude,
+            menu_items=MenuItemList(menu_columns, start, stop),
+        ))
+
+    INFO_PRINT("[OK] 已載入編譯後的資料集", restaurants=len(restaurants), menu_items=len(menu_table))
+    return restaurants
@@ -1,12 +1,15 @@
 """
 資料載入器 - 從 dataset CSV 檔案載入餐廳和菜單資料
+（已編譯且未過期時改為對應二進位檔，見 data/compiled_dataset.py）
 """
 
 import csv
 import os
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from dataclasses import dataclass, field
 
+from utils.debug import WARN_PRINT, ERROR_PRINT
+
 
 @dataclass
 class MenuItem:
@@ -20,17 +23,19 @@ class MenuItem:
     fat: float = 0
 
 
-@dataclass
+@dataclass(frozen=True)
 class Restaurant:
-    """餐廳資料"""
+    """餐廳資料（不可變，搜尋服務的各版本直接共用同一物件）"""
     restaurant_id: str
     name: str
     address: str
     average_rating: float
-    menu_items: List[MenuItem] = field(default_factory=list)
+    menu_items: Sequence[MenuItem] = field(default_factory=tuple)
     food_type: str = ""
     price_range: int = 1  # 1=$, 2=$$, 3=$$$
     vegetarian_option: str = "葷食"  # 葷食, 蛋奶素, 全素
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class SampleData:
@@ -49,12 +54,28 @@ class SampleData:
     
     @staticmethod
     def create_sample_restaurants() -> List[Restaurant]:
-        """從 CSV 載入餐廳資料"""
+        """載入餐廳資料"""
         # 使用快取避免重複讀取
         if SampleData._cached_restaurants is not None:
             return SampleData._cached_restaurants
         
-        dataset_path = SampleData._get_dataset_path()
+        restaurants = SampleData.load_restaurants(SampleData._get_dataset_path())
+        SampleData._cached_restaurants = restaurants
+        return restaurants
+    
+    @staticmethod
+    def load_restaurants(dataset_path: str) -> List[Restaurant]:
+        """從 dataset 資料夾載入餐廳資料（優先使用已編譯的二進位檔，不使用快取）"""
+        from data.compiled_dataset import load_compiled
+        
+        restaurants = load_compiled(dataset_path)
+        if restaurants is not None:
+            return restaurants
+        return SampleData._load_csv(dataset_path)
+    
+    @staticmethod
+    def _load_csv(dataset_path: str) -> List[Restaurant]:
+        """從 CSV 載入餐廳資料"""
         restaurants_file = os.path.join(dataset_path, "restaurants.csv")
         menu_items_file = os.path.join(dataset_path, "menu_items.csv")
         
@@ -67,22 +88,14 @@ class SampleData:
                 reader = csv.DictReader(f)
                 for row in reader:
                     rest_id = row['restaurantID']
-                    menu_item = MenuItem(
-                        name=row['name'],
-                        price=float(row['price']),
-                        description=row.get('description', ''),
-                        calories=float(row.get('calories', 0)),
-                        protein=float(row.get('protein', 0)),
-                        carbs=float(row.get('carbs', 0)),
-                        fat=float(row.get('fat', 0))
-                    )
+                    menu_item = SampleData.menu_item_from_row(row)
                     if rest_id not in menu_by_restaurant:
                         menu_by_restaurant[rest_id] = []
                     menu_by_restaurant[rest_id].append(menu_item)
         except FileNotFoundError:
-            print(f"[WARN] 找不到菜單檔案: {menu_items_file}")
+            WARN_PRINT("[WARN] 找不到菜單檔案:", menu_items_file)
         except Exception as e:
-            print(f"[ERROR] 載入菜單時發生錯誤: {e}")
+            ERROR_PRINT("[ERROR] 載入菜單時發生錯誤:", e)
         
         # 2. 載入餐廳資料
         try:
@@ -90,28 +103,53 @@ class SampleData:
                 reader = csv.DictReader(f)
                 for idx, row in enumerate(reader, start=1):
                     rest_id = str(idx)  # CSV 沒有 ID，用行號當 ID
-                    
-                    restaurant = Restaurant(
-                        restaurant_id=f"rest_{idx:03d}",
-                        name=row['name'],
-                        address=row['address'],
-                        average_rating=float(row['averageRating']),
-                        food_type=row.get('foodType', ''),
-                        price_range=int(row.get('priceRange', 1)),
-                        vegetarian_option=row.get('vegetarianOption', '葷食'),
-                        menu_items=menu_by_restaurant.get(rest_id, [])
-                    )
+                    restaurant = SampleData.restaurant_from_row(idx, row, menu_by_restaurant.get(rest_id, []))
                     restaurants.append(restaurant)
         except FileNotFoundError:
-            print(f"[WARN] 找不到餐廳檔案: {restaurants_file}，使用預設資料")
+            WARN_PRINT(f"[WARN] 找不到餐廳檔案: {restaurants_file}，使用預設資料")
             restaurants = SampleData._create_fallback_data()
         except Exception as e:
-            print(f"[ERROR] 載入餐廳時發生錯誤: {e}")
+            ERROR_PRINT("[ERROR] 載入餐廳時發生錯誤:", e)
             restaurants = SampleData._create_fallback_data()
         
-        SampleData._cached_restaurants = restaurants
         return restaurants
     
+    @staticmethod
+    def menu_item_from_row(row: dict) -> MenuItem:
+        """將 menu_items.csv 的一列轉為 MenuItem"""
+        return MenuItem(
+            name=row['name'],
+            price=float(row['price']),
+            description=row.get('description', ''),
+            calories=float(row.get('calories', 0)),
+            protein=float(row.get('protein', 0)),
+            carbs=float(row.get('carbs', 0)),
+            fat=float(row.get('fat', 0))
+        )
+    
+    @staticmethod
+    def restaurant_from_row(idx: int, row: dict, menu_items: Sequence[MenuItem]) -> Restaurant:
+        """將 restaurants.csv 的第 idx 列（從 1 開始）轉為 Restaurant"""
+        return Restaurant(
+            restaurant_id=f"rest_{idx:03d}",
+            name=row['name'],
+            address=row['address'],
+            average_rating=float(row['averageRating']),
+            food_type=row.get('foodType', ''),
+            price_range=int(row.get('priceRange', 1)),
+            vegetarian_option=row.get('vegetarianOption', '葷食'),
+            latitude=SampleData._parse_coordinate(row.get('latitude')),
+            longitude=SampleData._parse_coordinate(row.get('longitude')),
+            menu_items=tuple(menu_items)
+        )
+    
+    @staticmethod
+    def _parse_coordinate(value: Optional[str]) -> Optional[float]:
+        """解析經緯度欄位，空值返回 None"""
+        if value is None or not value.strip():
+            return None
+        return float(value)
+    
     @staticmethod
     def _create_fallback_data() -> List[Restaurant]:
         """當 CSV 無法載入時的備用資料"""
@@ -124,7 +162,7 @@ class SampleData:
                 food_type="台式",
                 price_range=1,
                 vegetarian_option="葷食",
-                menu_items=[MenuItem("招牌套餐", 100.0, "美味套餐")]
+                menu_items=(MenuItem("招牌套餐", 100.0, "美味套餐"),)
             )
         ]
     
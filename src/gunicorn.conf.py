@@ -0,0 +1,76 @@
+"""
+gunicorn 設定（正式環境）
+
+使用方法（於專案根目錄）：
+    gunicorn -c src/gunicorn.conf.py
+
+preload_app 讓 master 程序先載入 app 並完成預熱（見 wsgi.py），
+再 fork 出 worker；餐廳目錄、索引與模板等唯讀資料透過 copy-on-write 共用。
+
+環境變數：
+    BIND=0.0.0.0:5000      # 監聽位址
+    WEB_CONCURRENCY=4      # worker 數量（預設為 CPU 數 * 2 + 1）
+    WEB_THREADS=4          # 每個 worker 的執行緒數
+    WEB_TIMEOUT=30         # worker 逾時秒數
+    DATASET_WATCH=1        # 各 worker 監看 dataset/ 的 CSV 並熱更新
+    METRICS_MULTIPROC_DIR  # 各 worker 寫出指標、/metrics 合併的目錄（預設為專案根目錄的 cache/metrics）
+"""
+
+import gc
+import glob
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+# 多個 worker 的指標經由共用目錄合併（需在載入 app 之前設定，見 services/metrics.py）
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR", os.path.join(os.path.dirname(chdir), "cache", "metrics")
+)
+wsgi_app = "wsgi:app"
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", 4))
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# 在 master 載入 app 與預熱，worker 共用預熱後的記憶體
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # 清除上次執行留下的指標檔，計數從 0 開始
+    for path in glob.glob(os.path.join(os.environ["METRICS_MULTIPROC_DIR"], "*.json")):
+        os.unlink(path)
+
+
+def when_ready(server):
+    # 預熱時的指標（例如資料庫查詢）寫成 master 自己的檔案
+    from services.metrics import REGISTRY
+    REGISTRY.flush()
+    # 預熱完成、fork worker 之前把現有物件移出 GC 追蹤，
+    # 避免 worker 的垃圾回收改寫共用物件的標頭而觸發頁面複製
+    gc.freeze()
+    server.log.info("app preloaded, gc frozen (%d objects)", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # worker 從 0 開始計數（master 的數值已在它自己的檔案中），並定期寫出
+    from services.metrics import REGISTRY, start_metrics_flush
+    REGISTRY.reset()
+    start_metrics_flush()
+    # 執行緒不會跟著 fork，監看 dataset/ 的背景執行緒在每個 worker 各自啟動
+    from services.search_service import start_dataset_watch_from_env
+    start_dataset_watch_from_env()
+
+
+def worker_exit(server, worker):
+    # 寫出最後一次的數值；檔案保留，計數不會因 worker 重啟而倒退
+    from services.metrics import REGISTRY
+    REGISTRY.flush()
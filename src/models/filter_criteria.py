@@ -2,8 +2,21 @@
 篩選條件資料模型
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List
+from dataclasses import dataclass, field, replace
+from typing import Hashable, List, Optional, Tuple
+
+# price_range 等級對應的價格上限（$, $$, $$$）
+PRICE_RANGE_LIMITS = {1: 200, 2: 400, 3: 600}
+
+
+def price_range_for(max_price: Optional[float]) -> Optional[int]:
+    """max_price 對應 price_range: 200->1, 400->2, 600->3，更高（$$$$）或未指定時不篩選"""
+    if max_price is None:
+        return None
+    for price_range, limit in sorted(PRICE_RANGE_LIMITS.items()):
+        if max_price <= limit:
+            return price_range
+    return None
 
 
 @dataclass
@@ -15,4 +28,36 @@ class FilterCriteria:
     categories: List[str] = field(default_factory=list)  # 食物類別 (日式, 台式, etc.)
     vegetarian: bool = False  # 是否只顯示素食
     sort_by: str = 'rating'  # 'rating', 'price', 'distance'
+    latitude: Optional[float] = None  # 使用者位置（距離篩選與排序用）
+    longitude: Optional[float] = None
+    radius_km: Optional[float] = None  # 搜尋半徑（公里），None 表示不限
+    limit: Optional[int] = None  # 最多返回筆數，None 表示全部
+    fuzzy: bool = False  # 關鍵字是否容許錯字（比對店名與菜名，見 services.fuzzy_index）
+
+    def has_location(self) -> bool:
+        """是否提供使用者位置"""
+        return self.latitude is not None and self.longitude is not None
+
+
+    def normalized(self) -> "FilterCriteria":
+        """
+        正規化後的條件（搜尋結果相同的條件正規化後相同）
+
+        關鍵字去除前後空白並轉小寫（比對不分大小寫），類別去重後排序，
+        價格上限換成所屬價格等級的上限（搜尋只依價格等級篩選）
+        """
+        keyword = (self.keyword or '').strip().lower() or None
+        return replace(
+            self,
+            keyword=keyword,
+            categories=sorted({c.strip() for c in self.categories if c and c.strip()}),
+            max_price=PRICE_RANGE_LIMITS.get(price_range_for(self.max_price)),
+        )
 
+    def cache_key(self) -> Tuple[Hashable, ...]:
+        """搜尋結果快取的 key（以正規化後的條件組成）"""
+        c = self.normalized()
+        return (
+            c.keyword, c.fuzzy, tuple(c.categories), price_range_for(c.max_price), c.min_rating,
+            c.vegetarian, c.sort_by, c.latitude, c.longitude, c.radius_km, c.limit,
+        )
@@ -0,0 +1,11 @@
+"""
+Admin 模組
+提供維運用的診斷端點（慢查詢、搜尋查詢計畫等）
+"""
+
+from flask import Blueprint
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+# 導入路由（必須在 Blueprint 創建之後）
+from . import routes
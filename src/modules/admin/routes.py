@@ -0,0 +1,103 @@
+"""
+Admin 模組的路由定義
+"""
+
+import hmac
+import os
+from functools import wraps
+
+from flask import jsonify, request
+from . import admin_bp
+from models.filter_criteria import FilterCriteria
+from services.slow_query import SLOW_QUERY_LOG
+
+# 價格等級對應 FilterCriteria.max_price（與 /api/stores 的 price 參數相同）
+_PRICE_LIMITS = {'$': 200, '$$': 400, '$$$': 600}
+
+
+def admin_required(view):
+    """
+    限制管理端點的存取
+
+    需在 X-Admin-Token 標頭（或 Authorization: Bearer，供 Prometheus 的 bearer_token 使用）
+    帶入與 ADMIN_TOKEN 相同的值；未設定 ADMIN_TOKEN 時一律拒絕
+    （反向代理後的請求來源都是本機，不能以 remote_addr 判斷）。
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.getenv('ADMIN_TOKEN', '')
+        provided = request.headers.get('X-Admin-Token', '')
+        if not provided:
+            scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+            provided = credentials.strip() if scheme.lower() == 'bearer' else ''
+        allowed = bool(token) and hmac.compare_digest(provided.encode(), token.encode())
+        if not allowed:
+            return jsonify({"success": False, "error": "沒有權限"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def slow_queries():
+    """
+    慢查詢統計
+
+    GET 參數:
+        limit: 返回的查詢形狀數量（預設 20）
+        recent: 同時返回的最近慢查詢筆數（預設 0）
+    """
+    limit = max(1, min(request.args.get('limit', 20, type=int), 200))
+    recent = max(0, min(request.args.get('recent', 0, type=int), 200))
+
+    return jsonify({
+        "success": True,
+        "threshold_ms": SLOW_QUERY_LOG.threshold_ms,
+        "data": SLOW_QUERY_LOG.top_offenders(limit),
+        "recent": SLOW_QUERY_LOG.recent(recent) if recent else []
+    }), 200
+
+
+@admin_bp.route('/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """清除慢查詢統計"""
+    SLOW_QUERY_LOG.clear()
+    return jsonify({"success": True, "message": "已清除慢查詢統計"}), 200
+
+
+@admin_bp.route('/search-plan', methods=['GET'])
+@admin_required
+def search_plan():
+    """
+    以記憶體中的餐廳資料搜尋，並返回查詢計畫（debug 欄位）
+
+    GET 參數與 /api/stores 相同（keyword, fuzzy, categories, price, vegetarian, lat, lng, radius,
+    sort_by, limit），另可指定 min_rating
+    """
+    from services.search_service import get_search_service
+
+    categories = [c.strip() for c in request.args.get('categories', '').split(',') if c.strip()]
+    fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
+    keyword = request.args.get('keyword', '').strip() or None
+    default_sort = 'similarity' if fuzzy else 'relevance' if keyword else 'rating'
+    criteria = FilterCriteria(
+        keyword=keyword,
+        max_price=_PRICE_LIMITS.get(request.args.get('price', '').strip()),
+        min_rating=request.args.get('min_rating', type=float),
+        categories=categories,
+        vegetarian=request.args.get('vegetarian', 'false').lower() == 'true',
+        sort_by=request.args.get('sort_by', default_sort),
+        latitude=request.args.get('lat', type=float),
+        longitude=request.args.get('lng', type=float),
+        radius_km=request.args.get('radius', type=float),
+        limit=request.args.get('limit', type=int),
+        fuzzy=fuzzy,
+    )
+
+    results, plan = get_search_service().explain(criteria)
+    return jsonify({
+        "success": True,
+        "data": [{"restaurant_id": r.restaurant_id, "name": r.name} for r in results],
+        "debug": plan.to_dict()
+    }), 200
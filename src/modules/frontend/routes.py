@@ -2,16 +2,44 @@
 Frontend 模組的路由定義
 """
 
-from flask import render_template, jsonify, request
+import csv
+import io
+import itertools
+import json
+from functools import lru_cache
+
+from flask import Response, render_template, jsonify, request, stream_with_context
 from . import frontend_bp
 from services.restaurant_service import RestaurantService
 from services.diet_service import DietService
-from services.db import driver_available
+from services.diet_import import IMPORT_FORMATS, import_diet_logs
+from services.review_service import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_RATING, MIN_RATING, ReviewService, decode_cursor, encode_cursor,
+)
+from services.autocomplete import MAX_SUGGESTIONS
+from services.db import DatabaseError, driver_available
+from services.fuzzy_index import is_fuzzy_query
+from services.ranking import get_sort_key, top_k
 from utils.debug import INFO_PRINT, ERROR_PRINT
 
 # 初始化服務
 restaurant_service = RestaurantService()
 diet_service = DietService()
+review_service = ReviewService()
+
+
+# 推薦與餐點規劃只在各自的 API 使用，第一次呼叫時才載入（縮短啟動時間）
+@lru_cache(maxsize=None)
+def _get_recommendation_service():
+    from services.recommendation_service import RecommendationService
+    return RecommendationService()
+
+
+@lru_cache(maxsize=None)
+def _get_meal_plan_service():
+    from services.meal_planner import MealPlanService
+    return MealPlanService()
+
 
 # 模擬收藏數據（實際應用中應該從資料庫讀取）
 _user_favorites = {}  # {user_id: [restaurant_id, ...]}
@@ -19,6 +47,21 @@ _user_favorites = {}  # {user_id: [restaurant_id, ...]}
 # 臨時使用者 ID（實際應用中應該從登入狀態取得）
 TEMP_USER_ID = 1
 
+# /api/stores 單次最多返回筆數
+MAX_STORES_LIMIT = 100
+
+# 飲食記錄匯出的欄位與格式（格式 -> (MIME 類型, 副檔名)）
+DIET_EXPORT_FIELDS = (
+    'log_id', 'timestamp', 'item_id', 'item_name', 'restaurant_name',
+    'portion_size', 'calories', 'protein', 'carbs', 'fat',
+)
+DIET_EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+# 串流回應累積到此大小（字元）才送出一段，避免每筆記錄各寫一次
+DIET_EXPORT_CHUNK_CHARS = 64 * 1024
+
 
 def _find_restaurant_by_id(restaurant_id):
     """根據 ID 尋找餐廳"""
@@ -31,8 +74,8 @@ def _find_restaurant_by_id(restaurant_id):
     return restaurant_service.get_restaurant_by_id(restaurant_id)
 
 
-def _convert_restaurant_to_frontend_format(restaurant, user_id: str = None):
-    """將餐廳資料轉換為前端格式"""
+def _convert_restaurant_to_frontend_format(restaurant, user_id: str = None, distance_km: float = None):
+    """將餐廳資料轉換為前端格式（distance_km 為與使用者位置的距離，未知時為 None）"""
     # 使用餐廳的 price_range 欄位來決定價格等級
     price_range_map = {
         1: ('$', '$ 1 ~ 200'),
@@ -70,7 +113,9 @@ def _convert_restaurant_to_frontend_format(restaurant, user_id: str = None):
         "rating": rating_display,
         "priceRange": price_range_text,
         "priceMeta": price_meta,
-        "distance": f"{0.3 + (rest_num % 10) * 0.2:.1f} km",  # 模擬距離
+        "distance": f"{distance_km:.1f} km" if distance_km is not None else None,
+        "latitude": getattr(restaurant, 'latitude', None),
+        "longitude": getattr(restaurant, 'longitude', None),
         "heroImg": placeholder_img,
         "description": restaurant.name,
         "address": restaurant.address,
@@ -105,18 +150,48 @@ def get_stores():
     
     GET 參數:
         keyword: 搜尋關鍵字
+        fuzzy: 關鍵字是否容許錯字 (true/false)，只比對店名與菜名，預設依相似度排序
         categories: 類別（逗號分隔）
         price: 價格等級 ($, $$, $$$)
         vegetarian: 是否素食 (true/false)
         user_id: 使用者 ID（可選）
+        lat, lng: 使用者位置（可選，提供時回傳距離並預設由近到遠排序）
+        radius: 搜尋半徑（公里，可選，需同時提供 lat/lng）
+        sort_by: 排序方式 (rating, price, distance, similarity, relevance)；
+                 預設為 similarity（fuzzy）、distance（有位置）、relevance（有關鍵字）或 rating
+        limit: 最多返回筆數（可選，最多 MAX_STORES_LIMIT）
     """
     try:
         keyword = request.args.get('keyword', '').strip()
+        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true' and is_fuzzy_query(keyword)
         categories = request.args.get('categories', '').split(',') if request.args.get('categories') else []
         categories = [c.strip() for c in categories if c.strip()]
         price = request.args.get('price', '').strip()
         vegetarian = request.args.get('vegetarian', 'false').lower() == 'true'
         user_id = request.args.get('user_id')
+        latitude = request.args.get('lat', type=float)
+        longitude = request.args.get('lng', type=float)
+        radius_km = request.args.get('radius', type=float)
+        has_location = latitude is not None and longitude is not None
+        if fuzzy:
+            default_sort = 'similarity'
+        elif has_location:
+            default_sort = 'distance'
+        else:
+            default_sort = 'relevance' if keyword else 'rating'
+        sort_by = request.args.get('sort_by', default_sort)
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            limit = max(1, min(limit, MAX_STORES_LIMIT))
+        
+        # 以地理索引找出半徑內的餐廳
+        geo_index = restaurant_service.get_geo_index() if has_location else None
+        within_radius = geo_index is not None and radius_km is not None
+        
+        # 可在 SQL 中排序的方式直接下推 ORDER BY + LIMIT，其餘（距離）在記憶體取 Top-K；
+        # 半徑查詢在 SQL 只篩選外接矩形，需先排除矩形角落的餐廳，同樣在記憶體取 Top-K
+        sort_key = get_sort_key(sort_by)
+        sql_sortable = sort_key is not None and sort_key.sql is not None and not within_radius
         
         # 價格等級轉換為數字
         price_range = None
@@ -124,18 +199,63 @@ def get_stores():
             price_map = {'$': 1, '$$': 2, '$$$': 3}
             price_range = price_map.get(price, None)
         
+        # 半徑內的餐廳由地理索引算出；SQL 只帶外接矩形，候選數量不影響查詢的參數個數
+        distances = {}
+        bounds = None
+        if within_radius:
+            distances = {key: d for d, key in geo_index.within_radius(latitude, longitude, radius_km)}
+            bounds = geo_index.bounding_box(latitude, longitude, radius_km)
+        
+        # 模糊搜尋：以索引找出店名或菜名相似的餐廳，取代 SQL 的 LIKE 比對
+        similarity = {}
+        restaurant_ids = None
+        if fuzzy:
+            fuzzy_index = restaurant_service.get_fuzzy_index()
+            similarity = fuzzy_index.search(keyword) if fuzzy_index is not None else {}
+            restaurant_ids = list(similarity)
+            if within_radius:
+                restaurant_ids = [rid for rid in restaurant_ids if rid in distances]
+            keyword = ''
+        
         # 使用資料庫服務搜尋
         results = restaurant_service.search_restaurants(
             keyword=keyword if keyword else None,
             categories=categories if categories else None,
             price_range=price_range,
-            vegetarian=vegetarian
+            vegetarian=vegetarian,
+            restaurant_ids=restaurant_ids,
+            sort_by=sort_by,
+            limit=limit if sql_sortable else None,
+            with_menus=sql_sortable,
+            bounds=bounds
         )
         
+        if within_radius:
+            results = [r for r in results if r.restaurant_id in distances]
+        elif geo_index is not None:
+            for restaurant in results:
+                d = geo_index.distance_to(restaurant.restaurant_id, latitude, longitude)
+                if d is not None:
+                    distances[restaurant.restaurant_id] = d
+        
+        # 關鍵字相關性（BM25F，有 limit 時只計算可能排進前 limit 筆的餐廳）
+        relevance = {}
+        if sort_by == 'relevance' and keyword:
+            relevance_index = restaurant_service.get_relevance_index()
+            if relevance_index is not None:
+                relevance = relevance_index.rank(keyword, (r.restaurant_id for r in results), limit)
+        
+        if not sql_sortable:
+            context = {'distances': distances, 'similarity': similarity, 'relevance': relevance}
+            results = top_k(results, sort_by, limit, context)
+            restaurant_service.attach_menus(results)
+        
         # 轉換為前端格式
         stores_data = []
         for restaurant in results:
-            store_data = _convert_restaurant_to_frontend_format(restaurant, user_id)
+            store_data = _convert_restaurant_to_frontend_format(
+                restaurant, user_id, distances.get(restaurant.restaurant_id)
+            )
             stores_data.append(store_data)
         
         return jsonify({
@@ -151,6 +271,34 @@ def get_stores():
         }), 500
 
 
+@frontend_bp.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """
+    搜尋框的自動完成建議（店名、菜名、類別），與 /api/stores 同樣來自資料庫
+    
+    GET 參數:
+        q: 使用者輸入的前綴
+        limit: 最多返回筆數（預設與上限為 MAX_SUGGESTIONS）
+    """
+    try:
+        prefix = request.args.get('q', '')
+        limit = request.args.get('limit', MAX_SUGGESTIONS, type=int)
+        index = restaurant_service.get_autocomplete_index()
+        suggestions = index.suggest(prefix, limit) if index is not None else []
+        
+        return jsonify({
+            "success": True,
+            "data": [s.to_dict() for s in suggestions]
+        }), 200
+        
+    except Exception as e:
+        ERROR_PRINT(f"[ERROR] 取得自動完成建議時發生錯誤: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "無法取得建議"
+        }), 500
+
+
 @frontend_bp.route('/api/stores/<store_id>', methods=['GET'])
 def get_store_detail(store_id: str):
     """
@@ -192,6 +340,111 @@ def get_store_detail(store_id: str):
         }), 500
 
 
+def _parse_restaurant_id(store_id: str):
+    """將數字或 rest_xxx 格式的餐廳 ID 轉為整數，格式不正確時返回 None"""
+    if store_id.startswith('rest_'):
+        store_id = store_id[len('rest_'):]
+    return int(store_id) if store_id.isdigit() else None
+
+
+@frontend_bp.route('/api/stores/<store_id>/reviews', methods=['GET', 'POST'])
+def manage_reviews(store_id: str):
+    """
+    餐廳評論
+    
+    GET: 取得評論（由新到舊，keyset 分頁）
+    POST: 新增評論（同時更新餐廳的平均評分與評論數）
+    
+    GET 參數:
+        limit: 每頁筆數（預設 DEFAULT_PAGE_SIZE，最多 MAX_PAGE_SIZE）
+        cursor: 上一頁回傳的 next_cursor，第一頁不提供（第一頁另外回傳 summary）
+    
+    POST 資料:
+        user_id: 使用者 ID（可選）
+        rating: 評分（1 ~ 5 的整數）
+        comment: 評論內容（可選）
+    """
+    try:
+        restaurant_id = _parse_restaurant_id(store_id)
+        if restaurant_id is None:
+            return jsonify({
+                "success": False,
+                "error": "餐廳不存在"
+            }), 404
+        
+        if request.method == 'GET':
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+            cursor = request.args.get('cursor')
+            before = None
+            if cursor:
+                before = decode_cursor(cursor)
+                if before is None:
+                    return jsonify({
+                        "success": False,
+                        "error": "cursor 格式不正確"
+                    }), 400
+            
+            # 多取一筆判斷是否還有下一頁
+            reviews = review_service.get_reviews(restaurant_id, limit + 1, before)
+            has_more = len(reviews) > limit
+            reviews = reviews[:limit]
+            
+            response = {
+                "success": True,
+                "data": [
+                    {
+                        "review_id": review.review_id,
+                        "user_id": review.user_id,
+                        "username": review.username,
+                        "rating": review.rating,
+                        "comment": review.comment,
+                        "timestamp": review.timestamp.isoformat() if review.timestamp else None
+                    }
+                    for review in reviews
+                ],
+                "next_cursor": encode_cursor(reviews[-1]) if has_more else None
+            }
+            if before is None:
+                response["summary"] = review_service.get_rating_summary(restaurant_id)
+            return jsonify(response), 200
+        
+        # POST
+        data = request.get_json() or {}
+        try:
+            user_id = int(data.get('user_id'))
+        except (ValueError, TypeError):
+            user_id = TEMP_USER_ID
+        
+        rating = data.get('rating')
+        if isinstance(rating, bool) or not isinstance(rating, int) or not MIN_RATING <= rating <= MAX_RATING:
+            return jsonify({
+                "success": False,
+                "error": f"評分需為 {MIN_RATING} ~ {MAX_RATING} 的整數"
+            }), 400
+        comment = str(data.get('comment') or '').strip()
+        
+        result = review_service.add_review(restaurant_id, user_id, rating, comment)
+        if result is None:
+            return jsonify({
+                "success": False,
+                "error": "新增評論失敗"
+            }), 500
+        
+        return jsonify({
+            "success": True,
+            "message": "評論已新增",
+            "data": result
+        }), 201
+        
+    except Exception as e:
+        ERROR_PRINT(f"[ERROR] 處理評論時發生錯誤: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "無法處理評論"
+        }), 500
+
+
 @frontend_bp.route('/api/favorites', methods=['GET', 'POST', 'DELETE'])
 def manage_favorites():
     """
@@ -506,3 +759,232 @@ def manage_diet():
             "error": "操作失敗"
         }), 500
 
+
+def _diet_export_record(log) -> dict:
+    """匯出的單筆記錄（營養素已乘上份量）"""
+    portion = log.portion_size
+    return {
+        'log_id': log.log_id,
+        'timestamp': log.timestamp.isoformat() if log.timestamp else None,
+        'item_id': log.item_id,
+        'item_name': log.item_name,
+        'restaurant_name': log.restaurant_name,
+        'portion_size': portion,
+        'calories': round(log.calories * portion, 1),
+        'protein': round(log.protein * portion, 1),
+        'carbs': round(log.carbs * portion, 1),
+        'fat': round(log.fat * portion, 1),
+    }
+
+
+def _generate_diet_export(first, logs, export_format: str):
+    """逐筆序列化飲食記錄（first 為已先取出的第一筆），累積到 DIET_EXPORT_CHUNK_CHARS 送出一段"""
+    buffer = io.StringIO()
+    if export_format == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=DIET_EXPORT_FIELDS)
+        buffer.write('\ufeff')  # BOM，讓 Excel 以 UTF-8 開啟中文
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(record):
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write('\n')
+    
+    # 先送出標頭，使用者立即開始下載
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    try:
+        for log in itertools.chain([first] if first is not None else [], logs):
+            write(_diet_export_record(log))
+            if buffer.tell() >= DIET_EXPORT_CHUNK_CHARS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    except DatabaseError as e:
+        # 已開始回應，無法再改狀態碼；記錄後結束（檔案不完整）
+        ERROR_PRINT("[ERROR] 匯出飲食記錄中斷:", e)
+    finally:
+        logs.close()  # 提早結束（例如使用者中斷下載）時也釋放連線
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@frontend_bp.route('/api/diet/export', methods=['GET'])
+def export_diet():
+    """
+    匯出使用者的所有飲食記錄（串流下載，記憶體用量不隨記錄數增加）
+    
+    GET 參數:
+        user_id: 使用者 ID（可選，預設使用臨時 ID）
+        format: csv（預設）或 ndjson（每行一筆 JSON）
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in DIET_EXPORT_FORMATS:
+        return jsonify({
+            "success": False,
+            "error": f"不支援的格式，可用: {', '.join(DIET_EXPORT_FORMATS)}"
+        }), 400
+    user_id = request.args.get('user_id', type=int) or TEMP_USER_ID
+    
+    # 先取得第一筆，連線或查詢失敗時仍可回傳錯誤狀態碼
+    logs = diet_service.iter_user_diet_logs(user_id)
+    try:
+        first = next(logs, None)
+    except DatabaseError as e:
+        ERROR_PRINT("[ERROR] 匯出飲食記錄失敗:", e)
+        return jsonify({
+            "success": False,
+            "error": "無法匯出飲食記錄"
+        }), 500
+    
+    mimetype, extension = DIET_EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(_generate_diet_export(first, logs, export_format)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=diet_logs_{user_id}.{extension}"},
+    )
+
+
+@frontend_bp.route('/api/diet/import', methods=['POST'])
+def import_diet():
+    """
+    匯入飲食記錄（上傳 CSV 或 NDJSON，可直接使用 /api/diet/export 的檔案）
+    
+    multipart/form-data:
+        file: 上傳的檔案
+        user_id: 使用者 ID（可選，預設使用臨時 ID）
+        format: csv 或 ndjson（可選，預設依副檔名判斷）
+    
+    每筆需要 timestamp 與 item_id 或 item_name（可加上 restaurant_name），portion_size 可選；
+    不正確的行逐行回報，不影響其他行。
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({
+                "success": False,
+                "error": "請上傳檔案"
+            }), 400
+        
+        import_format = (request.form.get('format') or upload.filename.rsplit('.', 1)[-1]).lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in IMPORT_FORMATS:
+            return jsonify({
+                "success": False,
+                "error": f"不支援的格式，可用: {', '.join(IMPORT_FORMATS)}"
+            }), 400
+        
+        if not driver_available():
+            return jsonify({
+                "success": False,
+                "error": "資料庫無法使用"
+            }), 503
+        
+        user_id = request.form.get('user_id', type=int) or TEMP_USER_ID
+        result = import_diet_logs(user_id, upload.stream, import_format)
+        
+        return jsonify({
+            "success": True,
+            "message": f"已匯入 {result.imported} 筆，{result.failed} 筆失敗",
+            "data": result.to_dict()
+        }), 200
+        
+    except Exception as e:
+        ERROR_PRINT(f"[ERROR] 匯入飲食記錄時發生錯誤: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "匯入飲食記錄失敗"
+        }), 500
+
+
+@frontend_bp.route('/api/recommendations', methods=['GET'])
+def get_recommendations():
+    """
+    依今日剩餘營養額度推薦菜單項目
+
+    GET 參數:
+        user_id: 使用者 ID（可選，預設使用臨時 ID）
+        k: 返回筆數（預設 10，最多 50）
+        categories: 類別（逗號分隔）
+        max_price: 價格上限
+        vegetarian: 是否素食 (true/false)
+        meals_left: 今日剩餘餐數（預設 1）
+    """
+    try:
+        user_id = request.args.get('user_id', type=int) or TEMP_USER_ID
+        k = request.args.get('k', 10, type=int)
+        categories = request.args.get('categories', '').split(',') if request.args.get('categories') else []
+        categories = [c.strip() for c in categories if c.strip()]
+        max_price = request.args.get('max_price', type=float)
+        vegetarian = request.args.get('vegetarian', 'false').lower() == 'true'
+        meals_left = request.args.get('meals_left', 1, type=int)
+
+        result = _get_recommendation_service().recommend(
+            user_id=user_id,
+            k=k,
+            categories=categories if categories else None,
+            max_price=max_price,
+            vegetarian=vegetarian,
+            meals_left=meals_left
+        )
+
+        return jsonify({
+            "success": True,
+            "data": result['items'],
+            "remaining": result['remaining'],
+            "targets": result['targets']
+        }), 200
+
+    except Exception as e:
+        ERROR_PRINT(f"[ERROR] 取得推薦時發生錯誤: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "無法取得推薦"
+        }), 500
+
+
+@frontend_bp.route('/api/meal-plan', methods=['GET'])
+def get_meal_plan():
+    """
+    規劃一日三餐（依使用者營養目標與預算）
+
+    GET 參數:
+        user_id: 使用者 ID（可選，預設使用臨時 ID）
+        vegetarian: 是否素食 (true/false)
+        daily_budget: 每日預算上限（可選，預設為單餐預算 x 3）
+        time_budget_ms: 規劃時間上限（毫秒，預設 50，需大於 0，最多 200）
+    """
+    try:
+        user_id = request.args.get('user_id', type=int) or TEMP_USER_ID
+        vegetarian = request.args.get('vegetarian', 'false').lower() == 'true'
+        daily_budget = request.args.get('daily_budget', type=float)
+        time_budget_ms = request.args.get('time_budget_ms', 50.0, type=float)
+        if not time_budget_ms > 0:
+            return jsonify({
+                "success": False,
+                "error": "time_budget_ms 必須大於 0"
+            }), 400
+        time_budget_ms = min(time_budget_ms, 200.0)
+
+        result = _get_meal_plan_service().plan_for_user(
+            user_id=user_id,
+            vegetarian=vegetarian,
+            daily_budget=daily_budget,
+            time_budget_ms=time_budget_ms
+        )
+
+        return jsonify({
+            "success": True,
+            "data": result
+        }), 200
+
+    except Exception as e:
+        ERROR_PRINT(f"[ERROR] 規劃餐點時發生錯誤: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "無法規劃餐點"
+        }), 500
@@ -0,0 +1,11 @@
+"""
+Health 模組
+提供存活檢查（/healthz）與就緒檢查（/readyz），供負載平衡器與部署腳本使用
+"""
+
+from flask import Blueprint
+
+health_bp = Blueprint('health', __name__, url_prefix='')
+
+# 導入路由（必須在 Blueprint 創建之後）
+from . import routes
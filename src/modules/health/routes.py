@@ -0,0 +1,22 @@
+"""
+Health 模組的路由定義
+"""
+
+import os
+
+from flask import jsonify
+from . import health_bp
+from services.warmup import get_status
+
+
+@health_bp.route('/healthz')
+def healthz():
+    """存活檢查：程序能處理請求即返回 200"""
+    return jsonify({'success': True, 'status': 'ok', 'pid': os.getpid()}), 200
+
+
+@health_bp.route('/readyz')
+def readyz():
+    """就緒檢查：預熱完成前返回 503，完成後返回 200 與各步驟結果"""
+    status = get_status()
+    return jsonify({'success': status['ready'], 'pid': os.getpid(), **status}), 200 if status['ready'] else 503
@@ -0,0 +1,17 @@
+"""
+Blueprint 清單
+app 啟動時依此清單載入模組，不再掃描 modules 資料夾
+
+新增或移除模組後請重新產生：
+    python3 src/scripts/build_blueprint_manifest.py
+"""
+
+# (模組名稱, Blueprint 變數名稱)，依註冊順序排列
+BLUEPRINT_MANIFEST = (
+    ("admin", "admin_bp"),
+    ("frontend", "frontend_bp"),
+    ("health", "health_bp"),
+    ("home", "home_bp"),
+    ("metrics", "metrics_bp"),
+    ("user", "user_bp"),
+)
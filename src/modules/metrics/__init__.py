@@ -0,0 +1,11 @@
+"""
+Metrics 模組
+記錄每個請求的處理時間與回應大小，並提供 Prometheus 格式的 /metrics 端點（需 ADMIN_TOKEN）
+"""
+
+from flask import Blueprint
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='')
+
+# 導入路由（必須在 Blueprint 創建之後）
+from . import routes
@@ -0,0 +1,41 @@
+"""
+Metrics 模組的路由定義
+"""
+
+import time
+
+from flask import Response, g, request
+from . import metrics_bp
+from modules.admin.routes import admin_required
+from services.metrics import REGISTRY, HTTP_REQUEST_DURATION, HTTP_RESPONSE_SIZE
+
+
+@metrics_bp.before_app_request
+def _start_timer():
+    """記錄請求開始時間（套用於所有 Blueprint）"""
+    g._request_started = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def _record_request(response):
+    """記錄路由處理時間與回應大小"""
+    started = g.pop('_request_started', None)
+    if started is None:
+        return response
+
+    # 使用路由規則（例如 /api/stores/<store_id>）作為標籤，避免標籤數量無限增長
+    endpoint = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - started, request.method, endpoint, str(response.status_code)
+    )
+    # 串流回應沒有固定長度，不記錄大小
+    if not response.is_streamed and response.content_length is not None:
+        HTTP_RESPONSE_SIZE.observe(response.content_length, request.method, endpoint)
+    return response
+
+
+@metrics_bp.route('/metrics')
+@admin_required
+def metrics():
+    """Prometheus 文字格式的指標（需 ADMIN_TOKEN；多個 worker 時為全部 worker 的總和）"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -1,6 +1,7 @@
 from flask import request, jsonify, session
 from . import user_bp
 from services.user_service import UserService
+from utils.debug import DEBUG_PRINT, INFO_PRINT, ERROR_PRINT
 
 user_service = UserService()
 
@@ -40,10 +41,9 @@ def register():
 
 @user_bp.route('/login', methods=['POST'])
 def login():
-    print("DEBUG: Login request received")
+    DEBUG_PRINT("[DEBUG] 收到登入請求")
     try:
         data = request.get_json()
-        print(f"DEBUG: Login data: {data}")
         if not data:
             return jsonify({'error': 'No input data provided'}), 400
             
@@ -55,17 +55,15 @@ def login():
             
         user = user_service.verify_user(username, password)
         if user:
-            print(f"DEBUG: Login successful for {username}")
+            INFO_PRINT("[OK] 使用者登入成功", user=username)
             session['user_id'] = user['userID']
             session['username'] = user['username']
             return jsonify({'message': 'Login successful', 'user': user}), 200
         else:
-            print(f"DEBUG: Login failed for {username}")
+            DEBUG_PRINT("[DEBUG] 使用者登入失敗", user=username)
             return jsonify({'error': 'Invalid username or password'}), 401
     except Exception as e:
-        print(f"DEBUG: Login exception: {e}")
-        import traceback
-        traceback.print_exc()
+        ERROR_PRINT("[ERROR] 登入時發生錯誤:", e, exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
 @user_bp.route('/logout', methods=['POST', 'GET'])
@@ -84,3 +82,42 @@ def profile():
         return jsonify(user), 200
     else:
         return jsonify({'error': 'User not found'}), 404
+
+# 請求欄位（與註冊相同的命名）-> update_profile 的參數
+PROFILE_REQUEST_FIELDS = {
+    'mode': 'mode',
+    'budget': 'budget',
+    'targetCalories': 'target_calories',
+    'targetProtein': 'target_protein',
+    'targetFat': 'target_fat',
+}
+
+@user_bp.route('/profile', methods=['PUT'])
+def update_profile():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'No input data provided'}), 400
+
+    fields = {}
+    for key, param in PROFILE_REQUEST_FIELDS.items():
+        if key not in data:
+            continue
+        value = data[key]
+        if key == 'mode':
+            if value not in ('NORMAL', 'FITNESS'):
+                return jsonify({'error': 'mode must be NORMAL or FITNESS'}), 400
+        elif value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            return jsonify({'error': f'{key} must be a non-negative number'}), 400
+        fields[param] = value
+
+    try:
+        if not user_service.update_profile(user_id, **fields):
+            return jsonify({'error': 'User not found'}), 404
+        return jsonify(user_service.get_user_by_id(user_id)), 200
+    except Exception as e:
+        ERROR_PRINT("[ERROR] 更新個人資料時發生錯誤:", e, exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+資料集載入效能測試
+產生指定筆數的合成 CSV 資料集，比較逐行解析 CSV 與對應已編譯二進位檔的載入時間（不需資料庫）
+
+使用方法：
+    python3 src/scripts/bench_dataset_load.py
+    python3 src/scripts/bench_dataset_load.py --menu-items 1000000 --restaurants 5000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from data.compiled_dataset import compile_dataset
+from data.sample_data import SampleData
+
+FOOD_TYPES = ["台式", "日式", "韓式", "美式", "義式"]
+VEGETARIAN_OPTIONS = ["葷食", "蛋奶素", "全素"]
+
+
+def write_dataset(path: str, restaurants: int, menu_items: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    with open(os.path.join(path, "restaurants.csv"), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "address", "averageRating", "priceRange", "foodType",
+                         "vegetarianOption", "latitude", "longitude"])
+        for i in range(1, restaurants + 1):
+            writer.writerow([
+                f"餐廳{i}", f"台中市西屯區逢甲路{i}號", round(rng.uniform(3, 5), 1), rng.randint(1, 3),
+                rng.choice(FOOD_TYPES), rng.choice(VEGETARIAN_OPTIONS),
+                round(24.17 + rng.random() * 0.02, 6), round(120.64 + rng.random() * 0.02, 6),
+            ])
+    with open(os.path.join(path, "menu_items.csv"), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["restaurantID", "name", "description", "price", "calories", "protein", "carbs", "fat"])
+        for i in range(menu_items):
+            writer.writerow([
+                rng.randint(1, restaurants), f"品項{i}", f"特製的品項{i}", float(rng.randint(30, 300)),
+                rng.randint(50, 1200), round(rng.uniform(0, 60), 1),
+                round(rng.uniform(0, 120), 1), round(rng.uniform(0, 60), 1),
+            ])
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="資料集載入效能測試")
+    parser.add_argument("--restaurants", type=int, default=5000, help="餐廳數量")
+    parser.add_argument("--menu-items", type=int, default=1000000, help="菜單項目數量")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dataset_path:
+        print(f"產生資料集：{args.restaurants} 間餐廳、{args.menu_items} 筆菜單 ...")
+        write_dataset(dataset_path, args.restaurants, args.menu_items)
+        size_mb = sum(os.path.getsize(os.path.join(dataset_path, name))
+                      for name in ("restaurants.csv", "menu_items.csv")) / 1e6
+
+        csv_restaurants, csv_ms = timed(lambda: SampleData._load_csv(dataset_path))
+        _, compile_ms = timed(lambda: compile_dataset(dataset_path))
+        compiled_size_mb = sum(entry.stat().st_size for entry in os.scandir(os.path.join(dataset_path, "compiled"))) / 1e6
+        bin_restaurants, bin_ms = timed(lambda: SampleData.load_restaurants(dataset_path))
+
+        # 確認兩種載入方式的內容一致（抽查）
+        for i in (0, len(csv_restaurants) // 2, len(csv_restaurants) - 1):
+            a, b = csv_restaurants[i], bin_restaurants[i]
+            assert (a.name, a.average_rating, len(a.menu_items)) == (b.name, b.average_rating, len(b.menu_items))
+            assert list(a.menu_items) == list(b.menu_items)
+
+        # 首次走訪所有菜單名稱（例如關鍵字搜尋）的成本
+        _, csv_scan_ms = timed(lambda: sum(len(item.name) for r in csv_restaurants for item in r.menu_items))
+        _, bin_scan_ms = timed(lambda: sum(len(item.name) for r in bin_restaurants for item in r.menu_items))
+
+        print(f"CSV 大小 {size_mb:.1f} MB，二進位檔 {compiled_size_mb:.1f} MB")
+        print(f"  CSV 解析載入     {csv_ms:9.1f} ms")
+        print(f"  編譯（一次性）   {compile_ms:9.1f} ms")
+        print(f"  二進位檔載入     {bin_ms:9.1f} ms")
+        print(f"  走訪所有菜單     CSV {csv_scan_ms:.1f} ms / 二進位 {bin_scan_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+地理索引效能測試
+以隨機分布的餐廳座標測量 GeoGridIndex 的半徑查詢與最近鄰查詢延遲（不需資料庫）
+
+使用方法：
+    python3 src/scripts/bench_geo_index.py
+    python3 src/scripts/bench_geo_index.py --restaurants 100000 --radius 0.5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from services.geo_index import GeoGridIndex
+
+# 以逢甲商圈為中心、約 20 x 20 公里的範圍
+CENTER = (24.1797, 120.6465)
+SPAN_DEGREES = 0.18
+
+
+def random_point(rng: random.Random):
+    return (
+        CENTER[0] + (rng.random() - 0.5) * SPAN_DEGREES,
+        CENTER[1] + (rng.random() - 0.5) * SPAN_DEGREES,
+    )
+
+
+def report(name: str, latencies):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"  {name}: p50 {p50 * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoGridIndex 效能測試")
+    parser.add_argument("--restaurants", type=int, default=100000, help="餐廳數量")
+    parser.add_argument("--queries", type=int, default=2000, help="查詢次數")
+    parser.add_argument("--radius", type=float, default=0.5, help="半徑查詢（公里）")
+    parser.add_argument("--k", type=int, default=20, help="最近鄰數量")
+    parser.add_argument("--cell", type=float, default=0.25, help="網格邊長（公里）")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    points = [(i + 1, *random_point(rng)) for i in range(args.restaurants)]
+
+    started = time.perf_counter()
+    index = GeoGridIndex(points, cell_km=args.cell)
+    print(f"建立索引（{len(index)} 間餐廳）: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    queries = [random_point(rng) for _ in range(args.queries)]
+    within, nearest = [], []
+    for lat, lng in queries:
+        started = time.perf_counter()
+        index.within_radius(lat, lng, args.radius)
+        within.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.nearest(lat, lng, args.k)
+        nearest.append(time.perf_counter() - started)
+
+    print(f"執行 {args.queries} 次查詢")
+    report(f"半徑 {args.radius} km", within)
+    report(f"最近 {args.k} 間", nearest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+每日餐點規劃效能測試
+以隨機產生的菜單目錄測量 plan_day() 的延遲（不需資料庫）
+
+使用方法：
+    python3 src/scripts/bench_meal_planner.py
+    python3 src/scripts/bench_meal_planner.py --items 100000 --runs 20 --time-budget 50
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from services.menu_catalog import MenuCatalog
+from services.meal_planner import plan_day
+
+FOOD_TYPES = ["台式", "日式", "義式", "健康餐", "飲品", "韓式"]
+VEGETARIAN_OPTIONS = ["葷食", "蛋奶素", "全素"]
+
+
+def generate_catalog(total_items: int, seed: int = 42) -> MenuCatalog:
+    """產生指定數量的隨機菜單目錄"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(total_items):
+        protein = rng.uniform(0, 50)
+        carbs = rng.uniform(0, 100)
+        fat = rng.uniform(0, 50)
+        rows.append({
+            "itemID": i + 1,
+            "restaurantID": i // 4 + 1,
+            "name": f"item_{i + 1}",
+            "restaurantName": f"restaurant_{i // 4 + 1}",
+            "foodType": FOOD_TYPES[(i // 4) % len(FOOD_TYPES)],
+            "vegetarianOption": VEGETARIAN_OPTIONS[(i // 4) % len(VEGETARIAN_OPTIONS)],
+            "price": round(rng.uniform(25, 300)),
+            "calories": round(protein * 4 + carbs * 4 + fat * 9),
+            "protein": protein,
+            "carbs": carbs,
+            "fat": fat,
+        })
+    return MenuCatalog.from_rows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="plan_day() 效能測試")
+    parser.add_argument("--items", type=int, default=100000, help="菜單項目數量")
+    parser.add_argument("--runs", type=int, default=20, help="執行次數")
+    parser.add_argument("--time-budget", type=float, default=50.0, help="時間上限（毫秒）")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    catalog = generate_catalog(args.items)
+    print(f"產生 {len(catalog)} 筆菜單項目: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    # 熱量排序索引在首次規劃時建立，單獨計時
+    started = time.perf_counter()
+    catalog.sorted_calories
+    print(f"建立熱量排序索引: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    rng = random.Random(7)
+    latencies = []
+    completed = 0
+    for _ in range(args.runs):
+        targets = {
+            "calories": rng.choice([1500, 1800, 2000, 2500]),
+            "protein": rng.choice([60, 90, 120]),
+            "fat": rng.choice([40, 55, 70]),
+        }
+        meal_budget = rng.choice([120, 180, 250])
+        started = time.perf_counter()
+        plan = plan_day(
+            catalog,
+            targets,
+            meal_budget=meal_budget,
+            daily_budget=meal_budget * 3,
+            time_budget_ms=args.time_budget,
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        completed += plan.complete
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"執行 {args.runs} 次（時間上限 {args.time_budget:.0f} ms）")
+    print(f"  中位數: {statistics.median(latencies):.2f} ms")
+    print(f"  p95:    {p95:.2f} ms")
+    print(f"  最大值: {latencies[-1]:.2f} ms")
+    print(f"  完整搜尋: {completed}/{args.runs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+產生 Blueprint 清單
+掃描 src/modules 底下的模組資料夾，寫入 src/modules/manifest.py，
+讓 app 啟動時不必再掃描資料夾
+
+使用方法：
+    python3 src/scripts/build_blueprint_manifest.py
+    python3 src/scripts/build_blueprint_manifest.py --check   # 只檢查清單是否過期
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from app import scan_modules
+
+MANIFEST_PATH = project_root / "src" / "modules" / "manifest.py"
+
+HEADER = '''"""
+Blueprint 清單
+app 啟動時依此清單載入模組，不再掃描 modules 資料夾
+
+新增或移除模組後請重新產生：
+    python3 src/scripts/build_blueprint_manifest.py
+"""
+
+# (模組名稱, Blueprint 變數名稱)，依註冊順序排列
+'''
+
+
+def render_manifest(modules) -> str:
+    lines = [HEADER, "BLUEPRINT_MANIFEST = (\n"]
+    for module_name in modules:
+        lines.append(f'    ("{module_name}", "{module_name}_bp"),\n')
+    lines.append(")\n")
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="產生 Blueprint 清單")
+    parser.add_argument("--check", action="store_true", help="清單過期時以非零狀態結束，不寫入檔案")
+    args = parser.parse_args()
+
+    content = render_manifest(scan_modules())
+    current = MANIFEST_PATH.read_text(encoding="utf-8") if MANIFEST_PATH.exists() else ""
+
+    if args.check:
+        if content != current:
+            print(f"[ERROR] {MANIFEST_PATH} 已過期，請重新執行此腳本")
+            sys.exit(1)
+        print("[OK] Blueprint 清單為最新")
+        return
+
+    MANIFEST_PATH.write_text(content, encoding="utf-8")
+    print(f"[OK] 已寫入 {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+編譯資料集
+將 dataset/ 的 restaurants.csv 與 menu_items.csv 轉為二進位檔（dataset/compiled/），
+app 載入時直接對應，CSV 變更後需重新執行（過期時 app 會自動改讀 CSV）
+
+使用方法：
+    python3 src/scripts/compile_dataset.py
+    python3 src/scripts/compile_dataset.py --dataset /path/to/dataset
+    python3 src/scripts/compile_dataset.py --check   # 只檢查是否需要重新編譯
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from data.compiled_dataset import compile_dataset, load_compiled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="將 CSV 資料集編譯為二進位檔")
+    parser.add_argument("--dataset", default=str(project_root / "dataset"), help="dataset 資料夾路徑")
+    parser.add_argument("--check", action="store_true", help="二進位檔不存在或過期時以非零狀態結束，不寫入檔案")
+    args = parser.parse_args()
+
+    if args.check:
+        if load_compiled(args.dataset) is None:
+            print("[ERROR] 編譯後的資料集不存在或已過期")
+            sys.exit(1)
+        print("[OK] 編譯後的資料集為最新")
+        return
+
+    started = time.perf_counter()
+    try:
+        counts = compile_dataset(args.dataset)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"[ERROR] 編譯失敗: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    for name, count in counts.items():
+        print(f"[OK] {name}: {count} 筆")
+    print(f"[OK] 完成（{elapsed:.2f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+啟動時間分析
+在全新的 Python 程序中載入 app，量測冷啟動時間（import app + 第一個請求），
+並以 python -X importtime 統計各套件的匯入時間（不需資料庫）
+
+使用方法：
+    python3 src/scripts/profile_startup.py
+    python3 src/scripts/profile_startup.py --runs 10 --path /api/stores --top 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# 將專案根目錄加入 Python 路徑
+project_root = Path(__file__).parent.parent.parent
+src_path = project_root / "src"
+
+# 子程序：量測 import app 與第一個請求的耗時，輸出一行 JSON
+_CHILD = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get({path!r})
+finished = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (finished - imported) * 1000,
+    "status": response.status_code,
+    "profile": app.app.config.get("STARTUP_PROFILE", []),
+}}))
+"""
+
+
+def run_child(path: str, importtime: bool = False):
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-c", _CHILD.format(path=path)]
+    result = subprocess.run(args, cwd=src_path, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def summarize_importtime(stderr: str, top: int):
+    """依最上層套件彙總 -X importtime 的 self 時間（微秒）"""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # 格式：import time:   self | cumulative | name
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="App 冷啟動時間分析")
+    parser.add_argument("--runs", type=int, default=5, help="重複次數")
+    parser.add_argument("--path", default="/", help="第一個請求的路徑")
+    parser.add_argument("--top", type=int, default=10, help="列出匯入時間最多的套件數")
+    args = parser.parse_args()
+
+    samples = [run_child(args.path)[0] for _ in range(args.runs)]
+    import_ms = [s["import_ms"] for s in samples]
+    request_ms = [s["first_request_ms"] for s in samples]
+    total_ms = [a + b for a, b in zip(import_ms, request_ms)]
+
+    print(f"冷啟動（{args.runs} 次，第一個請求 GET {args.path} -> {samples[-1]['status']}）")
+    print(f"  import app      median {statistics.median(import_ms):7.1f} ms")
+    print(f"  first request   median {statistics.median(request_ms):7.1f} ms")
+    print(f"  total           median {statistics.median(total_ms):7.1f} ms")
+
+    profile = samples[-1]["profile"]
+    if profile:
+        print("\ncreate_app 各步驟：")
+        for step, ms in profile:
+            print(f"  {step:<28} {ms:7.2f} ms")
+
+    _, stderr = run_child(args.path, importtime=True)
+    print("\n匯入時間（依套件彙總 self 時間）：")
+    for package, us in summarize_importtime(stderr, args.top):
+        print(f"  {package:<28} {us / 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
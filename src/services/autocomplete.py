@@ -0,0 +1,111 @@
+"""
+前綴自動完成
+將店名、菜名與類別正規化後依字典序排成陣列，前綴查詢以二分搜尋找出範圍，
+再取權重最高的幾筆。
+
+範圍很大的前綴（例如只輸入一個字）事先算好前 MAX_SUGGESTIONS 筆，
+其餘前綴的範圍不超過 SCAN_LIMIT 筆，查詢時直接掃描，
+因此查詢時間不隨資料量增加。
+"""
+
+import bisect
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from services.fuzzy_index import normalize
+
+MAX_SUGGESTIONS = 10
+
+# 範圍超過此筆數的前綴事先計算結果
+SCAN_LIMIT = 256
+
+SUGGESTION_RESTAURANT = "restaurant"
+SUGGESTION_MENU_ITEM = "menu_item"
+SUGGESTION_CATEGORY = "category"
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """建議項目"""
+    text: str
+    type: str
+    weight: float
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"text": self.text, "type": self.type}
+
+
+def _next_prefix(prefix: str) -> str:
+    # 字典序上緊接在所有以 prefix 開頭的字串之後的字串
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class AutocompleteIndex:
+    """
+    前綴自動完成索引
+
+    相同的 (文字, 類型) 合併為一筆，權重相加。建立後不再修改，可在多執行緒間共用。
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float]]):
+        """
+        Args:
+            entries: (文字, 類型, 權重) 序列
+        """
+        merged: Dict[Tuple[str, str], float] = {}
+        for text, kind, weight in entries:
+            if normalize(text):
+                merged[(text, kind)] = merged.get((text, kind), 0.0) + weight
+
+        items = sorted(
+            ((normalize(text), Suggestion(text, kind, weight)) for (text, kind), weight in merged.items()),
+            key=lambda item: item[0],
+        )
+        self._keys: List[str] = [key for key, _ in items]
+        self._suggestions: List[Suggestion] = [suggestion for _, suggestion in items]
+        self._top: Dict[str, Tuple[Suggestion, ...]] = {}
+        self._precompute()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _best(self, lo: int, hi: int, limit: int) -> List[Suggestion]:
+        return heapq.nlargest(limit, self._suggestions[lo:hi], key=lambda s: s.weight)
+
+    def _precompute(self) -> None:
+        # 由短到長找出範圍超過 SCAN_LIMIT 的前綴，每個前綴只處理一次
+        keys = self._keys
+        pending = [(0, len(keys), 0)]   # (lo, hi, 已共用的前綴長度)
+        while pending:
+            lo, hi, depth = pending.pop()
+            i = lo
+            while i < hi:
+                if len(keys[i]) <= depth:
+                    i += 1
+                    continue
+                prefix = keys[i][:depth + 1]
+                j = bisect.bisect_left(keys, _next_prefix(prefix), i, hi)
+                if j - i > SCAN_LIMIT:
+                    self._top[prefix] = tuple(self._best(i, j, MAX_SUGGESTIONS))
+                    pending.append((i, j, depth + 1))
+                i = j
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[Suggestion]:
+        """
+        取得以 prefix 開頭的建議（權重由高到低）
+
+        Args:
+            prefix: 使用者輸入的前綴（不分大小寫，忽略空白與標點）
+            limit: 最多返回筆數（不超過 MAX_SUGGESTIONS）
+        """
+        key = normalize(prefix)
+        if not key or limit <= 0:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        top = self._top.get(key)
+        if top is not None:
+            return list(top[:limit])
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, _next_prefix(key), lo)
+        return self._best(lo, hi, limit)
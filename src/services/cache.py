@@ -0,0 +1,268 @@
+"""
+快取工具
+提供以使用者為單位的快取（在該使用者的資料寫入時整組失效）、
+依資料版本失效的查詢結果快取，以及合併相同查詢的 SingleFlight
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from services.metrics import record_cache_lookup
+from utils.debug import WARN_PRINT
+
+
+class UserScopedCache:
+    """
+    以使用者為單位的快取
+
+    每位使用者各自保有一組 key -> value，
+    呼叫 invalidate(user_id) 會清除該使用者的所有項目。
+
+    失效只發生在寫入的程序內；多個 worker 時，提供 ttl_seconds
+    讓其他 worker 的項目最多保留這段時間。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries_per_user: int = 32,
+        max_users: int = 10000,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self._max_entries_per_user = max_entries_per_user
+        self._max_users = max_users
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        # {user_id: OrderedDict(key -> (value, 到期時間))}，外層同樣以 LRU 順序淘汰
+        self._data: "OrderedDict[int, OrderedDict[Hashable, Tuple[Any, float]]]" = OrderedDict()
+        _registry.append(self)
+
+    def get(self, user_id: int, key: Hashable) -> Optional[Any]:
+        """取得快取值，不存在或已過期時返回 None"""
+        with self._lock:
+            entries = self._data.get(user_id)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del entries[key]
+                record_cache_lookup(self.name, hit=False)
+                return None
+            self._data.move_to_end(user_id)
+            entries.move_to_end(key)
+            record_cache_lookup(self.name, hit=True)
+            return entry[0]
+
+    def set(self, user_id: int, key: Hashable, value: Any) -> None:
+        """寫入快取值"""
+        with self._lock:
+            entries = self._data.get(user_id)
+            if entries is None:
+                entries = OrderedDict()
+                self._data[user_id] = entries
+                if len(self._data) > self._max_users:
+                    self._data.popitem(last=False)
+            self._data.move_to_end(user_id)
+            expires_at = time.monotonic() + self._ttl if self._ttl is not None else float('inf')
+            entries[key] = (value, expires_at)
+            entries.move_to_end(key)
+            if len(entries) > self._max_entries_per_user:
+                entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """清除指定使用者的所有快取"""
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        """清除所有快取"""
+        with self._lock:
+            self._data.clear()
+
+
+# 所有已建立的 UserScopedCache，用於寫入時統一失效
+_registry: List[UserScopedCache] = []
+
+
+def invalidate_user(user_id: int) -> None:
+    """使指定使用者在所有 UserScopedCache 中的項目失效"""
+    for cache in _registry:
+        cache.invalidate(user_id)
+
+
+def get_user_caches() -> Dict[str, UserScopedCache]:
+    """取得所有已註冊的使用者快取（名稱 -> 快取）"""
+    return {cache.name: cache for cache in _registry}
+
+
+class _Call:
+    """進行中的計算，等待者共用其結果或例外"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    合併相同 key 的並行計算
+
+    同一個 key 同時只執行一次 func，其他同時呼叫的執行緒等待並取得相同的結果
+    （func 拋出例外時，所有等待者都收到同一個例外）；計算完成後不保留結果。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """執行或等待 key 對應的計算並返回結果"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class ResultCache:
+    """
+    查詢結果快取（LRU + TTL）
+
+    項目超過 max_entries 時淘汰最久未使用的，寫入超過 ttl_seconds 後視為過期。
+    查詢與寫入都帶資料版本：出現較新的版本時清除全部項目（資料已更新），
+    以較舊的版本查詢（查詢開始後資料才更新）一律未命中且不寫入。
+    快取的值由呼叫端保證不會被修改。
+
+    get_or_compute() 另外合併相同 key 的並行計算（SingleFlight），
+    並在過期後 stale_seconds 內先返回舊值、由背景執行緒重新計算（stale-while-revalidate）。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        ttl_seconds: float = 60.0,
+        stale_seconds: float = 0.0,
+    ):
+        self.name = name
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        # key -> (寫入時間, 值)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._refreshing: Set[Hashable] = set()
+
+    def _sync_version(self, version: int) -> bool:
+        # 呼叫端需持有鎖；返回此版本是否為目前版本
+        if self._version is None or version > self._version:
+            self._version = version
+            self._data.clear()
+        return version == self._version
+
+    def _lookup(self, key: Hashable, version: int) -> Tuple[Optional[Tuple[float, Any]], bool]:
+        # 呼叫端需持有鎖；返回 (項目, 是否已過期)，超過可使用舊值的期間時刪除
+        entry = self._data.get(key) if self._sync_version(version) else None
+        if entry is None:
+            return None, False
+        age = time.monotonic() - entry[0]
+        if age <= self._ttl_seconds:
+            self._data.move_to_end(key)
+            return entry, False
+        if age <= self._ttl_seconds + self._stale_seconds:
+            return entry, True
+        del self._data[key]
+        return None, False
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """取得快取值，不存在、過期或版本不符時返回 None"""
+        with self._lock:
+            entry, stale = self._lookup(key, version)
+            hit = entry is not None and not stale
+            record_cache_lookup(self.name, hit=hit)
+            return entry[1] if hit else None
+
+    def set(self, key: Hashable, version: int, value: Any) -> None:
+        """寫入快取值（版本較舊時忽略）"""
+        with self._lock:
+            if not self._sync_version(version):
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        """
+        取得快取值，未命中時計算並寫入
+
+        相同 key 的並行呼叫只執行一次 compute；項目已過期但仍在 stale_seconds 內時
+        直接返回舊值，並在背景重新計算（同一個 key 同時只有一個背景計算）。
+        compute 返回 None 時不寫入快取；compute 的例外會傳給所有等待的呼叫端。
+
+        Args:
+            key: 快取 key
+            version: 目前的資料版本
+            compute: 計算結果的函式（不帶參數）
+        """
+        with self._lock:
+            entry, stale = self._lookup(key, version)
+            if entry is not None and stale and key not in self._refreshing:
+                self._refreshing.add(key)
+                self._start_refresh(key, version, compute)
+        if entry is not None:
+            record_cache_lookup(self.name, hit=True, stale=stale)
+            return entry[1]
+        record_cache_lookup(self.name, hit=False)
+        return self._flight.do((key, version), lambda: self._compute(key, version, compute))
+
+    def _compute(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        value = compute()
+        if value is not None:
+            self.set(key, version, value)
+        return value
+
+    def _start_refresh(self, key: Hashable, version: int, compute: Callable[[], Any]) -> None:
+        # 背景執行緒沿用呼叫端的 contextvars（包含 Flask 的 app context，資料庫設定才讀得到）
+        context = contextvars.copy_context()
+
+        def refresh():
+            try:
+                self._flight.do((key, version), lambda: self._compute(key, version, compute))
+            except Exception as e:  # 重新計算失敗時保留舊值，下次過期再試
+                WARN_PRINT(f"[WARN] 背景更新快取 {self.name} 失敗:", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=context.run, args=(refresh,), name=f"{self.name}-refresh", daemon=True).start()
+
+    def clear(self) -> None:
+        """清除所有快取"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,179 @@
+"""
+跨程序共用的目錄快照
+把目錄寫成二進位資料表（見 data/binary_table.py），各 worker 以 mmap 對應同一個檔案，
+記憶體用量不隨 worker 數量增加。
+
+- 快照不存在時，只有取得檔案鎖的程序會從資料來源（資料庫）建立快照，
+  其他程序等待後直接對應，避免所有 worker 同時查詢資料庫
+- 更新時寫入新檔再 rename 原子取代；各程序每隔 SNAPSHOT_CHECK_INTERVAL 秒
+  檢查一次檔案是否已被取代，是則重新對應，進行中的請求仍使用舊的對應
+- 快照的 meta 記錄建立時資料來源的指紋；程序第一次取得快照與之後每隔
+  SNAPSHOT_VERIFY_INTERVAL 秒比對一次，指紋不符或快照超過 SNAPSHOT_MAX_AGE 秒時重建
+  （快照檔會保留到重新啟動之後，不能只在檔案不存在時才建立）
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from data.binary_table import MappedTable, TableFormatError, write_table
+from utils.debug import INFO_PRINT, WARN_PRINT
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover  Windows 沒有 flock，退回程序內的鎖
+    fcntl = None  # type: ignore
+
+# 檢查快照檔是否被取代的間隔（秒）
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
+# 與資料來源比對指紋的間隔，以及快照的最長使用時間（秒）
+SNAPSHOT_VERIFY_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_VERIFY_INTERVAL", "60"))
+SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "3600"))
+
+# 快照目錄（預設為專案根目錄的 cache/），設為空字串停用快照
+_DEFAULT_SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "cache"
+)
+SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", _DEFAULT_SNAPSHOT_DIR)
+
+# build() 返回 (筆數, 欄位, meta)，資料來源不可用時返回 None
+TableData = Tuple[int, Dict[str, Any], Dict[str, Any]]
+
+
+class SnapshotFile:
+    """
+    單一快照檔
+
+    Args:
+        name: 檔名（不含副檔名），位於 SNAPSHOT_DIR
+        build: 從資料來源產生表格內容的函式
+        fingerprint: 取得資料來源目前指紋的函式（可轉為 JSON 的值），
+                     資料來源不可用時返回 None（沿用現有快照）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[], Optional[TableData]],
+        fingerprint: Optional[Callable[[], Any]] = None,
+    ):
+        self.path = os.path.join(SNAPSHOT_DIR, f"{name}.bin") if SNAPSHOT_DIR else None
+        self._build = build
+        self._fingerprint = fingerprint
+        self._table: Optional[MappedTable] = None
+        self._checked_at = 0.0
+        self._verified_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def get(self, verify: bool = False) -> Optional[MappedTable]:
+        """
+        取得目前的快照
+
+        已對應且檔案未被取代時直接返回；快照不存在、與資料來源的指紋不符
+        或超過 SNAPSHOT_MAX_AGE 時重建。資料來源不可用時返回 None。
+
+        Args:
+            verify: 立即與資料來源比對指紋（不等到 SNAPSHOT_VERIFY_INTERVAL），
+                    供需要最新資料的呼叫端使用
+        """
+        table = self._table
+        if table is not None and not verify and time.monotonic() - self._checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return table
+
+        with self._lock:
+            now = time.monotonic()
+            self._checked_at = now
+            table = self._table
+            if table is None or self._replaced(table):
+                table = self._open()
+
+            fingerprint = None
+            if table is not None and (verify or now - self._verified_at >= SNAPSHOT_VERIFY_INTERVAL):
+                fingerprint = self._current_fingerprint()
+                if self._stale(table, fingerprint):
+                    table = None
+
+            if table is None:
+                with self._file_lock():
+                    # 等待鎖的期間其他程序可能已建立好最新的快照
+                    table = self._open()
+                    if table is None or self._stale(table, fingerprint):
+                        table = self._rebuild()
+            if table is not None:
+                self._table = table
+            return self._table
+
+    def refresh(self) -> Optional[MappedTable]:
+        """從資料來源重建快照並發布（其他程序會在下次檢查時切換）"""
+        with self._lock, self._file_lock():
+            table = self._rebuild()
+            if table is not None:
+                self._table = table
+                self._checked_at = time.monotonic()
+            return self._table
+
+    def _current_fingerprint(self) -> Any:
+        # 無論成功與否都記錄時間，資料來源不可用時不會每秒重試
+        self._verified_at = time.monotonic()
+        return self._fingerprint() if self._fingerprint is not None else None
+
+    @staticmethod
+    def _stale(table: MappedTable, fingerprint: Any) -> bool:
+        """快照是否需要重建（fingerprint 為 None 時只檢查使用時間）"""
+        if time.time() - table.meta.get("built_at", 0) > SNAPSHOT_MAX_AGE:
+            return True
+        return fingerprint is not None and table.meta.get("fingerprint") != fingerprint
+
+    def _replaced(self, table: MappedTable) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns) != table.identity
+
+    def _open(self) -> Optional[MappedTable]:
+        try:
+            return MappedTable(self.path)
+        except FileNotFoundError:
+            return None
+        except (OSError, TableFormatError, ValueError) as e:
+            WARN_PRINT(f"[WARN] 快照檔 {self.path} 無法讀取，將重新建立:", e)
+            return None
+
+    def _rebuild(self) -> Optional[MappedTable]:
+        # 先取指紋再讀資料：讀取期間的更新會讓下次比對不符而再重建，不會遺漏
+        fingerprint = self._current_fingerprint()
+        data = self._build()
+        if data is None:
+            return None
+        count, columns, meta = data
+        started = time.perf_counter()
+        write_table(self.path, count, columns, {
+            **meta, "fingerprint": fingerprint, "built_at": time.time(), "built_by": os.getpid(),
+        })
+        INFO_PRINT(
+            f"[OK] 已發布快照 {os.path.basename(self.path)}",
+            rows=count, ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return MappedTable(self.path)
+
+    @contextmanager
+    def _file_lock(self):
+        """跨程序的排他鎖（同目錄的 .lock 檔）"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,173 @@
+"""
+資料集熱更新
+監看 dataset/ 的 CSV（以 mtime 與大小輪詢），檔案變更後比對各列，
+只重建有變動的餐廳，再交給呼叫端以新版本整體替換。
+"""
+
+import csv
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from data.sample_data import Restaurant, SampleData
+from utils.debug import ERROR_PRINT, INFO_PRINT
+
+RESTAURANTS_CSV = "restaurants.csv"
+MENU_ITEMS_CSV = "menu_items.csv"
+
+# 輪詢間隔（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+Row = Dict[str, str]
+FileState = Tuple[int, int]  # (mtime_ns, size)
+
+
+@dataclass
+class DatasetChanges:
+    """一次更新的結果"""
+    restaurants: List[Restaurant]
+    changed: Set[str] = field(default_factory=set)   # 新增或內容變動的 restaurant_id
+    removed: Set[str] = field(default_factory=set)   # 已刪除的 restaurant_id
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+def _read_rows(path: str) -> List[Row]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _group_menu_rows(rows: List[Row]) -> Dict[str, List[Row]]:
+    grouped: Dict[str, List[Row]] = {}
+    for row in rows:
+        grouped.setdefault(row["restaurantID"], []).append(row)
+    return grouped
+
+
+class IncrementalDatasetLoader:
+    """
+    以列為單位比對 CSV 的載入器
+
+    保留上一版的原始列，新版本中內容相同的餐廳（含其菜單）直接沿用原本的物件，
+    只為變動的餐廳建立新物件。
+    """
+
+    def __init__(self, dataset_path: str):
+        self.dataset_path = dataset_path
+        self._restaurant_rows: List[Row] = []
+        self._menu_rows: Dict[str, List[Row]] = {}
+
+    def prime(self) -> None:
+        """讀取目前的 CSV 作為比對基準（資料本身由 SampleData 載入）"""
+        self._restaurant_rows = _read_rows(os.path.join(self.dataset_path, RESTAURANTS_CSV))
+        self._menu_rows = _group_menu_rows(_read_rows(os.path.join(self.dataset_path, MENU_ITEMS_CSV)))
+
+    def apply(self, restaurants: List[Restaurant]) -> DatasetChanges:
+        """
+        重新讀取 CSV 並與上一版比對
+
+        Args:
+            restaurants: 目前的餐廳列表（依 CSV 順序，不會被修改）
+
+        Returns:
+            新的餐廳列表與變動的 restaurant_id
+        """
+        restaurant_rows = _read_rows(os.path.join(self.dataset_path, RESTAURANTS_CSV))
+        menu_rows = _group_menu_rows(_read_rows(os.path.join(self.dataset_path, MENU_ITEMS_CSV)))
+
+        changes = DatasetChanges(restaurants=[])
+        for idx, row in enumerate(restaurant_rows, start=1):
+            rest_id = str(idx)  # CSV 沒有 ID，用行號當 ID
+            position = idx - 1
+            unchanged = (
+                position < len(restaurants)
+                and position < len(self._restaurant_rows)
+                and self._restaurant_rows[position] == row
+                and self._menu_rows.get(rest_id) == menu_rows.get(rest_id)
+            )
+            if unchanged:
+                changes.restaurants.append(restaurants[position])
+                continue
+            menu_items = [SampleData.menu_item_from_row(item) for item in menu_rows.get(rest_id, [])]
+            restaurant = SampleData.restaurant_from_row(idx, row, menu_items)
+            changes.restaurants.append(restaurant)
+            changes.changed.add(restaurant.restaurant_id)
+
+        changes.removed = {r.restaurant_id for r in restaurants[len(restaurant_rows):]}
+
+        # 全部解析成功後才更新比對基準
+        self._restaurant_rows = restaurant_rows
+        self._menu_rows = menu_rows
+        return changes
+
+
+class DatasetWatcher:
+    """
+    以背景執行緒輪詢 dataset/ 的 CSV
+
+    檔案的 (mtime, 大小) 改變後，等到連續兩次輪詢都不再變動（寫入完成）才呼叫 on_change。
+    """
+
+    def __init__(
+        self,
+        dataset_path: str,
+        on_change: Callable[[], None],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        files: Tuple[str, ...] = (RESTAURANTS_CSV, MENU_ITEMS_CSV),
+    ):
+        self._paths = [os.path.join(dataset_path, name) for name in files]
+        self._on_change = on_change
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last = self._snapshot()
+
+    def _snapshot(self) -> Tuple[Optional[FileState], ...]:
+        states = []
+        for path in self._paths:
+            try:
+                stat = os.stat(path)
+                states.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                states.append(None)
+        return tuple(states)
+
+    def start(self) -> "DatasetWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self) -> bool:
+        """檢查一次，檔案已變更且寫入完成時呼叫 on_change 並返回 True"""
+        current = self._snapshot()
+        if current == self._last:
+            return False
+        # 等待一個間隔確認檔案不再變動
+        if self._stop.wait(self._interval):
+            return False
+        settled = self._snapshot()
+        if settled != current:
+            return False
+        self._last = settled
+        started = time.perf_counter()
+        try:
+            self._on_change()
+        except Exception as e:  # 更新失敗時保留舊版本，等下次檔案變更再試
+            ERROR_PRINT("[ERROR] 資料集熱更新失敗:", e, exc_info=True)
+            return False
+        INFO_PRINT("[OK] 資料集已熱更新", ms=round((time.perf_counter() - started) * 1000, 1))
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.poll()
@@ -2,32 +2,64 @@
 from __future__ import annotations
 
 import os
+import re
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, List
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, List
 
 from flask import current_app
 from werkzeug.security import check_password_hash
 
-try:
-    import mariadb
-except ImportError:  # pragma: no cover
-    mariadb = None  # type: ignore
+from services.metrics import DB_CONNECTION_ACQUIRE, DB_QUERY_DURATION, DB_QUERY_ERRORS
+from services.slow_query import SLOW_QUERY_LOG
+
+# mariadb 驅動在第一次使用時才匯入（縮短啟動時間），未安裝時為 None
+mariadb = None  # type: ignore
+_driver_loaded = False
 
 
 class DatabaseError(RuntimeError):
     """自訂例外"""
 
 
+class DuplicateKeyError(DatabaseError):
+    """違反 UNIQUE 或主鍵限制（例如使用者名稱重複）"""
+
+
+class ForeignKeyError(DatabaseError):
+    """違反外鍵限制（例如參照的菜單項目已被刪除）"""
+
+
+# MariaDB 的重複鍵錯誤碼（ER_DUP_ENTRY）
+_ER_DUP_ENTRY = 1062
+# 新增或修改的資料參照不存在的列（ER_NO_REFERENCED_ROW / ER_NO_REFERENCED_ROW_2）
+_ER_NO_REFERENCED_ROW = (1216, 1452)
+
+
 @dataclass
 class User:
     id: int
     username: str
 
 
+def _load_driver():
+    """匯入 mariadb 驅動（只嘗試一次）"""
+    global mariadb, _driver_loaded
+    if not _driver_loaded:
+        try:
+            import mariadb as driver
+        except ImportError:  # pragma: no cover
+            driver = None
+        mariadb = driver
+        _driver_loaded = True
+    return mariadb
+
+
 def driver_available() -> bool:
     """確認驅動是否安裝"""
-    return mariadb is not None
+    return _load_driver() is not None
 
 
 def _get_db_config() -> Dict[str, Any]:
@@ -56,15 +88,102 @@ def get_connection():
     config = _get_db_config()
     conn = None
     try:
+        started = time.perf_counter()
         conn = mariadb.connect(**config)
+        DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started)
         yield conn
     except mariadb.Error as exc:  # type: ignore[union-attr]
+        errno = getattr(exc, "errno", None)
+        if errno == _ER_DUP_ENTRY:
+            raise DuplicateKeyError(str(exc)) from exc
+        if errno in _ER_NO_REFERENCED_ROW:
+            raise ForeignKeyError(str(exc)) from exc
         raise DatabaseError(str(exc)) from exc
     finally:
         if conn:
             conn.close()
 
 
+class Transaction:
+    """
+    交易中的查詢介面（由 transaction() 建立）
+
+    所有查詢共用同一個連線與 cursor，在區塊結束時一起提交或回復。
+    查詢結果一律先讀完（buffered），同一個交易中可以交錯讀取與寫入。
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.cursor(dictionary=True, buffered=True)
+
+    def execute(self, query: str, params: tuple = ()) -> int:
+        """執行 INSERT/UPDATE/DELETE 並返回影響的行數"""
+        with _timed("transaction", query, self._conn, params) as stats:
+            self._cursor.execute(query, params)
+            stats["rows"] = self._cursor.rowcount
+        return self._cursor.rowcount
+
+    def execute_returning_id(self, query: str, params: tuple = ()) -> int:
+        """執行 INSERT 並返回新插入的 ID"""
+        self.execute(query, params)
+        return self._cursor.lastrowid
+
+    def execute_many(self, query: str, params_seq: List[tuple]) -> int:
+        """以 executemany 批次執行同一個 INSERT/UPDATE，返回影響的行數"""
+        if not params_seq:
+            return 0
+        with _timed("transaction", query) as stats:
+            self._cursor.executemany(query, params_seq)
+            stats["rows"] = self._cursor.rowcount
+        return self._cursor.rowcount
+
+    def fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """執行查詢並返回所有結果（字典列表）"""
+        with _timed("transaction", query, self._conn, params) as stats:
+            self._cursor.execute(query, params)
+            results = self._cursor.fetchall() or []
+            stats["rows"] = len(results)
+        return results
+
+    def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        """執行查詢並返回單一結果（字典）"""
+        with _timed("transaction", query, self._conn, params) as stats:
+            self._cursor.execute(query, params)
+            result = self._cursor.fetchone()
+            stats["rows"] = 1 if result else 0
+        return result
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+@contextmanager
+def transaction() -> Iterator[Transaction]:
+    """
+    在單一連線上執行多個查詢，區塊正常結束時提交，拋出例外時回復
+
+    用法:
+        with transaction() as tx:
+            tx.execute("UPDATE ...", (...))
+            new_id = tx.execute_returning_id("INSERT ...", (...))
+
+    區塊內的 mariadb 錯誤轉為 DatabaseError（重複鍵為 DuplicateKeyError，外鍵為 ForeignKeyError）。
+    """
+    with get_connection() as conn:
+        tx = Transaction(conn)
+        try:
+            yield tx
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except mariadb.Error:  # type: ignore[union-attr]  # 連線已中斷時保留原本的例外
+                pass
+            raise
+        finally:
+            tx.close()
+
+
 def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     """驗證使用者帳密，使用參數化查詢避免 SQL injection"""
     # 資料表欄位與 SQL 腳本一致：userID、hashedPassword
@@ -91,45 +210,165 @@ def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+# ==================== 查詢統計 ====================
+
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+`?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _query_table(query: str) -> str:
+    """取出查詢的主要資料表名稱（作為指標標籤）"""
+    match = _TABLE_PATTERN.search(query)
+    return match.group(1) if match else "unknown"
+
+
+@contextmanager
+def _timed(helper: str, query: str, conn=None, params: tuple = ()):
+    """
+    記錄查詢時間與失敗次數；超過慢查詢門檻時連同 EXPLAIN 記錄到 SLOW_QUERY_LOG
+
+    呼叫端將返回或影響的筆數寫入 yield 出來的 dict 的 "rows"。
+    """
+    table = _query_table(query)
+    info: Dict[str, Any] = {"rows": None}
+    started = time.perf_counter()
+    try:
+        yield info
+    except Exception:
+        DB_QUERY_ERRORS.inc(helper, table)
+        DB_QUERY_DURATION.observe(time.perf_counter() - started, helper, table)
+        raise
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    DB_QUERY_DURATION.observe(elapsed_ms / 1000, helper, table)
+    if conn is not None and SLOW_QUERY_LOG.is_slow(elapsed_ms):
+        SLOW_QUERY_LOG.record(
+            query, elapsed_ms, info["rows"],
+            explain=lambda explain_query: _explain(conn, explain_query, params),
+        )
+
+
+def _explain(conn, explain_query: str, params: tuple) -> List[Dict[str, Any]]:
+    """在同一個連線上執行 EXPLAIN"""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(explain_query, params)
+        return cursor.fetchall() or []
+    finally:
+        cursor.close()
+
+
 # ==================== 通用查詢函式 ====================
 
 def fetch_all(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
     """執行查詢並返回所有結果（字典列表）"""
-    with get_connection() as conn:
+    with get_connection() as conn, _timed("fetch_all", query, conn, params) as stats:
         cursor = conn.cursor(dictionary=True)
         cursor.execute(query, params)
         results = cursor.fetchall()
+        stats["rows"] = len(results) if results else 0
         cursor.close()
     return results if results else []
 
 
 def fetch_one(query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
     """執行查詢並返回單一結果（字典）"""
-    with get_connection() as conn:
+    with get_connection() as conn, _timed("fetch_one", query, conn, params) as stats:
         cursor = conn.cursor(dictionary=True)
         cursor.execute(query, params)
         result = cursor.fetchone()
+        stats["rows"] = 1 if result else 0
         cursor.close()
     return result
 
 
+# fetch_iter / fetch_batches 每次從伺服器取回的預設筆數與可用的列格式
+DEFAULT_FETCH_SIZE = 1000
+ROW_TYPES = ("dict", "tuple", "namedtuple")
+
+
+def fetch_batches(
+    query: str,
+    params: tuple = (),
+    batch_size: int = DEFAULT_FETCH_SIZE,
+    row_type: str = "dict",
+) -> Iterator[List[Any]]:
+    """
+    以非緩衝（server-side）cursor 執行查詢，每次產生最多 batch_size 筆的列表
+
+    連線在迭代期間保持開啟，記憶體用量只與 batch_size 有關；迭代結束或呼叫 close() 時釋放連線
+    （提早結束時驅動會先讀完剩餘的結果）。迭代期間這個連線不能執行其他查詢。
+    查詢時間只記錄到開始取得結果為止（不含呼叫端處理的時間），也不做慢查詢的 EXPLAIN。
+
+    Args:
+        batch_size: 每次取回的筆數
+        row_type: 列的格式，"dict"（預設）、"tuple" 或 "namedtuple"（欄位可用屬性存取）
+    """
+    return _fetch_batches("fetch_batches", query, params, batch_size, row_type)
+
+
+def _fetch_batches(helper: str, query: str, params: tuple, batch_size: int, row_type: str) -> Iterator[List[Any]]:
+    """fetch_batches / fetch_iter 的共用實作，helper 為查詢指標上的標籤"""
+    if row_type not in ROW_TYPES:
+        raise ValueError(f"row_type 需為 {', '.join(ROW_TYPES)} 之一")
+    with get_connection() as conn:
+        cursor = conn.cursor(
+            dictionary=row_type == "dict", named_tuple=row_type == "namedtuple", buffered=False
+        )
+        try:
+            with _timed(helper, query):
+                cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+
+
+def fetch_iter(
+    query: str,
+    params: tuple = (),
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+    row_type: str = "dict",
+) -> Iterator[Any]:
+    """逐筆產生查詢結果，參數與限制同 fetch_batches()"""
+    batches = _fetch_batches("fetch_iter", query, params, fetch_size, row_type)
+    try:
+        for batch in batches:
+            yield from batch
+    finally:
+        batches.close()
+
+
 def execute(query: str, params: tuple = ()) -> int:
     """執行 INSERT/UPDATE/DELETE 並返回影響的行數"""
-    with get_connection() as conn:
+    with get_connection() as conn, _timed("execute", query, conn, params) as stats:
         cursor = conn.cursor()
         cursor.execute(query, params)
         conn.commit()
         affected = cursor.rowcount
+        stats["rows"] = affected
         cursor.close()
     return affected
 
 
+def execute_many(query: str, params_seq: List[tuple]) -> int:
+    """以 executemany 批次執行同一個 INSERT/UPDATE（單一交易，失敗時整批回復），返回影響的行數"""
+    if not params_seq:
+        return 0
+    with transaction() as tx:
+        return tx.execute_many(query, params_seq)
+
+
 def execute_returning_id(query: str, params: tuple = ()) -> int:
     """執行 INSERT 並返回新插入的 ID"""
-    with get_connection() as conn:
+    with get_connection() as conn, _timed("execute_returning_id", query, conn, params) as stats:
         cursor = conn.cursor()
         cursor.execute(query, params)
         conn.commit()
         last_id = cursor.lastrowid
+        stats["rows"] = cursor.rowcount
         cursor.close()
     return last_id
@@ -0,0 +1,235 @@
+"""
+飲食記錄匯入
+讀取上傳的 CSV 或 NDJSON（包含本系統 /api/diet/export 的輸出），逐行解析、
+以記憶體中的菜單目錄將菜名對應到 itemID，每 IMPORT_CHUNK_SIZE 筆驗證後以 executemany 批次寫入。
+
+每一批各自是一個交易：一批寫入失敗只影響該批，錯誤逐行回報，不中斷整個匯入。
+匯入前先確認菜單目錄與資料庫一致；驗證後才被刪除的菜單項目造成外鍵錯誤時，
+只把參照該項目的行記為失敗，其餘的行重新寫入。
+上傳檔案由 werkzeug 暫存（大檔案在磁碟），解析時逐行讀取，記憶體用量不隨檔案大小增加。
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from services.cache import invalidate_user
+from services.db import execute_many, fetch_all, DatabaseError, ForeignKeyError
+from services.fuzzy_index import normalize
+from services.menu_catalog import MenuCatalog, MenuCatalogService
+from utils.debug import ERROR_PRINT
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# 每批驗證與寫入的筆數（一批一個交易）
+IMPORT_CHUNK_SIZE = 500
+
+# 回應中最多列出的錯誤數（其餘只計入 failed）
+MAX_REPORTED_ERRORS = 100
+
+# 份量倍數的範圍
+MAX_PORTION_SIZE = 20.0
+
+_INSERT_QUERY = """
+    INSERT INTO diet_logs (userID, itemID, timestamp, portionSize)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+class ImportRowError(ValueError):
+    """單行資料不正確"""
+
+
+@dataclass
+class ImportResult:
+    """匯入結果"""
+    imported: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)  # [{"row": 行號, "error": 原因}]
+
+    def add_error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _read_records(stream: IO[bytes], import_format: str) -> Iterator[Tuple[int, Any]]:
+    """逐行讀取檔案，產生 (行號, 記錄)；NDJSON 無法解析的行以 ImportRowError 作為記錄"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = ImportRowError("不是有效的 JSON")
+        if not isinstance(record, (dict, ImportRowError)):
+            record = ImportRowError("每行需為一個 JSON 物件")
+        yield line_number, record
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if not value:
+        raise ImportRowError("缺少 timestamp")
+    try:
+        timestamp = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ImportRowError(f"timestamp 格式不正確: {value}") from None
+    # 帶時區的時間轉為伺服器當地時間（資料表為 DATETIME）
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def _parse_portion(value: Any) -> float:
+    if value is None or value == '':
+        return 1.0
+    try:
+        portion = float(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"portion_size 不是數字: {value}") from None
+    if not 0 < portion <= MAX_PORTION_SIZE:
+        raise ImportRowError(f"portion_size 需介於 0 ~ {MAX_PORTION_SIZE:g}")
+    return portion
+
+
+def _resolve_item(catalog: MenuCatalog, record: Dict[str, Any]) -> int:
+    """以 item_id，或 item_name（加上可選的 restaurant_name）找出菜單項目"""
+    item_id = record.get('item_id')
+    if item_id not in (None, ''):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            raise ImportRowError(f"item_id 不是整數: {item_id}") from None
+        if item_id not in catalog.positions_by_item_id:
+            raise ImportRowError(f"找不到菜單項目 {item_id}")
+        return item_id
+
+    name = normalize(str(record.get('item_name') or ''))
+    if not name:
+        raise ImportRowError("缺少 item_id 或 item_name")
+    positions = catalog.positions_by_name.get(name, ())
+    restaurant = normalize(str(record.get('restaurant_name') or ''))
+    if restaurant:
+        positions = [i for i in positions if normalize(catalog.restaurant_names[i]) == restaurant]
+    if not positions:
+        raise ImportRowError(f"找不到菜單項目: {record.get('item_name')}")
+    if len(positions) > 1:
+        raise ImportRowError(f"多間餐廳有「{record.get('item_name')}」，請提供 restaurant_name")
+    return catalog.item_ids[positions[0]]
+
+
+def _validate(catalog: MenuCatalog, user_id: int, record: Any) -> tuple:
+    """將一筆記錄轉為 INSERT 的參數，不正確時拋出 ImportRowError"""
+    if isinstance(record, ImportRowError):
+        raise record
+    return (
+        user_id,
+        _resolve_item(catalog, record),
+        _parse_timestamp(record.get('timestamp')),
+        _parse_portion(record.get('portion_size')),
+    )
+
+
+def _missing_item_ids(chunk: List[Tuple[int, tuple]]) -> Set[int]:
+    """批次中已不存在於資料庫的 itemID"""
+    item_ids = sorted({params[1] for _, params in chunk})
+    placeholders = ','.join('?' for _ in item_ids)
+    rows = fetch_all(f"SELECT itemID FROM menu_items WHERE itemID IN ({placeholders})", tuple(item_ids))
+    return set(item_ids) - {row['itemID'] for row in rows}
+
+
+def _flush(chunk: List[Tuple[int, tuple]], result: ImportResult, retry: bool = True) -> None:
+    # 一批一個交易；失敗時整批回復。外鍵錯誤時排除參照已刪除菜單項目的行再寫入一次，
+    # 其他錯誤（或重試仍失敗）時該批每一行都記為失敗
+    if not chunk:
+        return
+    try:
+        execute_many(_INSERT_QUERY, [params for _, params in chunk])
+        result.imported += len(chunk)
+        return
+    except ForeignKeyError as e:
+        error = e
+        if retry:
+            try:
+                missing = _missing_item_ids(chunk)
+            except DatabaseError as lookup_error:
+                error, missing = lookup_error, set()
+            if missing:
+                remaining = []
+                for row, params in chunk:
+                    if params[1] in missing:
+                        result.add_error(row, f"找不到菜單項目 {params[1]}")
+                    else:
+                        remaining.append((row, params))
+                _flush(remaining, result, retry=False)
+                return
+    except DatabaseError as e:
+        error = e
+    ERROR_PRINT("[ERROR] 匯入飲食記錄批次失敗:", error)
+    for row, _ in chunk:
+        result.add_error(row, "寫入資料庫失敗")
+
+
+def import_diet_logs(
+    user_id: int,
+    stream: IO[bytes],
+    import_format: str = 'csv',
+    catalog: Optional[MenuCatalog] = None,
+) -> ImportResult:
+    """
+    匯入飲食記錄
+
+    每筆需要 timestamp（ISO 8601）與 item_id 或 item_name（同名的菜屬於多間餐廳時需加上
+    restaurant_name），portion_size 可省略（預設 1.0）；其他欄位忽略。
+
+    Args:
+        user_id: 使用者 ID
+        stream: 上傳檔案的位元組串流（UTF-8，可含 BOM）
+        import_format: 'csv' 或 'ndjson'
+        catalog: 菜單目錄，預設為 MenuCatalogService 的共用目錄（先與資料庫比對，確保包含最新的菜單）
+
+    Returns:
+        ImportResult（成功筆數與逐行的錯誤）
+    """
+    if catalog is None:
+        catalog = MenuCatalogService.get_catalog(verify=True)
+
+    result = ImportResult()
+    chunk: List[Tuple[int, tuple]] = []
+    row = 0
+    try:
+        for row, record in _read_records(stream, import_format):
+            try:
+                chunk.append((row, _validate(catalog, user_id, record)))
+            except ImportRowError as e:
+                result.add_error(row, str(e))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _flush(chunk, result)
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # 檔案本身無法繼續解析：保留之前的結果，記錄後停止
+        message = "檔案不是 UTF-8 編碼" if isinstance(e, UnicodeDecodeError) else f"CSV 格式錯誤: {e}"
+        result.add_error(row + 1, message)
+    _flush(chunk, result)
+
+    if result.imported:
+        invalidate_user(user_id)
+    return result
@@ -3,10 +3,14 @@
 處理用戶的飲食記錄 CRUD
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
-from datetime import datetime
-from services.db import fetch_all, fetch_one, execute, execute_returning_id, driver_available, DatabaseError
+from datetime import date, datetime, timedelta
+from services.db import (
+    fetch_all, fetch_iter, fetch_one, execute, execute_returning_id, driver_available, DatabaseError,
+)
+from services.cache import UserScopedCache, invalidate_user
+from utils.debug import ERROR_PRINT
 
 
 @dataclass
@@ -27,8 +31,41 @@ class DietLog:
     fat: float = 0
 
 
+# 匯出時每次從資料庫取回的筆數
+EXPORT_FETCH_SIZE = 500
+
+# 今日營養總計快取的存活秒數（其他 worker 寫入後最多延遲這段時間）
+SUMMARY_CACHE_TTL = 60
+
+
+def _day_range(day: date) -> Tuple[datetime, datetime]:
+    """指定日期的時間範圍 [當天 00:00, 隔天 00:00)，可沿 (userID, timestamp) 索引查詢"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
 class DietService:
     """飲食記錄服務"""
+
+    # 每位使用者依日期的營養總計，在該使用者寫入飲食記錄時失效
+    _summary_cache = UserScopedCache('diet_summary', max_entries_per_user=2, ttl_seconds=SUMMARY_CACHE_TTL)
+    
+    @staticmethod
+    def _row_to_log(row: Dict[str, Any]) -> DietLog:
+        """將查詢結果（含菜單與餐廳欄位）轉為 DietLog"""
+        return DietLog(
+            log_id=row['logID'],
+            user_id=row['userID'],
+            item_id=row['itemID'],
+            timestamp=row['timestamp'],
+            portion_size=float(row['portionSize'] or 1.0),
+            item_name=row['itemName'] or '',
+            restaurant_name=row['restaurantName'] or '',
+            calories=int(row['calories'] or 0),
+            protein=float(row['protein'] or 0),
+            carbs=float(row['carbs'] or 0),
+            fat=float(row['fat'] or 0)
+        )
     
     @staticmethod
     def add_diet_log(user_id: int, item_id: int, portion_size: float = 1.0, timestamp: Optional[str] = None) -> Optional[int]:
@@ -45,26 +82,22 @@ class DietService:
             新記錄的 ID，失敗則返回 None
         """
         if not driver_available():
-            print("[ERROR] 資料庫驅動不可用")
+            ERROR_PRINT("[ERROR] 資料庫驅動不可用")
             return None
         
         try:
-            if timestamp:
-                query = """
-                    INSERT INTO diet_logs (userID, itemID, timestamp, portionSize)
-                    VALUES (?, ?, ?, ?)
-                """
-                log_id = execute_returning_id(query, (user_id, item_id, timestamp, portion_size))
-            else:
-                query = """
-                    INSERT INTO diet_logs (userID, itemID, timestamp, portionSize)
-                    VALUES (?, ?, NOW(), ?)
-                """
-                log_id = execute_returning_id(query, (user_id, item_id, portion_size))
+            # 未指定時間時使用應用程式的時鐘（而非資料庫的 NOW()），
+            # 與讀取時以 _day_range(date.today()) 計算的日期範圍一致，不受兩者時區不同影響
+            query = """
+                INSERT INTO diet_logs (userID, itemID, timestamp, portionSize)
+                VALUES (?, ?, ?, ?)
+            """
+            log_id = execute_returning_id(query, (user_id, item_id, timestamp or datetime.now(), portion_size))
+            invalidate_user(user_id)
             return log_id
             
         except DatabaseError as e:
-            print(f"[ERROR] 新增飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 新增飲食記錄失敗:", e)
             return None
     
     @staticmethod
@@ -116,9 +149,35 @@ class DietService:
             return logs
             
         except DatabaseError as e:
-            print(f"[ERROR] 讀取飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取飲食記錄失敗:", e)
             return []
 
+    @staticmethod
+    def iter_user_diet_logs(user_id: int, fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[DietLog]:
+        """
+        依時間順序逐筆讀取使用者的所有飲食記錄（匯出用）
+        
+        以 fetch_iter 讀取（非緩衝 cursor），每次只取回 fetch_size 筆，記憶體用量不隨記錄數增加。
+        連線在迭代期間保持開啟，迭代結束或呼叫 close() 時釋放；
+        與其他方法不同，DatabaseError 直接拋給呼叫端（串流途中無法改以空結果回應）。
+        
+        Args:
+            user_id: 使用者 ID
+            fetch_size: 每次取回的筆數
+        """
+        query = """
+            SELECT d.logID, d.userID, d.itemID, d.timestamp, d.portionSize,
+                   m.name as itemName, r.name as restaurantName,
+                   m.calories, m.protein, m.carbs, m.fat
+            FROM diet_logs d
+            JOIN menu_items m ON d.itemID = m.itemID
+            JOIN restaurants r ON m.restaurantID = r.restaurantID
+            WHERE d.userID = ?
+            ORDER BY d.timestamp, d.logID
+        """
+        for row in fetch_iter(query, (user_id,), fetch_size):
+            yield DietService._row_to_log(row)
+
     @staticmethod
     def get_date_diet_logs(user_id: int, date_str: str) -> List[DietLog]:
         """
@@ -167,16 +226,19 @@ class DietService:
             return logs
             
         except DatabaseError as e:
-            print(f"[ERROR] 讀取飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取飲食記錄失敗:", e)
             return []
     
     @staticmethod
-    def get_today_diet_logs(user_id: int) -> List[DietLog]:
+    def get_today_diet_logs(user_id: int, day: Optional[date] = None) -> List[DietLog]:
         """
         取得使用者今日的飲食記錄
         
+        「今日」以應用程式伺服器的日期為準（與 get_today_nutrition_summary 相同）。
+        
         Args:
             user_id: 使用者 ID
+            day: 日期，預設為今天
             
         Returns:
             今日飲食記錄列表
@@ -192,10 +254,10 @@ class DietService:
                 FROM diet_logs d
                 JOIN menu_items m ON d.itemID = m.itemID
                 JOIN restaurants r ON m.restaurantID = r.restaurantID
-                WHERE d.userID = ? AND DATE(d.timestamp) = CURDATE()
+                WHERE d.userID = ? AND d.timestamp >= ? AND d.timestamp < ?
                 ORDER BY d.timestamp DESC
             """
-            rows = fetch_all(query, (user_id,))
+            rows = fetch_all(query, (user_id, *_day_range(day or date.today())))
             
             logs = []
             for row in rows:
@@ -217,16 +279,21 @@ class DietService:
             return logs
             
         except DatabaseError as e:
-            print(f"[ERROR] 讀取今日飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取今日飲食記錄失敗:", e)
             return []
     
     @staticmethod
-    def get_today_nutrition_summary(user_id: int) -> Dict[str, float]:
+    def get_today_nutrition_summary(user_id: int, day: Optional[date] = None) -> Dict[str, float]:
         """
         取得使用者今日營養攝取總計
         
+        結果依日期快取，新增、刪除或修改飲食記錄時失效；跨日時以新的日期重新計算。
+        查詢的日期範圍與快取的 key 是同一個日期（應用程式伺服器的今天），
+        不使用資料庫的 CURDATE()，兩邊時鐘或時區不同時也不會把前一天的總計存成今天的。
+        
         Args:
             user_id: 使用者 ID
+            day: 日期，預設為今天（呼叫端的快取 key 也含日期時應傳入同一個值）
             
         Returns:
             營養攝取總計 dict
@@ -234,6 +301,11 @@ class DietService:
         if not driver_available():
             return {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
         
+        today = day or date.today()
+        cached = DietService._summary_cache.get(user_id, today)
+        if cached is not None:
+            return dict(cached)
+        
         try:
             query = """
                 SELECT 
@@ -243,22 +315,23 @@ class DietService:
                     COALESCE(SUM(m.fat * d.portionSize), 0) as totalFat
                 FROM diet_logs d
                 JOIN menu_items m ON d.itemID = m.itemID
-                WHERE d.userID = ? AND DATE(d.timestamp) = CURDATE()
+                WHERE d.userID = ? AND d.timestamp >= ? AND d.timestamp < ?
             """
-            row = fetch_one(query, (user_id,))
+            row = fetch_one(query, (user_id, *_day_range(today)))
             
-            if row:
-                return {
-                    'calories': float(row['totalCalories'] or 0),
-                    'protein': float(row['totalProtein'] or 0),
-                    'carbs': float(row['totalCarbs'] or 0),
-                    'fat': float(row['totalFat'] or 0)
-                }
+            summary = {
+                'calories': float(row['totalCalories'] or 0),
+                'protein': float(row['totalProtein'] or 0),
+                'carbs': float(row['totalCarbs'] or 0),
+                'fat': float(row['totalFat'] or 0)
+            } if row else {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
             
-            return {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
+            DietService._summary_cache.set(user_id, today, summary)
+            return dict(summary)
             
         except DatabaseError as e:
-            print(f"[ERROR] 計算今日營養攝取失敗: {e}")
+            # 失敗的結果不快取
+            ERROR_PRINT("[ERROR] 計算今日營養攝取失敗:", e)
             return {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
     
     @staticmethod
@@ -283,10 +356,12 @@ class DietService:
                 WHERE logID = ? AND userID = ?
             """
             affected = execute(query, (log_id, user_id))
+            if affected > 0:
+                invalidate_user(user_id)
             return affected > 0
             
         except DatabaseError as e:
-            print(f"[ERROR] 刪除飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 刪除飲食記錄失敗:", e)
             return False
     
     @staticmethod
@@ -312,8 +387,10 @@ class DietService:
                 WHERE logID = ? AND userID = ?
             """
             affected = execute(query, (portion_size, log_id, user_id))
+            if affected > 0:
+                invalidate_user(user_id)
             return affected > 0
             
         except DatabaseError as e:
-            print(f"[ERROR] 更新飲食記錄失敗: {e}")
+            ERROR_PRINT("[ERROR] 更新飲食記錄失敗:", e)
             return False
@@ -0,0 +1,146 @@
+"""
+模糊搜尋索引
+以字元 n-gram（預設為二元組，適合中文店名）建立倒排索引，容許錯字的名稱比對。
+
+字串前後補上空白再切 n-gram，開頭與結尾的字也各有兩個 n-gram 涵蓋，
+中間打錯一個字時仍保留過半的 n-gram（「珍株奶茶」與「珍珠奶茶」共有 3/5）。
+
+相似度以查詢的 n-gram 有多少比例出現在名稱中（涵蓋率）判斷是否符合，
+查詢不含邊界的 n-gram 全部出現時（名稱包含查詢字串）涵蓋率為 1；
+再依 Jaccard 係數微調，讓長度接近的名稱排在前面：
+    score = coverage * (1 - JACCARD_WEIGHT + JACCARD_WEIGHT * jaccard)
+
+查詢時由最少見的 n-gram 開始收集候選：名稱至少要有 ceil(threshold * q) 個相同的 n-gram，
+因此只需要掃描最少見的 q - ceil(threshold * q) + 1 個倒排列表（另加最少見的非邊界 n-gram，
+以涵蓋包含查詢字串的名稱），候選數另以 max_candidates 限制。
+"""
+
+import math
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple
+
+GRAM_SIZE = 2
+PAD = " "
+
+# 預設的涵蓋率門檻與候選名稱上限
+DEFAULT_THRESHOLD = 0.5
+MAX_CANDIDATES = 2000
+
+# 相似度中 Jaccard 係數所佔的比重
+JACCARD_WEIGHT = 0.25
+
+# 菜名相符時的權重（店名為 1.0）
+MENU_NAME_WEIGHT = 0.9
+
+
+def normalize(text: str) -> str:
+    """轉小寫並去除空白與標點"""
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def ngrams(text: str) -> FrozenSet[str]:
+    """正規化後前後補上 PAD 的字元 n-gram"""
+    text = normalize(text)
+    if not text:
+        return frozenset()
+    padded = PAD * (GRAM_SIZE - 1) + text + PAD * (GRAM_SIZE - 1)
+    return frozenset(padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1))
+
+
+def is_fuzzy_query(query: str) -> bool:
+    """查詢是否夠長可以做模糊比對（太短時呼叫端改用一般的關鍵字比對）"""
+    return len(normalize(query)) >= GRAM_SIZE
+
+
+class FuzzyIndex:
+    """
+    名稱的 n-gram 倒排索引
+
+    相同的名稱只索引一次（例如多家餐廳共有的菜名），比對後再展開到所屬的 key。
+    建立後不再修改，可在多執行緒間共用。
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Hashable, str, float]]):
+        """
+        Args:
+            entries: (key, 名稱, 權重) 序列；同一個 key 可以有多個名稱（例如店名與菜名），
+                     key 的分數取各名稱「相似度 x 權重」的最大值
+        """
+        text_ids: Dict[str, int] = {}
+        self._grams: List[FrozenSet[str]] = []
+        self._owners: List[List[Tuple[Hashable, float]]] = []
+        postings: Dict[str, List[int]] = {}
+
+        for key, text, weight in entries:
+            grams = ngrams(text)
+            if not grams:
+                continue
+            text = normalize(text)
+            text_id = text_ids.get(text)
+            if text_id is None:
+                text_id = text_ids[text] = len(self._grams)
+                self._grams.append(grams)
+                self._owners.append([])
+                for gram in grams:
+                    postings.setdefault(gram, []).append(text_id)
+            self._owners[text_id].append((key, weight))
+
+        self._postings: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        """不重複的名稱數"""
+        return len(self._grams)
+
+    def search(
+        self,
+        query: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> Dict[Hashable, float]:
+        """
+        模糊比對
+
+        Args:
+            query: 查詢字串
+            threshold: 涵蓋率門檻（0~1）
+            max_candidates: 最多比對的候選名稱數
+
+        Returns:
+            {key: 分數}，只包含涵蓋率達到門檻的 key
+        """
+        query_grams = ngrams(query)
+        if not query_grams:
+            return {}
+        inner = frozenset(gram for gram in query_grams if PAD not in gram)
+
+        # 由最少見的 n-gram 開始，只需掃描前 q - required + 1 個倒排列表
+        postings = {gram: self._postings.get(gram, ()) for gram in query_grams}
+        ordered = sorted(query_grams, key=lambda gram: len(postings[gram]))
+        required = max(1, math.ceil(threshold * len(query_grams)))
+        scan = ordered[:len(ordered) - required + 1]
+        if inner and inner.isdisjoint(scan):
+            scan.append(min(inner, key=lambda gram: len(postings[gram])))
+
+        candidates: Dict[int, None] = {}
+        for gram in scan:
+            for text_id in postings[gram]:
+                candidates[text_id] = None
+                if len(candidates) >= max_candidates:
+                    break
+            if len(candidates) >= max_candidates:
+                break
+
+        scores: Dict[Hashable, float] = {}
+        size = len(query_grams)
+        for text_id in candidates:
+            grams = self._grams[text_id]
+            shared = len(query_grams & grams)
+            coverage = 1.0 if inner and inner <= grams else shared / size
+            if coverage < threshold:
+                continue
+            jaccard = shared / (size + len(grams) - shared)
+            similarity = coverage * (1 - JACCARD_WEIGHT + JACCARD_WEIGHT * jaccard)
+            for key, weight in self._owners[text_id]:
+                score = similarity * weight
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+        return scores
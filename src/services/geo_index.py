@@ -0,0 +1,202 @@
+"""
+地理索引
+以固定大小的網格（grid）索引餐廳座標，支援半徑查詢與由近到遠的最近鄰查詢
+"""
+
+import heapq
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# 經緯度範圍向外多留的度數（約 1 公分），避免浮點誤差排除恰好在邊界上的點
+_BOX_MARGIN_DEGREES = 1e-7
+
+
+class GeoGridIndex:
+    """
+    網格地理索引
+
+    將座標依 cell_km 大小切成網格，查詢時只檢查與查詢圓相交的格子。
+    城市尺度（數十公里內）以等距柱狀投影計算距離，誤差遠小於顯示精度。
+    """
+
+    def __init__(self, points: Iterable[Tuple[Hashable, float, float]], cell_km: float = 0.5):
+        """
+        Args:
+            points: (key, latitude, longitude) 序列
+            cell_km: 網格邊長（公里）
+        """
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Hashable]]] = {}
+        self._coords: Dict[Hashable, Tuple[float, float]] = {}
+
+        points = [(key, float(lat), float(lng)) for key, lat, lng in points]
+        ref_lat = sum(lat for _, lat, _ in points) / len(points) if points else 0.0
+        self._lat_step = cell_km / KM_PER_DEGREE
+        self._lng_scale = math.cos(math.radians(ref_lat))
+        self._lng_step = cell_km / (KM_PER_DEGREE * self._lng_scale)
+        self._cell_km = cell_km
+
+        for key, lat, lng in points:
+            self._coords[key] = (lat, lng)
+            self._cells.setdefault(self._cell_of(lat, lng), []).append((lat, lng, key))
+
+        self._bounds = self._compute_bounds()
+
+    def _compute_bounds(self) -> Tuple[int, int, int, int]:
+        # 網格的邊界（格子座標），用於限制最近鄰查詢的擴張圈數
+        rows = [i for i, _ in self._cells] or [0]
+        cols = [j for _, j in self._cells] or [0]
+        return min(rows), max(rows), min(cols), max(cols)
+
+    def updated(
+        self,
+        upserts: Iterable[Tuple[Hashable, float, float]] = (),
+        removals: Iterable[Hashable] = (),
+    ) -> "GeoGridIndex":
+        """
+        返回套用變更後的新索引（原索引不變，進行中的查詢不受影響）
+
+        新索引沿用相同的網格設定，未變動的格子與原索引共用，只複製受影響的格子。
+
+        Args:
+            upserts: 新增或移動的 (key, latitude, longitude)
+            removals: 要移除的 key
+        """
+        new = object.__new__(GeoGridIndex)
+        new.__dict__.update(self.__dict__)
+        new._coords = dict(self._coords)
+        new._cells = dict(self._cells)
+        copied = set()
+
+        def bucket(cell):
+            if cell not in copied:
+                new._cells[cell] = list(new._cells.get(cell, ()))
+                copied.add(cell)
+            return new._cells[cell]
+
+        def remove(key):
+            coords = new._coords.pop(key, None)
+            if coords is not None:
+                cell = new._cell_of(*coords)
+                entries = bucket(cell)
+                entries[:] = [entry for entry in entries if entry[2] != key]
+                if not entries:
+                    del new._cells[cell]
+                    copied.discard(cell)
+
+        for key in removals:
+            remove(key)
+        for key, lat, lng in upserts:
+            remove(key)
+            lat, lng = float(lat), float(lng)
+            new._coords[key] = (lat, lng)
+            bucket(new._cell_of(lat, lng)).append((lat, lng, key))
+
+        new._bounds = new._compute_bounds()
+        return new
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._coords
+
+    def _cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self._lat_step)), int(math.floor(lng / self._lng_step))
+
+    def _fast_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        dy = (lat2 - lat1) * KM_PER_DEGREE
+        dx = (lng2 - lng1) * KM_PER_DEGREE * self._lng_scale
+        return math.sqrt(dx * dx + dy * dy)
+
+    def distance_to(self, key: Hashable, lat: float, lng: float) -> Optional[float]:
+        """指定 key 與查詢點的距離（公里），不在索引中時返回 None"""
+        coords = self._coords.get(key)
+        if coords is None:
+            return None
+        return self._fast_distance(lat, lng, coords[0], coords[1])
+
+    def bounding_box(self, lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+        """
+        包含查詢圓的經緯度範圍 (最小緯度, 最大緯度, 最小經度, 最大經度)
+
+        與索引的距離計算使用相同的投影，半徑內的點一定落在範圍內，可作為 SQL 的預先篩選
+        """
+        lat_delta = radius_km / KM_PER_DEGREE + _BOX_MARGIN_DEGREES
+        lng_delta = radius_km / (KM_PER_DEGREE * self._lng_scale) + _BOX_MARGIN_DEGREES
+        return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> Iterable[Tuple[int, int]]:
+        """與中心格子距離恰為 radius 格的所有格子"""
+        ci, cj = center
+        if radius == 0:
+            yield center
+            return
+        for j in range(cj - radius, cj + radius + 1):
+            yield ci - radius, j
+            yield ci + radius, j
+        for i in range(ci - radius + 1, ci + radius):
+            yield i, cj - radius
+            yield i, cj + radius
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, Hashable]]:
+        """返回半徑內的所有 (距離, key)，依距離由近到遠排序"""
+        rings = int(math.ceil(radius_km / self._cell_km))
+        center = self._cell_of(lat, lng)
+        found = []
+        cells = self._cells
+        for r in range(rings + 1):
+            for cell in self._ring(center, r):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for p_lat, p_lng, key in bucket:
+                    d = self._fast_distance(lat, lng, p_lat, p_lng)
+                    if d <= radius_km:
+                        found.append((d, key))
+        found.sort()
+        return found
+
+    def nearest(
+        self, lat: float, lng: float, k: int, max_radius_km: Optional[float] = None
+    ) -> List[Tuple[float, Hashable]]:
+        """
+        返回最近的 k 個 (距離, key)，由近到遠排序
+
+        由中心格子向外逐圈擴張，當第 k 近的距離已小於下一圈的最短可能距離時停止。
+        """
+        if k <= 0 or not self._coords:
+            return []
+
+        center = self._cell_of(lat, lng)
+        # 超過此圈數時所有格子都已檢查過
+        min_i, max_i, min_j, max_j = self._bounds
+        max_rings = max(
+            abs(center[0] - min_i), abs(center[0] - max_i),
+            abs(center[1] - min_j), abs(center[1] - max_j),
+        )
+        if max_radius_km is not None:
+            max_rings = min(max_rings, int(math.ceil(max_radius_km / self._cell_km)))
+
+        heap: List[Tuple[float, Hashable]] = []  # 以負距離維持大小為 k 的最大堆積
+        cells = self._cells
+        for r in range(max_rings + 1):
+            # 第 r 圈格子與查詢點的最短距離至少為 (r - 1) 個格子邊長
+            if len(heap) == k and -heap[0][0] <= (r - 1) * self._cell_km:
+                break
+            for cell in self._ring(center, r):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for p_lat, p_lng, key in bucket:
+                    d = self._fast_distance(lat, lng, p_lat, p_lng)
+                    if max_radius_km is not None and d > max_radius_km:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, key))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, key))
+
+        return sorted((-neg_d, key) for neg_d, key in heap)
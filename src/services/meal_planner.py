@@ -0,0 +1,271 @@
+"""
+每日餐點規劃服務
+在預算限制下挑選早餐、午餐、晚餐，使整日營養總和最接近使用者目標
+"""
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.db import DatabaseError
+from services.menu_catalog import MenuCatalog, MenuCatalogService
+from services.recommendation_service import score_items, DEFAULT_TARGETS
+from services.user_service import UserService
+from utils.debug import ERROR_PRINT
+
+
+# 三餐與各餐占每日目標的比例
+MEAL_SLOTS: Tuple[Tuple[str, float], ...] = (
+    ('breakfast', 0.25),
+    ('lunch', 0.35),
+    ('dinner', 0.40),
+)
+
+# 每一餐保留的候選數量（分支定界只在候選池內搜尋）
+DEFAULT_POOL_SIZE = 32
+
+# 預設時間上限（毫秒），超過即返回目前找到的最佳解
+DEFAULT_TIME_BUDGET_MS = 50.0
+
+# 每展開多少個節點檢查一次時間
+_DEADLINE_CHECK_INTERVAL = 256
+
+_MACROS = ('calories', 'protein', 'fat')
+
+
+@dataclass
+class MealPlan:
+    """規劃結果"""
+    indices: List[int] = field(default_factory=list)  # 對應 MEAL_SLOTS 的目錄索引
+    deviation: float = float('inf')  # 與目標的正規化平方差總和
+    price: float = 0.0
+    complete: bool = False  # 是否在時間內完成整個搜尋（False 表示為目前最佳解）
+    nodes: int = 0
+    elapsed_ms: float = 0.0
+
+
+def plan_day(
+    catalog: MenuCatalog,
+    targets: Dict[str, float],
+    meal_budget: Optional[float] = None,
+    daily_budget: Optional[float] = None,
+    vegetarian: bool = False,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    started: Optional[float] = None,
+) -> MealPlan:
+    """
+    規劃一日三餐
+
+    1. 以熱量排序索引取出接近各餐份額的項目，依單餐預算與素食條件篩選後，
+       以各餐目標份額取前 pool_size 個候選
+    2. 以分支定界搜尋三餐組合：每個節點用剩餘各餐營養值的上下界計算誤差下界，
+       下界不優於目前最佳解或最低價格已超出每日預算時剪枝
+    3. 超過 time_budget_ms 即停止，返回目前最佳解（complete=False）；
+       時間從 started 起算（包含建立候選池），搜尋至少會走完第一條路徑，因此仍有一組解
+
+    Args:
+        catalog: 菜單目錄
+        targets: 每日目標 {'calories', 'protein', 'fat'}
+        meal_budget: 單餐價格上限（None 或 0 表示不限）
+        daily_budget: 每日價格上限（None 或 0 表示不限）
+        vegetarian: 是否只選素食
+        pool_size: 每餐候選數量
+        time_budget_ms: 時間上限（毫秒）
+        started: 計時起點（time.perf_counter()），預設為呼叫時；
+                 呼叫端需要把讀取資料的時間也算進去時傳入
+    """
+    if started is None:
+        started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000.0
+    plan = MealPlan()
+
+    goal = [float(targets[m]) for m in _MACROS]
+    inv_scale = [1.0 / (g or 1.0) for g in goal]
+    columns = [catalog.calories, catalog.protein, catalog.fat]
+
+    # 每一餐的候選池（依與該餐份額的距離排序，較佳者先展開）
+    pools: List[List[Tuple[int, float, Tuple[float, float, float]]]] = []
+    for _, share in MEAL_SLOTS:
+        slot_goal = {m: float(targets[m]) * share for m in _MACROS}
+        candidates = _slot_candidates(catalog, slot_goal['calories'], pool_size, meal_budget, vegetarian)
+        scores = score_items(catalog, candidates, slot_goal, targets)
+        best = heapq.nsmallest(pool_size, zip(scores, candidates))
+        pools.append([
+            (i, catalog.prices[i], (columns[0][i], columns[1][i], columns[2][i]))
+            for _, i in best
+        ])
+
+    if not all(pools):
+        plan.complete = True
+        plan.elapsed_ms = (time.perf_counter() - started) * 1000
+        return plan
+
+    # 後綴上下界：從第 s 餐起剩餘各餐的營養值總和範圍與最低價格
+    n_slots = len(pools)
+    suffix_lo = [[0.0, 0.0, 0.0] for _ in range(n_slots + 1)]
+    suffix_hi = [[0.0, 0.0, 0.0] for _ in range(n_slots + 1)]
+    suffix_price = [0.0] * (n_slots + 1)
+    for s in range(n_slots - 1, -1, -1):
+        for d in range(3):
+            suffix_lo[s][d] = suffix_lo[s + 1][d] + min(v[d] for _, _, v in pools[s])
+            suffix_hi[s][d] = suffix_hi[s + 1][d] + max(v[d] for _, _, v in pools[s])
+        suffix_price[s] = suffix_price[s + 1] + min(p for _, p, _ in pools[s])
+
+    max_price = daily_budget if daily_budget else float('inf')
+    chosen: List[int] = []
+    nodes = 0
+    timed_out = False
+
+    def lower_bound(s: int, partial: Tuple[float, float, float]) -> float:
+        bound = 0.0
+        for d in range(3):
+            lo = partial[d] + suffix_lo[s][d]
+            hi = partial[d] + suffix_hi[s][d]
+            if goal[d] < lo:
+                gap = (lo - goal[d]) * inv_scale[d]
+            elif goal[d] > hi:
+                gap = (goal[d] - hi) * inv_scale[d]
+            else:
+                continue
+            bound += gap * gap
+        return bound
+
+    def search(s: int, partial: Tuple[float, float, float], price: float) -> None:
+        nonlocal nodes, timed_out
+        if s == n_slots:
+            deviation = 0.0
+            for d in range(3):
+                gap = (partial[d] - goal[d]) * inv_scale[d]
+                deviation += gap * gap
+            if deviation < plan.deviation:
+                plan.indices = list(chosen)
+                plan.deviation = deviation
+                plan.price = price
+            return
+
+        for index, item_price, vec in pools[s]:
+            nodes += 1
+            if nodes % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                timed_out = True
+            if timed_out:
+                return
+            if index in chosen:
+                continue
+            new_price = price + item_price
+            if new_price + suffix_price[s + 1] > max_price:
+                continue
+            new_partial = (partial[0] + vec[0], partial[1] + vec[1], partial[2] + vec[2])
+            if lower_bound(s + 1, new_partial) >= plan.deviation:
+                continue
+            chosen.append(index)
+            search(s + 1, new_partial, new_price)
+            chosen.pop()
+
+    search(0, (0.0, 0.0, 0.0), 0.0)
+
+    plan.complete = not timed_out
+    plan.nodes = nodes
+    plan.elapsed_ms = (time.perf_counter() - started) * 1000
+    return plan
+
+
+def _slot_candidates(
+    catalog: MenuCatalog,
+    calories: float,
+    pool_size: int,
+    meal_budget: Optional[float],
+    vegetarian: bool,
+) -> List[int]:
+    """
+    取出熱量接近 calories 的候選索引
+
+    從 ±1% 的熱量區間開始，篩選後數量不足 pool_size 的 8 倍時將區間加倍，
+    避免每次規劃都掃描整個目錄。
+    """
+    sorted_calories = catalog.sorted_calories
+    if not sorted_calories:
+        return []
+
+    width = max(calories * 0.01, 5.0)
+    while True:
+        low, high = calories - width, calories + width
+        window = catalog.calorie_window(low, high)
+        candidates = catalog.candidate_indices(
+            max_price=meal_budget if meal_budget else None,
+            vegetarian=vegetarian,
+            indices=window,
+        )
+        covers_all = low <= sorted_calories[0] and high >= sorted_calories[-1]
+        if len(candidates) >= pool_size * 8 or covers_all:
+            return candidates
+        width *= 2
+
+
+class MealPlanService:
+    """使用者每日餐點規劃服務"""
+
+    def __init__(self):
+        self._user_service = UserService()
+
+    def plan_for_user(
+        self,
+        user_id: int,
+        vegetarian: bool = False,
+        daily_budget: Optional[float] = None,
+        time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    ) -> Dict[str, Any]:
+        """
+        依使用者的目標與預算規劃一日三餐
+
+        users.budget 為單餐預算上限，未指定 daily_budget 時每日上限為三餐總和。
+        時間上限 time_budget_ms 從呼叫時起算，包含讀取使用者資料、菜單目錄與建立候選池。
+        """
+        started = time.perf_counter()
+        try:
+            user = self._user_service.get_user_by_id(user_id) or {}
+        except DatabaseError as e:
+            ERROR_PRINT(f"[ERROR] 讀取使用者資料失敗: {e}")
+            user = {}
+
+        targets = {
+            'calories': float(user.get('targetCalories') or DEFAULT_TARGETS['calories']),
+            'protein': float(user.get('targetProtein') or DEFAULT_TARGETS['protein']),
+            'fat': float(user.get('targetFat') or DEFAULT_TARGETS['fat']),
+        }
+        meal_budget = float(user.get('budget') or 0) or None
+        if daily_budget is None and meal_budget:
+            daily_budget = meal_budget * len(MEAL_SLOTS)
+
+        catalog = MenuCatalogService.get_catalog()
+        plan = plan_day(
+            catalog,
+            targets,
+            meal_budget=meal_budget,
+            daily_budget=daily_budget,
+            vegetarian=vegetarian,
+            time_budget_ms=time_budget_ms,
+            started=started,
+        )
+
+        meals = []
+        totals = {'calories': 0.0, 'protein': 0.0, 'carbs': 0.0, 'fat': 0.0}
+        for (meal, _), index in zip(MEAL_SLOTS, plan.indices):
+            item = catalog.item_to_dict(index)
+            item['meal'] = meal
+            meals.append(item)
+            for key in totals:
+                totals[key] += float(item[key])
+
+        return {
+            'mode': user.get('mode', 'NORMAL'),
+            'meals': meals,
+            'totals': {key: round(value, 1) for key, value in totals.items()},
+            'targets': targets,
+            'price': plan.price,
+            'daily_budget': daily_budget,
+            'deviation': round(plan.deviation, 4) if plan.indices else None,
+            'complete': plan.complete,
+            'elapsed_ms': round(plan.elapsed_ms, 2),
+        }
@@ -0,0 +1,288 @@
+"""
+菜單目錄服務
+將所有菜單項目載入為欄式陣列（每個欄位一個 array），供推薦與餐點規劃做整批計算；
+目錄會發布成共用快照（services/catalog_snapshot.py），多個 worker 對應同一份記憶體
+"""
+
+import bisect
+import threading
+from array import array
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from data.binary_table import MappedTable
+from services.catalog_snapshot import SnapshotFile, TableData
+from services.db import fetch_iter, fetch_one, driver_available, DatabaseError
+from services.fuzzy_index import normalize
+from utils.debug import ERROR_PRINT
+
+
+# 素食篩選接受的選項（與 SearchService / RestaurantService 一致）
+VEGETARIAN_OPTIONS = ('全素', '蛋奶素')
+
+# 快照中的欄位（數值欄位的 array typecode，str 為字串欄位）
+_SNAPSHOT_COLUMNS = (
+    ('item_ids', 'q'), ('restaurant_ids', 'q'),
+    ('names', 'str'), ('restaurant_names', 'str'), ('food_types', 'str'), ('vegetarian', 'b'),
+    ('prices', 'd'), ('calories', 'd'), ('protein', 'd'), ('carbs', 'd'), ('fat', 'd'),
+)
+
+
+@dataclass(frozen=True)
+class MenuCatalog:
+    """
+    欄式菜單目錄
+
+    第 i 個菜單項目的資料分散在各欄位的第 i 個元素，
+    數值欄位使用 array 以降低記憶體並加快整批掃描。
+    由快照建立時各欄位為指向共用快照的唯讀檢視（memoryview / StringColumn）。
+    """
+    item_ids: Sequence[int]
+    restaurant_ids: Sequence[int]
+    names: Sequence[str]
+    restaurant_names: Sequence[str]
+    food_types: Sequence[str]
+    vegetarian: Sequence[bool]
+    prices: Sequence[float]
+    calories: Sequence[float]
+    protein: Sequence[float]
+    carbs: Sequence[float]
+    fat: Sequence[float]
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "MenuCatalog":
+        """
+        從查詢結果建立目錄
+
+        每列需包含 itemID, restaurantID, name, price, calories, protein,
+        carbs, fat, restaurantName, foodType, vegetarianOption
+        """
+        item_ids, restaurant_ids = array('q'), array('q')
+        prices, calories = array('d'), array('d')
+        protein, carbs, fat = array('d'), array('d'), array('d')
+        names: List[str] = []
+        restaurant_names: List[str] = []
+        food_types: List[str] = []
+        vegetarian: List[bool] = []
+
+        for row in rows:
+            item_ids.append(int(row['itemID']))
+            restaurant_ids.append(int(row['restaurantID']))
+            names.append(row['name'] or '')
+            restaurant_names.append(row.get('restaurantName') or '')
+            food_types.append(row.get('foodType') or '')
+            vegetarian.append(row.get('vegetarianOption') in VEGETARIAN_OPTIONS)
+            prices.append(float(row['price'] or 0))
+            calories.append(float(row['calories'] or 0))
+            protein.append(float(row['protein'] or 0))
+            carbs.append(float(row['carbs'] or 0))
+            fat.append(float(row['fat'] or 0))
+
+        return cls(
+            item_ids=item_ids,
+            restaurant_ids=restaurant_ids,
+            names=tuple(names),
+            restaurant_names=tuple(restaurant_names),
+            food_types=tuple(food_types),
+            vegetarian=tuple(vegetarian),
+            prices=prices,
+            calories=calories,
+            protein=protein,
+            carbs=carbs,
+            fat=fat,
+        )
+
+    def to_table(self) -> TableData:
+        """轉為快照表格內容（含預先計算的熱量排序）"""
+        columns = {}
+        for name, typecode in _SNAPSHOT_COLUMNS:
+            values = getattr(self, name)
+            columns[name] = values if typecode == 'str' else array(typecode, values)
+        columns['calorie_order'] = array('q', self.calorie_order)
+        columns['sorted_calories'] = array('d', self.sorted_calories)
+        return len(self), columns, {'kind': 'menu_catalog'}
+
+    @classmethod
+    def from_table(cls, table: MappedTable) -> "MenuCatalog":
+        """由快照建立目錄（不複製資料）"""
+        catalog = cls(**{name: table.column(name) for name, _ in _SNAPSHOT_COLUMNS})
+        # 快照已包含排序結果，直接填入 cached_property
+        catalog.__dict__['calorie_order'] = table.column('calorie_order')
+        catalog.__dict__['sorted_calories'] = table.column('sorted_calories')
+        return catalog
+
+    @cached_property
+    def calorie_order(self) -> array:
+        """依熱量由低到高排序的索引（首次使用時計算，之後共用）"""
+        calories = self.calories
+        return array('q', sorted(range(len(self)), key=calories.__getitem__))
+
+    @cached_property
+    def sorted_calories(self) -> array:
+        """與 calorie_order 對應的熱量值，供 bisect 使用"""
+        calories = self.calories
+        return array('d', (calories[i] for i in self.calorie_order))
+
+    @cached_property
+    def positions_by_item_id(self) -> Dict[int, int]:
+        """itemID -> 索引（首次使用時建立）"""
+        return {item_id: i for i, item_id in enumerate(self.item_ids)}
+
+    @cached_property
+    def positions_by_name(self) -> Dict[str, Tuple[int, ...]]:
+        """正規化菜名（見 fuzzy_index.normalize）-> 索引，同名的菜可能屬於多間餐廳（首次使用時建立）"""
+        grouped: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            grouped.setdefault(normalize(name), []).append(i)
+        return {name: tuple(positions) for name, positions in grouped.items()}
+
+    def calorie_window(self, low: float, high: float) -> array:
+        """返回熱量介於 [low, high] 的索引"""
+        sorted_calories = self.sorted_calories
+        start = bisect.bisect_left(sorted_calories, low)
+        end = bisect.bisect_right(sorted_calories, high)
+        return self.calorie_order[start:end]
+
+    def candidate_indices(
+        self,
+        categories: Optional[List[str]] = None,
+        max_price: Optional[float] = None,
+        vegetarian: bool = False,
+        indices: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """依類別、價格上限與素食條件篩選，返回符合的索引（可指定只篩選部分索引）"""
+        if indices is None:
+            indices = range(len(self))
+        if categories:
+            wanted = set(categories)
+            food_types = self.food_types
+            indices = [i for i in indices if food_types[i] in wanted]
+        if max_price is not None:
+            prices = self.prices
+            indices = [i for i in indices if prices[i] <= max_price]
+        if vegetarian:
+            veg = self.vegetarian
+            indices = [i for i in indices if veg[i]]
+        return list(indices)
+
+    def item_to_dict(self, index: int) -> Dict[str, Any]:
+        """將單一菜單項目轉為 API 回應格式"""
+        return {
+            "item_id": self.item_ids[index],
+            "restaurant_id": self.restaurant_ids[index],
+            "name": self.names[index],
+            "restaurant": self.restaurant_names[index],
+            "foodType": self.food_types[index],
+            "price": self.prices[index],
+            "calories": int(self.calories[index]),
+            "protein": self.protein[index],
+            "carbs": self.carbs[index],
+            "fat": self.fat[index],
+        }
+
+
+class MenuCatalogService:
+    """
+    菜單目錄載入服務（整個程序共用一份目錄）
+
+    啟用快照時目錄來自共用快照檔，只有建立快照的程序會查詢整份菜單，
+    其他程序定期以指紋確認快照仍與資料庫一致（見 services/catalog_snapshot.py）；
+    停用時（CATALOG_SNAPSHOT_DIR 為空）各程序各自從資料庫載入。
+    """
+
+    _catalog: Optional[MenuCatalog] = None
+    _lock = threading.Lock()
+    _snapshot_table: Optional[MappedTable] = None
+
+    @staticmethod
+    def _build_snapshot() -> Optional[TableData]:
+        catalog = MenuCatalogService._load()
+        return catalog.to_table() if catalog is not None else None
+
+    @staticmethod
+    def _fingerprint() -> Optional[Dict[str, int]]:
+        # 快照內容的指紋：catalog_versions 中的目錄版本，menu_items 或目錄用到的餐廳欄位
+        # （名稱、類別與素食選項）有增刪改時由觸發程序加一（見 sql/007_catalog_version.sql）；
+        # 以主鍵讀取一列，各 worker 定期比對也不需掃描資料表
+        if not driver_available():
+            return None
+        try:
+            row = fetch_one("SELECT version FROM catalog_versions WHERE name = 'menu_catalog'")
+        except DatabaseError as e:
+            ERROR_PRINT(f"[ERROR] 讀取菜單目錄版本失敗（是否已執行 sql/007_catalog_version.sql？）: {e}")
+            return None
+        return {"version": int(row['version'])} if row else None
+
+    @staticmethod
+    def get_catalog(verify: bool = False) -> MenuCatalog:
+        """
+        取得菜單目錄，首次呼叫時從資料庫（或共用快照）載入
+
+        Args:
+            verify: 需要與資料庫一致的目錄時設為 True（例如匯入），
+                    啟用快照時立即比對指紋、不一致才重建，停用快照時重新載入
+        """
+        if _snapshot.enabled:
+            return MenuCatalogService._from_snapshot(_snapshot.get(verify=verify))
+        if verify:
+            return MenuCatalogService.reload()
+
+        catalog = MenuCatalogService._catalog
+        if catalog is not None:
+            return catalog
+
+        with MenuCatalogService._lock:
+            if MenuCatalogService._catalog is None:
+                MenuCatalogService._catalog = MenuCatalogService._load()
+            catalog = MenuCatalogService._catalog
+        # 載入失敗時不快取，下次呼叫再重試
+        return catalog if catalog is not None else MenuCatalog.from_rows([])
+
+    @staticmethod
+    def _from_snapshot(table: Optional[MappedTable]) -> MenuCatalog:
+        if table is None:
+            return MenuCatalog.from_rows([])
+        # 同一份快照只建立一次目錄物件（各欄位為檢視，建立成本很低）
+        if table is not MenuCatalogService._snapshot_table:
+            with MenuCatalogService._lock:
+                if table is not MenuCatalogService._snapshot_table:
+                    MenuCatalogService._catalog = MenuCatalog.from_table(table)
+                    MenuCatalogService._snapshot_table = table
+        return MenuCatalogService._catalog
+
+    @staticmethod
+    def reload() -> MenuCatalog:
+        """重新從資料庫載入菜單目錄（啟用快照時發布新快照，其他程序隨後切換）"""
+        if _snapshot.enabled:
+            return MenuCatalogService._from_snapshot(_snapshot.refresh())
+
+        catalog = MenuCatalogService._load()
+        if catalog is not None:
+            MenuCatalogService._catalog = catalog
+        return MenuCatalogService.get_catalog()
+
+    @staticmethod
+    def _load() -> Optional[MenuCatalog]:
+        if not driver_available():
+            return None
+
+        try:
+            query = """
+                SELECT m.itemID, m.restaurantID, m.name, m.price,
+                       m.calories, m.protein, m.carbs, m.fat,
+                       r.name AS restaurantName, r.foodType, r.vegetarianOption
+                FROM menu_items m
+                JOIN restaurants r ON m.restaurantID = r.restaurantID
+            """
+            return MenuCatalog.from_rows(fetch_iter(query))
+        except DatabaseError as e:
+            ERROR_PRINT(f"[ERROR] 載入菜單目錄失敗: {e}")
+            return None
+
+
+# 菜單目錄的共用快照
+_snapshot = SnapshotFile("menu_catalog", MenuCatalogService._build_snapshot, MenuCatalogService._fingerprint)
@@ -0,0 +1,293 @@
+"""
+效能指標
+提供 Counter / Histogram 與 Prometheus 文字格式輸出，
+供路由延遲、資料庫查詢、快取命中率等統計使用
+
+指標存在各程序的記憶體中。多個 worker（gunicorn）時設定 METRICS_MULTIPROC_DIR：
+各程序每 METRICS_FLUSH_INTERVAL 秒把自己的數值寫到該目錄的 <pid>.json，
+/metrics 合併目錄中所有檔案（計數相加），不論由哪個 worker 回應都是全部 worker 的總和。
+結束的 worker 的檔案保留，計數不會倒退；目錄在伺服器啟動時清空（見 gunicorn.conf.py）。
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.debug import WARN_PRINT
+
+# 多程序模式的共用目錄（未設定時只輸出目前程序的指標）與寫出間隔（秒）
+METRICS_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# 延遲（秒）的預設分桶
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 回應大小（位元組）的預設分桶
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """累加計數器"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = tuple(str(label) for label in labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(tuple(str(label) for label in labels), 0.0)
+
+    def state(self) -> Dict[LabelValues, float]:
+        """目前的數值（複本）"""
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def merge(total: Dict[LabelValues, float], values: Dict[LabelValues, float]) -> None:
+        """把另一個程序的數值加到 total"""
+        for key, value in values.items():
+            total[key] = total.get(key, 0.0) + value
+
+    def collect(self, values: Optional[Dict[LabelValues, float]] = None) -> List[str]:
+        items = sorted((self.state() if values is None else values).items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}'
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """分桶統計（輸出 _bucket / _sum / _count）"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # {labels: [各分桶計數..., +Inf 計數, 總和]}
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = tuple(str(label) for label in labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = series
+            series[slot] += 1
+            series[-1] += value
+
+    def state(self) -> Dict[LabelValues, List[float]]:
+        """目前的數值（複本）"""
+        with self._lock:
+            return {key: list(series) for key, series in self._values.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def merge(total: Dict[LabelValues, List[float]], values: Dict[LabelValues, List[float]]) -> None:
+        """把另一個程序的數值加到 total（各分桶與總和分別相加）"""
+        for key, series in values.items():
+            current = total.get(key)
+            if current is None:
+                total[key] = list(series)
+            elif len(current) == len(series):
+                total[key] = [a + b for a, b in zip(current, series)]
+
+    def collect(self, values: Optional[Dict[LabelValues, List[float]]] = None) -> List[str]:
+        items = sorted((self.state() if values is None else values).items())
+
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_number(cumulative)}'
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_number(series[-1])}')
+            lines.append(f'{self.name}_count{labels} {_format_number(cumulative)}')
+        return lines
+
+
+class MetricsRegistry:
+    """指標註冊表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """取得或建立 Counter（同名時返回既有的指標）"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """取得或建立 Histogram（同名時返回既有的指標）"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def _sorted_metrics(self) -> List[Any]:
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: m.name)
+
+    def reset(self) -> None:
+        """清除所有數值（fork 後的 worker 呼叫，避免重複計入 master 的數值）"""
+        for metric in self._sorted_metrics():
+            metric.reset()
+
+    def flush(self) -> None:
+        """多程序模式下把目前程序的數值寫到 METRICS_DIR/<pid>.json（先寫暫存檔再取代）"""
+        if not METRICS_DIR:
+            return
+        data = {
+            metric.name: [[list(key), value] for key, value in metric.state().items()]
+            for metric in self._sorted_metrics()
+        }
+        path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            WARN_PRINT("[WARN] 寫出指標失敗:", e)
+
+    def _merged_values(self) -> Dict[str, Dict[LabelValues, Any]]:
+        # 合併所有程序的檔案；讀取失敗（例如正在取代）的檔案略過
+        merged: Dict[str, Dict[LabelValues, Any]] = {}
+        metrics = {metric.name: metric for metric in self._sorted_metrics()}
+        for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, entries in data.items():
+                metric = metrics.get(name)
+                if metric is not None:
+                    metric.merge(merged.setdefault(name, {}), {tuple(key): value for key, value in entries})
+        return merged
+
+    def render(self) -> str:
+        """輸出 Prometheus 文字格式（多程序模式下為所有程序的總和）"""
+        merged = None
+        if METRICS_DIR:
+            self.flush()
+            merged = self._merged_values()
+
+        lines = []
+        for metric in self._sorted_metrics():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.collect(merged.get(metric.name, {}) if merged is not None else None))
+        return '\n'.join(lines) + '\n'
+
+
+# 全域註冊表
+REGISTRY = MetricsRegistry()
+
+
+def start_metrics_flush() -> None:
+    """多程序模式下啟動定期寫出指標的背景執行緒（每個 worker 在 fork 後各自呼叫）"""
+    if not METRICS_DIR:
+        return
+
+    def run():
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            REGISTRY.flush()
+
+    threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', '路由處理時間（秒）', ('method', 'endpoint', 'status'),
+)
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    'http_response_size_bytes', '回應大小（位元組）', ('method', 'endpoint'), buckets=SIZE_BUCKETS,
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    'db_query_duration_seconds', '資料庫查詢時間（秒）', ('helper', 'table'),
+)
+DB_QUERY_ERRORS = REGISTRY.counter(
+    'db_query_errors_total', '資料庫查詢失敗次數', ('helper', 'table'),
+)
+DB_CONNECTION_ACQUIRE = REGISTRY.histogram(
+    'db_connection_acquire_seconds', '取得資料庫連線的時間（秒）',
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', '快取查詢次數（依結果：hit、stale、miss）', ('cache', 'result'),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool, stale: bool = False) -> None:
+    """記錄一次快取查詢（stale 為命中但返回過期的值，同時在背景更新）"""
+    CACHE_REQUESTS.inc(cache, ('stale' if stale else 'hit') if hit else 'miss')
@@ -0,0 +1,93 @@
+"""
+排序鍵與 Top-K 選取
+集中定義搜尋結果可用的排序方式（rating, price, distance, similarity, relevance），
+記憶體搜尋與資料庫搜尋共用同一份設定
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# key(restaurant, context) -> 可比較的值，越小越前面
+SortKeyFunc = Callable[[Any, Dict[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """排序方式"""
+    name: str
+    key: SortKeyFunc
+    sql: Optional[str] = None  # 對應的 ORDER BY 子句（None 表示無法在 SQL 中排序）
+
+
+_SORT_KEYS: Dict[str, SortKey] = {}
+
+
+def register_sort_key(name: str, key: SortKeyFunc, sql: Optional[str] = None) -> SortKey:
+    """
+    註冊排序方式
+
+    Args:
+        name: 排序名稱（對應 FilterCriteria.sort_by / API 的 sort_by 參數）
+        key: 排序鍵函式，接收 (restaurant, context)，值越小排越前面
+        sql: 對應的 ORDER BY 子句，可下推到資料庫時提供
+    """
+    sort_key = SortKey(name=name, key=key, sql=sql)
+    _SORT_KEYS[name] = sort_key
+    return sort_key
+
+
+def get_sort_key(name: Optional[str]) -> Optional[SortKey]:
+    """取得排序方式，未註冊時返回 None"""
+    return _SORT_KEYS.get(name) if name else None
+
+
+def top_k(
+    items: Iterable[Any],
+    sort_by: Optional[str],
+    limit: Optional[int] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    依排序方式取前 limit 筆
+
+    有 limit 時使用 heapq.nsmallest（O(n log k)），結果與完整排序後切片相同；
+    未指定 limit 時才做完整排序。未註冊的排序方式保留原順序。
+    """
+    context = context or {}
+    sort_key = get_sort_key(sort_by)
+    if sort_key is None:
+        items = list(items)
+        return items[:limit] if limit is not None else items
+
+    key_func = sort_key.key
+    if limit is None:
+        return sorted(items, key=lambda item: key_func(item, context))
+    return heapq.nsmallest(limit, items, key=lambda item: key_func(item, context))
+
+
+register_sort_key(
+    'rating',
+    lambda r, ctx: -r.average_rating,
+    sql="r.averageRating DESC",
+)
+register_sort_key(
+    'price',
+    lambda r, ctx: (r.price_range, -r.average_rating),
+    sql="r.priceRange ASC, r.averageRating DESC",
+)
+# 距離需要使用者位置，context['distances'] 為 {restaurant_id: 公里}；沒有座標的餐廳排在最後
+register_sort_key(
+    'distance',
+    lambda r, ctx: ctx.get('distances', {}).get(r.restaurant_id, float('inf')),
+)
+# 模糊搜尋的相似度，context['similarity'] 為 {restaurant_id: 分數}
+register_sort_key(
+    'similarity',
+    lambda r, ctx: (-ctx.get('similarity', {}).get(r.restaurant_id, 0.0), -r.average_rating),
+)
+# 關鍵字相關性（services.relevance），context['relevance'] 為 {restaurant_id: 分數}；沒有分數的排在最後
+register_sort_key(
+    'relevance',
+    lambda r, ctx: (-ctx.get('relevance', {}).get(r.restaurant_id, float('-inf')), -r.average_rating),
+)
@@ -0,0 +1,147 @@
+"""
+推薦服務
+依使用者今日剩餘的營養目標（熱量、蛋白質、脂肪）推薦最合適的菜單項目
+"""
+
+import heapq
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from services.cache import UserScopedCache
+from services.db import DatabaseError
+from services.diet_service import SUMMARY_CACHE_TTL, DietService
+from services.menu_catalog import MenuCatalog, MenuCatalogService
+from services.user_service import UserService
+from utils.debug import ERROR_PRINT
+
+
+# 使用者未設定目標時的預設值
+DEFAULT_TARGETS = {'calories': 2000.0, 'protein': 60.0, 'fat': 65.0}
+
+# 超出剩餘額度時的懲罰倍數（超標比不足更糟）
+OVERSHOOT_PENALTY = 2.0
+
+MAX_RECOMMENDATIONS = 50
+
+
+class RecommendationService:
+    """菜單推薦服務"""
+
+    # 每位使用者的推薦結果，在該使用者寫入飲食記錄或個人資料時失效；
+    # 失效只發生在處理寫入的 worker，其他 worker 的結果與今日營養總計一樣最多保留 SUMMARY_CACHE_TTL 秒
+    _cache = UserScopedCache('recommendations', ttl_seconds=SUMMARY_CACHE_TTL)
+
+    def __init__(self):
+        self._user_service = UserService()
+
+    def get_targets(self, user: Optional[Dict[str, Any]]) -> Dict[str, float]:
+        """取得使用者的每日營養目標，未設定的欄位使用預設值"""
+        user = user or {}
+        return {
+            'calories': float(user.get('targetCalories') or DEFAULT_TARGETS['calories']),
+            'protein': float(user.get('targetProtein') or DEFAULT_TARGETS['protein']),
+            'fat': float(user.get('targetFat') or DEFAULT_TARGETS['fat']),
+        }
+
+    def get_remaining(self, user_id: int, day: Optional[date] = None) -> Dict[str, Any]:
+        """計算使用者今日（或指定日期）剩餘的營養額度"""
+        try:
+            user = self._user_service.get_user_by_id(user_id)
+        except DatabaseError as e:
+            ERROR_PRINT(f"[ERROR] 讀取使用者目標失敗: {e}")
+            user = None
+        targets = self.get_targets(user)
+        consumed = DietService.get_today_nutrition_summary(user_id, day)
+        remaining = {
+            key: max(target - float(consumed.get(key, 0)), 0.0)
+            for key, target in targets.items()
+        }
+        return {'targets': targets, 'consumed': consumed, 'remaining': remaining}
+
+    def recommend(
+        self,
+        user_id: int,
+        k: int = 10,
+        categories: Optional[List[str]] = None,
+        max_price: Optional[float] = None,
+        vegetarian: bool = False,
+        meals_left: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        推薦最符合剩餘營養額度的菜單項目
+
+        Args:
+            user_id: 使用者 ID
+            k: 返回筆數
+            categories: 食物類別篩選
+            max_price: 價格上限
+            vegetarian: 是否只推薦素食
+            meals_left: 今日剩餘餐數，剩餘額度會平均分配到每一餐
+
+        Returns:
+            {'remaining': {...}, 'items': [...]}
+        """
+        k = max(1, min(int(k), MAX_RECOMMENDATIONS))
+        meals_left = max(1, int(meals_left))
+        # 快取 key 與營養攝取的查詢使用同一個日期
+        today = date.today()
+        cache_key = (
+            today.isoformat(),
+            k,
+            tuple(sorted(categories or [])),
+            max_price,
+            vegetarian,
+            meals_left,
+        )
+        cached = self._cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+
+        budget = self.get_remaining(user_id, today)
+        per_meal = {key: value / meals_left for key, value in budget['remaining'].items()}
+
+        catalog = MenuCatalogService.get_catalog()
+        candidates = catalog.candidate_indices(categories, max_price, vegetarian)
+        scores = score_items(catalog, candidates, per_meal, budget['targets'])
+        best = heapq.nsmallest(k, zip(scores, candidates))
+
+        items = []
+        for score, index in best:
+            item = catalog.item_to_dict(index)
+            item['score'] = round(score, 4)
+            items.append(item)
+
+        result = {'remaining': budget['remaining'], 'targets': budget['targets'], 'items': items}
+        self._cache.set(user_id, cache_key, result)
+        return result
+
+
+def score_items(
+    catalog: MenuCatalog,
+    indices: List[int],
+    goal: Dict[str, float],
+    scale: Dict[str, float],
+) -> List[float]:
+    """
+    計算每個候選項目與目標營養值的距離（越小越好）
+
+    各欄位以每日目標值正規化後取平方差，熱量與脂肪超出目標時乘上 OVERSHOOT_PENALTY
+    （蛋白質多吃不扣分加重）；整欄一次掃描，不為每個項目建立物件。
+    """
+    cal_goal, pro_goal, fat_goal = goal['calories'], goal['protein'], goal['fat']
+    cal_scale = 1.0 / (scale['calories'] or 1.0)
+    pro_scale = 1.0 / (scale['protein'] or 1.0)
+    fat_scale = 1.0 / (scale['fat'] or 1.0)
+    calories, protein, fat = catalog.calories, catalog.protein, catalog.fat
+
+    scores = []
+    for i in indices:
+        d_cal = (calories[i] - cal_goal) * cal_scale
+        d_pro = (protein[i] - pro_goal) * pro_scale
+        d_fat = (fat[i] - fat_goal) * fat_scale
+        scores.append(
+            (d_cal * d_cal * (OVERSHOOT_PENALTY if d_cal > 0 else 1.0))
+            + (d_pro * d_pro)
+            + (d_fat * d_fat * (OVERSHOOT_PENALTY if d_fat > 0 else 1.0))
+        )
+    return scores
@@ -0,0 +1,199 @@
+"""
+關鍵字相關性排序
+以 BM25F 計算店名、菜名與地址三個欄位的相關性（各欄位有不同權重），再加上評分：
+    score = Σ idf(t) * tf(t) * (k1 + 1) / (k1 + tf(t)) + RATING_WEIGHT * 評分
+    tf(t) = Σ 欄位權重 * 欄位中的次數 / (1 - b + b * 欄位長度 / 平均長度)
+
+詞彙為正規化後的字元二元組（中文沒有空白分詞），單一字的查詢以該字為詞彙。
+文件頻率與欄位平均長度在建立索引時算好。
+
+取前 K 筆時使用每個詞彙單詞查詢分數最高的 CHAMPION_LIST_SIZE 筆（champion list）當候選，
+成本不隨符合的筆數增加；champion list 在詞彙第一次被查詢時掃描一次建立，
+最近使用的 CHAMPION_CACHE_SIZE 個詞彙保留在記憶體。候選不足 K 筆時才計算所有符合的餐廳。
+單詞查詢的結果與完整排序相同，多詞查詢為近似（只考慮各詞彙的 champion list）。
+"""
+
+import heapq
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from services.fuzzy_index import normalize
+
+# 欄位與權重（順序即文件欄位的順序）
+FIELDS = ("name", "menu", "address")
+FIELD_WEIGHTS = (3.0, 1.0, 0.5)
+
+K1 = 1.2
+B = 0.75
+
+# 評分（0~5）加入相關性分數時的權重
+RATING_WEIGHT = 0.2
+
+CHAMPION_LIST_SIZE = 512
+CHAMPION_CACHE_SIZE = 4096
+
+Document = Tuple[str, str, str]  # 與 FIELDS 對應
+
+
+def query_terms(text: str) -> FrozenSet[str]:
+    """查詢的詞彙：正規化後的字元二元組，只有一個字時為該字"""
+    text = normalize(text)
+    if len(text) < 2:
+        return frozenset((text,)) if text else frozenset()
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def _normalize_field(text: str) -> str:
+    # 多個值（換行分隔）之間以空白隔開，避免跨越兩個菜名的二元組（查詢的詞彙不含空白）
+    return " ".join(normalize(part) for part in text.split("\n"))
+
+
+def _occurrences(text: str, term: str) -> int:
+    # 與二元組的切法一致，重疊的出現也計算（例如「哈哈哈」中的「哈哈」為 2 次）
+    count = text.count(term)
+    if count and len(term) == 2 and term[0] == term[1]:
+        count = sum(1 for i in range(len(text) - 1) if text.startswith(term, i))
+    return count
+
+
+class RelevanceIndex:
+    """
+    BM25F 相關性索引
+
+    文件內容建立後不再修改（只有評分可就地更新，見 update_ratings），
+    可在多執行緒間共用（champion list 的快取自帶鎖）。
+    """
+
+    def __init__(self, documents: Iterable[Tuple[Hashable, Document, float]]):
+        """
+        Args:
+            documents: (key, (店名, 菜名, 地址), 評分) 序列；菜名可用換行串接多個
+        """
+        self._keys: List[Hashable] = []
+        self._fields: List[Document] = []
+        self._ratings: List[float] = []
+        for key, fields, rating in documents:
+            self._keys.append(key)
+            self._fields.append(tuple(_normalize_field(text) for text in fields))
+            self._ratings.append(rating)
+        self._positions: Dict[Hashable, int] = {key: i for i, key in enumerate(self._keys)}
+        self._count = len(self._keys)
+
+        totals = [0] * len(FIELDS)
+        document_frequency: Counter = Counter()
+        for fields in self._fields:
+            terms = set()
+            for f, text in enumerate(fields):
+                totals[f] += len(text)
+                terms.update(text[i:i + 2] for i in range(len(text) - 1))
+            document_frequency.update(terms)
+        self._average_lengths = [total / self._count if total else 1.0 for total in totals]
+        # 二元組的文件頻率；單字的文件頻率在查詢時才計算（見 _document_frequency_of）
+        self._document_frequency: Dict[str, int] = dict(document_frequency)
+
+        self._champions = lru_cache(maxsize=CHAMPION_CACHE_SIZE)(self._build_champions)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _contains(self, doc: int, term: str) -> bool:
+        return any(term in text for text in self._fields[doc])
+
+    def _document_frequency_of(self, term: str) -> int:
+        df = self._document_frequency.get(term)
+        if df is None:
+            if len(term) != 1:  # 未出現的二元組
+                return 0
+            # 單字第一次查詢時掃描一次，之後沿用（不同的字數量有限）
+            df = sum(1 for doc in range(self._count) if self._contains(doc, term))
+            self._document_frequency[term] = df
+        return df
+
+    def _idf(self, term: str) -> float:
+        df = self._document_frequency_of(term)
+        return math.log(1 + (self._count - df + 0.5) / (df + 0.5))
+
+    def _term_score(self, doc: int, term: str, idf: float) -> float:
+        tf = 0.0
+        for text, weight, average in zip(self._fields[doc], FIELD_WEIGHTS, self._average_lengths):
+            occurrences = _occurrences(text, term)
+            if occurrences:
+                tf += weight * occurrences / (1 - B + B * len(text) / average)
+        return idf * tf * (K1 + 1) / (K1 + tf) if tf else 0.0
+
+    def _score(self, doc: int, weighted_terms: List[Tuple[str, float]]) -> float:
+        relevance = sum(self._term_score(doc, term, idf) for term, idf in weighted_terms)
+        return relevance + RATING_WEIGHT * self._ratings[doc]
+
+    def _build_champions(self, term: str) -> Tuple[int, ...]:
+        # 掃描一次，保留單詞查詢分數最高的 CHAMPION_LIST_SIZE 筆
+        weighted_terms = [(term, self._idf(term))]
+        return tuple(heapq.nlargest(
+            CHAMPION_LIST_SIZE,
+            (doc for doc in range(self._count) if self._contains(doc, term)),
+            key=lambda doc: self._score(doc, weighted_terms),
+        ))
+
+    def update_ratings(self, ratings: Iterable[Tuple[Hashable, float]]) -> int:
+        """
+        就地更新評分（評論新增後不必重建整個索引）
+
+        有改變時清除 champion list 的快取（名次含評分）；與查詢同時進行時，
+        該次查詢可能混用新舊評分，champion list 本身即為近似，下次查詢即一致。
+
+        Args:
+            ratings: (key, 評分) 序列，不在索引中的 key 會略過
+
+        Returns:
+            評分有改變的筆數
+        """
+        changed = 0
+        for key, rating in ratings:
+            doc = self._positions.get(key)
+            if doc is not None and self._ratings[doc] != rating:
+                self._ratings[doc] = rating
+                changed += 1
+        if changed:
+            self._champions.cache_clear()
+        return changed
+
+    def score(self, key: Hashable, query: str) -> float:
+        """單一餐廳的分數（不在索引中時為 0）"""
+        doc = self._positions.get(key)
+        if doc is None:
+            return 0.0
+        return self._score(doc, [(term, self._idf(term)) for term in query_terms(query)])
+
+    def rank(self, query: str, keys: Iterable[Hashable], limit: Optional[int] = None) -> Dict[Hashable, float]:
+        """
+        計算符合條件的餐廳的分數
+
+        Args:
+            query: 查詢字串
+            keys: 符合篩選條件的餐廳 key
+            limit: 只需要前 limit 筆時提供，會先從 champion list 取候選
+
+        Returns:
+            {key: 分數}；提供 limit 時只包含（至少）前 limit 筆的分數
+        """
+        terms = query_terms(query)
+        weighted_terms = [(term, self._idf(term)) for term in terms]
+        allowed = set(keys)
+        positions = self._positions
+
+        if limit is not None and terms:
+            candidates = {
+                doc for term in terms for doc in self._champions(term)
+                if self._keys[doc] in allowed
+            }
+            # 候選足夠，或各詞彙的 champion list 已包含所有出現的餐廳
+            complete = all(self._document_frequency_of(term) <= CHAMPION_LIST_SIZE for term in terms)
+            if len(candidates) >= limit or complete:
+                return {self._keys[doc]: self._score(doc, weighted_terms) for doc in candidates}
+
+        return {
+            key: self._score(positions[key], weighted_terms)
+            for key in allowed if key in positions
+        }
@@ -3,9 +3,32 @@
 從資料庫讀取餐廳和菜單資料
 """
 
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
-from services.db import fetch_all, fetch_one, execute, driver_available, DatabaseError
+import itertools
+import threading
+import time
+from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, replace
+from models.filter_criteria import FilterCriteria
+from services.autocomplete import (
+    SUGGESTION_CATEGORY, SUGGESTION_MENU_ITEM, SUGGESTION_RESTAURANT, AutocompleteIndex,
+)
+from services.cache import ResultCache
+from services.db import fetch_all, fetch_iter, fetch_one, execute, driver_available, DatabaseError
+from services.fuzzy_index import MENU_NAME_WEIGHT, FuzzyIndex
+from services.geo_index import GeoGridIndex
+from services.ranking import get_sort_key
+from services.relevance import RelevanceIndex
+from utils.debug import ERROR_PRINT
+
+# 搜尋與單一餐廳快取的筆數上限、存活時間與過期後仍可先返回舊值的期間（秒）；
+# 其他程序寫入的更新最晚在 TTL 後開始反映
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 30.0
+SEARCH_CACHE_STALE = 300.0
+DETAIL_CACHE_SIZE = 1024
+
+# 檢查其他程序是否新增評論的間隔（秒）；有新評論時就地同步相關性索引的評分並重建自動完成索引
+RATING_SYNC_INTERVAL = SEARCH_CACHE_TTL
 
 
 @dataclass
@@ -32,12 +55,267 @@ class Restaurant:
     price_range: int = 1
     food_type: str = ""
     vegetarian_option: str = "葷食"
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     menu_items: List[MenuItem] = field(default_factory=list)
 
 
 class RestaurantService:
     """餐廳資料庫服務"""
     
+    # 餐廳座標的地理索引（首次使用時從資料庫載入）
+    _geo_index: Optional[GeoGridIndex] = None
+    _geo_lock = threading.Lock()
+    # 店名與菜名的模糊搜尋索引（首次使用時從資料庫載入）
+    _fuzzy_index: Optional[FuzzyIndex] = None
+    _fuzzy_lock = threading.Lock()
+    # 關鍵字相關性（BM25F）索引（首次使用時從資料庫載入）
+    _relevance_index: Optional[RelevanceIndex] = None
+    _relevance_lock = threading.Lock()
+    # 搜尋框自動完成的前綴索引（首次使用時從資料庫載入）
+    _autocomplete_index: Optional[AutocompleteIndex] = None
+    _autocomplete_lock = threading.Lock()
+    # 索引中的評分對應到的最大 reviewID，與上次檢查的時間（見 _sync_ratings）
+    _review_version: Optional[int] = None
+    _ratings_checked_at: float = 0.0
+    _rating_sync_lock = threading.Lock()
+    # 餐廳資料版本（更新後加一，使搜尋結果快取失效）
+    _data_version: int = 1
+    _search_cache = ResultCache('restaurant_search', SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE)
+    _detail_cache = ResultCache('restaurant_detail', DETAIL_CACHE_SIZE, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE)
+    
+    @staticmethod
+    def data_version() -> int:
+        """目前的餐廳資料版本"""
+        return RestaurantService._data_version
+    
+    @staticmethod
+    def bump_data_version():
+        """餐廳、菜單或評分更新後呼叫，使搜尋結果快取失效"""
+        RestaurantService._data_version += 1
+    
+    @staticmethod
+    def get_geo_index() -> Optional[GeoGridIndex]:
+        """取得餐廳地理索引，資料庫不可用時返回 None"""
+        index = RestaurantService._geo_index
+        if index is not None:
+            return index
+
+        # 同時有多個請求時只由一個執行緒建立，其他執行緒等待後直接使用
+        with RestaurantService._geo_lock:
+            if RestaurantService._geo_index is None:
+                RestaurantService._geo_index = RestaurantService._load_geo_index()
+            # 載入失敗時不快取，下次呼叫再重試
+            return RestaurantService._geo_index
+
+    @staticmethod
+    def _load_geo_index() -> Optional[GeoGridIndex]:
+        if not driver_available():
+            return None
+        
+        try:
+            query = """
+                SELECT restaurantID, latitude, longitude
+                FROM restaurants
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            """
+            # 以 tuple 逐批讀取（restaurantID, latitude, longitude），不先建立整份結果
+            return GeoGridIndex(fetch_iter(query, row_type="tuple"))
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 載入餐廳座標失敗:", e)
+            return None
+    
+    @staticmethod
+    def clear_geo_index():
+        """清除地理索引（餐廳座標更新後呼叫）"""
+        RestaurantService._geo_index = None
+        RestaurantService.bump_data_version()
+    
+    @staticmethod
+    def get_fuzzy_index() -> Optional[FuzzyIndex]:
+        """取得店名與菜名的模糊搜尋索引（key 為 restaurantID），資料庫不可用時返回 None"""
+        index = RestaurantService._fuzzy_index
+        if index is not None:
+            return index
+
+        with RestaurantService._fuzzy_lock:
+            if RestaurantService._fuzzy_index is None:
+                RestaurantService._fuzzy_index = RestaurantService._load_fuzzy_index()
+            return RestaurantService._fuzzy_index
+
+    @staticmethod
+    def _load_fuzzy_index() -> Optional[FuzzyIndex]:
+        if not driver_available():
+            return None
+        
+        try:
+            # 兩個查詢依序逐批讀取，不先建立整份結果
+            restaurant_rows = fetch_iter("SELECT restaurantID, name FROM restaurants", row_type="tuple")
+            menu_rows = fetch_iter("SELECT DISTINCT restaurantID, name FROM menu_items", row_type="tuple")
+            entries = itertools.chain(
+                ((restaurant_id, name, 1.0) for restaurant_id, name in restaurant_rows),
+                ((restaurant_id, name, MENU_NAME_WEIGHT) for restaurant_id, name in menu_rows),
+            )
+            return FuzzyIndex(entries)
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 載入模糊搜尋索引失敗:", e)
+            return None
+    
+    @staticmethod
+    def clear_fuzzy_index():
+        """清除模糊搜尋索引（餐廳或菜單名稱更新後呼叫）"""
+        RestaurantService._fuzzy_index = None
+        RestaurantService.bump_data_version()
+    
+    @staticmethod
+    def update_rating(restaurant_id: int, rating: float):
+        """
+        餐廳評分改變後呼叫（例如新增評論）
+
+        就地更新相關性索引中的評分（不重建索引），清除自動完成索引（權重為評分總和），
+        並更新資料版本使結果快取失效
+        """
+        index = RestaurantService._relevance_index
+        if index is not None:
+            index.update_ratings([(restaurant_id, rating)])
+        RestaurantService.clear_autocomplete_index()
+        RestaurantService.bump_data_version()
+
+    @staticmethod
+    def _sync_ratings():
+        """
+        每 RATING_SYNC_INTERVAL 秒檢查一次其他程序新增的評論
+
+        以 MAX(reviewID)（主鍵，不需掃描）判斷是否有新評論；有的話讀取所有餐廳的評分，
+        就地更新相關性索引，評分有改變時清除自動完成索引並使結果快取失效。
+        同一時間只有一個執行緒檢查，其他執行緒不等待、繼續使用目前的索引。
+        """
+        if time.monotonic() - RestaurantService._ratings_checked_at < RATING_SYNC_INTERVAL:
+            return
+        if not RestaurantService._rating_sync_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - RestaurantService._ratings_checked_at < RATING_SYNC_INTERVAL:
+                return
+            RestaurantService._ratings_checked_at = time.monotonic()
+            if not driver_available():
+                return
+
+            row = fetch_one("SELECT COALESCE(MAX(reviewID), 0) AS version FROM reviews")
+            version = int(row['version'] or 0) if row else 0
+            previous = RestaurantService._review_version
+            RestaurantService._review_version = version
+            # 第一次檢查只記錄版本（在建立索引之前，索引的評分不會比它舊）
+            if previous is None or version == previous:
+                return
+
+            changed = True
+            index = RestaurantService._relevance_index
+            if index is not None:
+                rows = fetch_iter("SELECT restaurantID, averageRating FROM restaurants", row_type="tuple")
+                changed = index.update_ratings(
+                    (restaurant_id, float(rating or 0)) for restaurant_id, rating in rows
+                ) > 0
+            if changed:
+                RestaurantService.clear_autocomplete_index()
+                RestaurantService.bump_data_version()
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 同步餐廳評分失敗:", e)
+        finally:
+            RestaurantService._rating_sync_lock.release()
+
+    @staticmethod
+    def get_relevance_index() -> Optional[RelevanceIndex]:
+        """取得關鍵字相關性索引（key 為 restaurantID），資料庫不可用時返回 None"""
+        RestaurantService._sync_ratings()
+        index = RestaurantService._relevance_index
+        if index is not None:
+            return index
+
+        with RestaurantService._relevance_lock:
+            if RestaurantService._relevance_index is None:
+                RestaurantService._relevance_index = RestaurantService._load_relevance_index()
+            return RestaurantService._relevance_index
+
+    @staticmethod
+    def _load_relevance_index() -> Optional[RelevanceIndex]:
+        if not driver_available():
+            return None
+        
+        try:
+            menu_rows = fetch_iter("SELECT restaurantID, name FROM menu_items ORDER BY itemID", row_type="tuple")
+            menu_names: Dict[int, List[str]] = {}
+            for restaurant_id, name in menu_rows:
+                menu_names.setdefault(restaurant_id, []).append(name)
+            restaurant_rows = fetch_iter(
+                "SELECT restaurantID, name, address, averageRating FROM restaurants", row_type="tuple"
+            )
+            return RelevanceIndex(
+                (
+                    restaurant_id,
+                    (name, "\n".join(menu_names.get(restaurant_id, [])), address or ''),
+                    float(rating or 0),
+                )
+                for restaurant_id, name, address, rating in restaurant_rows
+            )
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 載入相關性索引失敗:", e)
+            return None
+    
+    @staticmethod
+    def clear_relevance_index():
+        """清除相關性索引（餐廳、菜單或評分更新後呼叫）"""
+        RestaurantService._relevance_index = None
+        RestaurantService.bump_data_version()
+    
+    @staticmethod
+    def get_autocomplete_index() -> Optional[AutocompleteIndex]:
+        """
+        取得店名、菜名與類別的前綴索引，資料庫不可用時返回 None
+
+        與 /api/stores 使用相同的資料表；權重為出現該名稱的餐廳評分（averageRating）總和
+        """
+        RestaurantService._sync_ratings()
+        index = RestaurantService._autocomplete_index
+        if index is not None:
+            return index
+
+        with RestaurantService._autocomplete_lock:
+            if RestaurantService._autocomplete_index is None:
+                RestaurantService._autocomplete_index = RestaurantService._load_autocomplete_index()
+            return RestaurantService._autocomplete_index
+
+    @staticmethod
+    def _load_autocomplete_index() -> Optional[AutocompleteIndex]:
+        if not driver_available():
+            return None
+        
+        try:
+            ratings: Dict[int, float] = {}
+            entries = []
+            for restaurant_id, name, food_type, rating in fetch_iter(
+                "SELECT restaurantID, name, foodType, averageRating FROM restaurants", row_type="tuple"
+            ):
+                rating = ratings[restaurant_id] = float(rating or 0)
+                entries.append((name, SUGGESTION_RESTAURANT, rating))
+                if food_type:
+                    entries.append((food_type, SUGGESTION_CATEGORY, rating))
+            # 同一間餐廳的同名菜色只計一次
+            menu_rows = fetch_iter("SELECT DISTINCT restaurantID, name FROM menu_items", row_type="tuple")
+            entries.extend(
+                (name, SUGGESTION_MENU_ITEM, ratings[restaurant_id])
+                for restaurant_id, name in menu_rows if restaurant_id in ratings
+            )
+            return AutocompleteIndex(entries)
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 載入自動完成索引失敗:", e)
+            return None
+    
+    @staticmethod
+    def clear_autocomplete_index():
+        """清除自動完成索引（餐廳、菜單名稱或評分更新後呼叫）"""
+        RestaurantService._autocomplete_index = None
+    
     @staticmethod
     def get_restaurant_list() -> List[Dict[str, Any]]:
         """取得餐廳列表（僅 ID 和名稱）"""
@@ -49,7 +327,7 @@ class RestaurantService:
             rows = fetch_all(query)
             return [{'id': row['restaurantID'], 'name': row['name']} for row in rows]
         except DatabaseError as e:
-            print(f"[ERROR] 讀取餐廳列表失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取餐廳列表失敗:", e)
             return []
 
     @staticmethod
@@ -62,7 +340,7 @@ class RestaurantService:
             # 查詢所有餐廳
             query = """
                 SELECT restaurantID, name, address, averageRating, 
-                       priceRange, foodType, vegetarianOption
+                       priceRange, foodType, vegetarianOption, latitude, longitude
                 FROM restaurants
                 ORDER BY averageRating DESC
             """
@@ -78,6 +356,8 @@ class RestaurantService:
                     price_range=int(row['priceRange'] or 1),
                     food_type=row['foodType'] or '',
                     vegetarian_option=row['vegetarianOption'] or '葷食',
+                    latitude=row['latitude'],
+                    longitude=row['longitude'],
                     menu_items=[]
                 )
                 
@@ -109,27 +389,214 @@ class RestaurantService:
             return restaurants
             
         except DatabaseError as e:
-            print(f"[ERROR] 讀取餐廳資料失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取餐廳資料失敗:", e)
             return []
     
     @staticmethod
     def get_restaurant_by_id(restaurant_id: int) -> Optional[Restaurant]:
-        """根據 ID 取得單一餐廳"""
+        """
+        根據 ID 取得單一餐廳
+        
+        快取方式同 search_restaurants()（不存在的餐廳不快取），返回的是複本
+        """
         if not driver_available():
             return None
         
         try:
-            query = """
-                SELECT restaurantID, name, address, averageRating,
-                       priceRange, foodType, vegetarianOption
-                FROM restaurants
-                WHERE restaurantID = ?
-            """
-            row = fetch_one(query, (restaurant_id,))
-            
-            if not row:
-                return None
-            
+            cached = RestaurantService._detail_cache.get_or_compute(
+                restaurant_id, RestaurantService._data_version,
+                lambda: RestaurantService._query_restaurant(restaurant_id),
+            )
+            return RestaurantService._copy_restaurants([cached])[0] if cached is not None else None
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 讀取餐廳資料失敗:", e)
+            return None
+    
+    @staticmethod
+    def _query_restaurant(restaurant_id: int) -> Optional[Restaurant]:
+        # 實際的資料庫查詢（DatabaseError 由呼叫端處理）
+        query = """
+            SELECT restaurantID, name, address, averageRating,
+                   priceRange, foodType, vegetarianOption, latitude, longitude
+            FROM restaurants
+            WHERE restaurantID = ?
+        """
+        row = fetch_one(query, (restaurant_id,))
+        
+        if not row:
+            return None
+        
+        restaurant = Restaurant(
+            restaurant_id=row['restaurantID'],
+            name=row['name'],
+            address=row['address'] or '',
+            average_rating=float(row['averageRating'] or 0),
+            price_range=int(row['priceRange'] or 1),
+            food_type=row['foodType'] or '',
+            vegetarian_option=row['vegetarianOption'] or '葷食',
+            latitude=row['latitude'],
+            longitude=row['longitude'],
+            menu_items=[]
+        )
+        
+        # 查詢菜單
+        menu_query = """
+            SELECT itemID, restaurantID, name, description, price,
+                   calories, protein, carbs, fat
+            FROM menu_items
+            WHERE restaurantID = ?
+        """
+        menu_rows = fetch_all(menu_query, (restaurant_id,))
+        
+        for menu_row in menu_rows:
+            menu_item = MenuItem(
+                item_id=menu_row['itemID'],
+                restaurant_id=menu_row['restaurantID'],
+                name=menu_row['name'],
+                price=float(menu_row['price'] or 0),
+                description=menu_row['description'] or '',
+                calories=int(menu_row['calories'] or 0),
+                protein=float(menu_row['protein'] or 0),
+                carbs=float(menu_row['carbs'] or 0),
+                fat=float(menu_row['fat'] or 0)
+            )
+            restaurant.menu_items.append(menu_item)
+        
+        return restaurant
+    
+    @staticmethod
+    def search_restaurants(
+        keyword: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        price_range: Optional[int] = None,
+        vegetarian: bool = False,
+        restaurant_ids: Optional[List[int]] = None,
+        sort_by: str = 'rating',
+        limit: Optional[int] = None,
+        with_menus: bool = True,
+        bounds: Optional[Tuple[float, float, float, float]] = None
+    ) -> List[Restaurant]:
+        """
+        搜尋餐廳
+        
+        Args:
+            restaurant_ids: 限定候選餐廳（例如模糊搜尋的結果）
+            sort_by: 排序方式，可下推到 SQL 的排序（見 services.ranking）才會使用，
+                     其餘一律依評分排序，由呼叫端自行重排
+            limit: 最多返回筆數，以 LIMIT 下推到資料庫
+            with_menus: 是否載入菜單；呼叫端需先重排再截斷時可設為 False，
+                        之後只對保留的餐廳呼叫 attach_menus()
+            bounds: 限定座標範圍 (最小緯度, 最大緯度, 最小經度, 最大經度)，
+                    例如半徑查詢的外接矩形（見 GeoGridIndex.bounding_box），精確距離由呼叫端篩選
+        
+        沒有限定候選餐廳或座標範圍時，結果以正規化後的條件快取（見 FilterCriteria.cache_key），
+        資料版本更新（bump_data_version）時失效；同時進行的相同查詢只送出一次，
+        超過 SEARCH_CACHE_TTL 後的 SEARCH_CACHE_STALE 秒內先返回舊結果並在背景重新查詢。
+        返回的是複本，呼叫端可自行修改（例如 attach_menus）。
+        """
+        if not driver_available():
+            return []
+        
+        def query() -> List[Restaurant]:
+            return RestaurantService._query_restaurants(
+                keyword, categories, price_range, vegetarian, restaurant_ids, sort_by, limit, with_menus, bounds
+            )
+        
+        try:
+            # 限定候選（模糊搜尋的結果）或座標範圍的查詢很少重複，不快取
+            if restaurant_ids is not None or bounds is not None:
+                return query()
+            criteria = FilterCriteria(
+                keyword=keyword, categories=list(categories or []), vegetarian=vegetarian,
+                sort_by=sort_by, limit=limit,
+            )
+            cache_key = (criteria.cache_key(), price_range, with_menus)
+            cached = RestaurantService._search_cache.get_or_compute(
+                cache_key, RestaurantService._data_version, lambda: tuple(query())
+            )
+            return RestaurantService._copy_restaurants(cached)
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 搜尋餐廳失敗:", e)
+            return []
+    
+    @staticmethod
+    def _query_restaurants(
+        keyword: Optional[str],
+        categories: Optional[List[str]],
+        price_range: Optional[int],
+        vegetarian: bool,
+        restaurant_ids: Optional[List[int]],
+        sort_by: str,
+        limit: Optional[int],
+        with_menus: bool,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+    ) -> List[Restaurant]:
+        # 實際的資料庫查詢（DatabaseError 由呼叫端處理），參數同 search_restaurants()
+        # 建立動態查詢
+        conditions = []
+        params = []
+        
+        base_query = """
+            SELECT r.restaurantID, r.name, r.address, r.averageRating,
+                   r.priceRange, r.foodType, r.vegetarianOption, r.latitude, r.longitude
+            FROM restaurants r
+            WHERE 1=1
+        """
+        
+        # 關鍵字搜尋（餐廳名稱或菜單名稱）
+        # 以 EXISTS 取代 JOIN + DISTINCT，讓 ORDER BY ... LIMIT 可以沿評分索引提早結束
+        if keyword:
+            conditions.append("""(r.name LIKE ? OR EXISTS (
+                SELECT 1 FROM menu_items m
+                WHERE m.restaurantID = r.restaurantID AND m.name LIKE ?
+            ))""")
+            params.extend([f"%{keyword}%", f"%{keyword}%"])
+        
+        # 類別篩選
+        if categories and len(categories) > 0:
+            placeholders = ','.join(['?' for _ in categories])
+            conditions.append(f"r.foodType IN ({placeholders})")
+            params.extend(categories)
+        
+        # 價格範圍篩選（精確匹配）
+        if price_range is not None:
+            conditions.append("r.priceRange = ?")
+            params.append(price_range)
+        
+        # 素食篩選
+        if vegetarian:
+            conditions.append("r.vegetarianOption IN ('全素', '蛋奶素')")
+        
+        # 限定餐廳 ID（空列表表示沒有候選，直接返回）
+        if restaurant_ids is not None:
+            if not restaurant_ids:
+                return []
+            placeholders = ','.join(['?' for _ in restaurant_ids])
+            conditions.append(f"r.restaurantID IN ({placeholders})")
+            params.extend(restaurant_ids)
+        
+        # 座標範圍（沿 idx_restaurant_location 篩選，參數數量固定）
+        if bounds is not None:
+            conditions.append("r.latitude BETWEEN ? AND ? AND r.longitude BETWEEN ? AND ?")
+            params.extend(bounds)
+        
+        # 組合查詢
+        if conditions:
+            base_query += " AND " + " AND ".join(conditions)
+        
+        sort_key = get_sort_key(sort_by)
+        order_by = sort_key.sql if sort_key and sort_key.sql else "r.averageRating DESC"
+        base_query += f" ORDER BY {order_by}"
+        
+        if limit is not None:
+            base_query += " LIMIT ?"
+            params.append(int(limit))
+        
+        rows = fetch_all(base_query, tuple(params))
+        
+        # 組裝結果
+        restaurants = []
+        for row in rows:
             restaurant = Restaurant(
                 restaurant_id=row['restaurantID'],
                 name=row['name'],
@@ -138,17 +605,40 @@ class RestaurantService:
                 price_range=int(row['priceRange'] or 1),
                 food_type=row['foodType'] or '',
                 vegetarian_option=row['vegetarianOption'] or '葷食',
+                latitude=row['latitude'],
+                longitude=row['longitude'],
                 menu_items=[]
             )
-            
-            # 查詢菜單
-            menu_query = """
+            restaurants.append(restaurant)
+        
+        # 一次載入所有結果的菜單（避免每間餐廳各查一次）
+        if with_menus:
+            RestaurantService.attach_menus(restaurants)
+        
+        return restaurants
+    
+    @staticmethod
+    def _copy_restaurants(restaurants) -> List[Restaurant]:
+        # 快取與呼叫端各自持有餐廳物件與菜單列表（菜單項目本身不會被修改，共用即可）
+        return [replace(r, menu_items=list(r.menu_items)) for r in restaurants]
+    
+    @staticmethod
+    def attach_menus(restaurants: List[Restaurant]) -> None:
+        """以單一查詢載入多間餐廳的菜單"""
+        if not restaurants or not driver_available():
+            return
+        
+        try:
+            by_id = {r.restaurant_id: r for r in restaurants}
+            placeholders = ','.join(['?' for _ in by_id])
+            menu_query = f"""
                 SELECT itemID, restaurantID, name, description, price,
                        calories, protein, carbs, fat
                 FROM menu_items
-                WHERE restaurantID = ?
+                WHERE restaurantID IN ({placeholders})
+                ORDER BY itemID
             """
-            menu_rows = fetch_all(menu_query, (restaurant_id,))
+            menu_rows = fetch_all(menu_query, tuple(by_id))
             
             for menu_row in menu_rows:
                 menu_item = MenuItem(
@@ -162,110 +652,10 @@ class RestaurantService:
                     carbs=float(menu_row['carbs'] or 0),
                     fat=float(menu_row['fat'] or 0)
                 )
-                restaurant.menu_items.append(menu_item)
-            
-            return restaurant
-            
-        except DatabaseError as e:
-            print(f"[ERROR] 讀取餐廳資料失敗: {e}")
-            return None
-    
-    @staticmethod
-    def search_restaurants(
-        keyword: Optional[str] = None,
-        categories: Optional[List[str]] = None,
-        price_range: Optional[int] = None,
-        vegetarian: bool = False
-    ) -> List[Restaurant]:
-        """搜尋餐廳"""
-        if not driver_available():
-            return []
+                by_id[menu_row['restaurantID']].menu_items.append(menu_item)
         
-        try:
-            # 建立動態查詢
-            conditions = []
-            params = []
-            
-            base_query = """
-                SELECT DISTINCT r.restaurantID, r.name, r.address, r.averageRating,
-                       r.priceRange, r.foodType, r.vegetarianOption
-                FROM restaurants r
-                LEFT JOIN menu_items m ON r.restaurantID = m.restaurantID
-                WHERE 1=1
-            """
-            
-            # 關鍵字搜尋（餐廳名稱或菜單名稱）
-            if keyword:
-                conditions.append("(r.name LIKE ? OR m.name LIKE ?)")
-                params.extend([f"%{keyword}%", f"%{keyword}%"])
-            
-            # 類別篩選
-            if categories and len(categories) > 0:
-                placeholders = ','.join(['?' for _ in categories])
-                conditions.append(f"r.foodType IN ({placeholders})")
-                params.extend(categories)
-            
-            # 價格範圍篩選（精確匹配）
-            if price_range is not None:
-                conditions.append("r.priceRange = ?")
-                params.append(price_range)
-            
-            # 素食篩選
-            if vegetarian:
-                conditions.append("r.vegetarianOption IN ('全素', '蛋奶素')")
-            
-            # 組合查詢
-            if conditions:
-                base_query += " AND " + " AND ".join(conditions)
-            
-            base_query += " ORDER BY r.averageRating DESC"
-            
-            rows = fetch_all(base_query, tuple(params))
-            
-            # 組裝結果
-            restaurants = []
-            for row in rows:
-                restaurant = Restaurant(
-                    restaurant_id=row['restaurantID'],
-                    name=row['name'],
-                    address=row['address'] or '',
-                    average_rating=float(row['averageRating'] or 0),
-                    price_range=int(row['priceRange'] or 1),
-                    food_type=row['foodType'] or '',
-                    vegetarian_option=row['vegetarianOption'] or '葷食',
-                    menu_items=[]
-                )
-                
-                # 查詢菜單
-                menu_query = """
-                    SELECT itemID, restaurantID, name, description, price,
-                           calories, protein, carbs, fat
-                    FROM menu_items
-                    WHERE restaurantID = ?
-                """
-                menu_rows = fetch_all(menu_query, (restaurant.restaurant_id,))
-                
-                for menu_row in menu_rows:
-                    menu_item = MenuItem(
-                        item_id=menu_row['itemID'],
-                        restaurant_id=menu_row['restaurantID'],
-                        name=menu_row['name'],
-                        price=float(menu_row['price'] or 0),
-                        description=menu_row['description'] or '',
-                        calories=int(menu_row['calories'] or 0),
-                        protein=float(menu_row['protein'] or 0),
-                        carbs=float(menu_row['carbs'] or 0),
-                        fat=float(menu_row['fat'] or 0)
-                    )
-                    restaurant.menu_items.append(menu_item)
-                
-                restaurants.append(restaurant)
-            
-            return restaurants
-            
         except DatabaseError as e:
-            print(f"[ERROR] 搜尋餐廳失敗: {e}")
-            return []
+            ERROR_PRINT("[ERROR] 讀取菜單失敗:", e)
     
     @staticmethod
     def get_menu_item_by_id(item_id: int) -> Optional[MenuItem]:
@@ -298,5 +688,5 @@ class RestaurantService:
             )
             
         except DatabaseError as e:
-            print(f"[ERROR] 讀取菜單項目失敗: {e}")
+            ERROR_PRINT("[ERROR] 讀取菜單項目失敗:", e)
             return None
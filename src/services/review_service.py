@@ -0,0 +1,201 @@
+"""
+評論資料庫服務
+新增與列出餐廳評論，並以累加的方式維護餐廳的平均評分
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from services.db import fetch_all, fetch_one, transaction, driver_available, DatabaseError
+from services.restaurant_service import RestaurantService
+from utils.debug import ERROR_PRINT
+
+# 評分範圍
+MIN_RATING = 1
+MAX_RATING = 5
+
+# 匯入的評分作為先驗時相當於幾則評論（與 sql/005_review_aggregates.sql 相同）
+RATING_PRIOR_WEIGHT = 10
+
+# 評論列表每頁的預設與最多筆數
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_CURSOR_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+@dataclass
+class Review:
+    """評論"""
+    review_id: int
+    restaurant_id: int
+    user_id: int
+    rating: int
+    comment: str
+    timestamp: datetime
+    username: str = ""
+
+
+def encode_cursor(review: Review) -> str:
+    """下一頁的游標：最後一筆的 (時間, reviewID)"""
+    return f"{review.timestamp.strftime(_CURSOR_TIME_FORMAT)}_{review.review_id}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """解析游標，格式不正確時返回 None"""
+    timestamp, _, review_id = cursor.rpartition("_")
+    try:
+        return datetime.strptime(timestamp, _CURSOR_TIME_FORMAT), int(review_id)
+    except ValueError:
+        return None
+
+
+class ReviewService:
+    """評論服務"""
+
+    @staticmethod
+    def add_review(restaurant_id: int, user_id: int, rating: int, comment: str = "") -> Optional[Dict[str, Any]]:
+        """
+        新增評論並更新餐廳的評分
+
+        在同一個交易中累加 ratingSum 與 reviewCount 並重算 averageRating，
+        不需要對 reviews 做 AVG()；先更新餐廳（取得該列的鎖）再新增評論，
+        同一間餐廳的並行評論依序累加。
+        
+        匯入的評分是權重 RATING_PRIOR_WEIGHT 的先驗，第一則評論不會直接取代它；
+        遷移之後才匯入、尚無先驗的餐廳在第一則評論時以目前的評分補上。
+
+        Args:
+            restaurant_id: 餐廳 ID
+            user_id: 使用者 ID
+            rating: 評分（MIN_RATING ~ MAX_RATING）
+            comment: 評論內容
+
+        Returns:
+            {"review_id", "average_rating", "review_count"}，餐廳不存在或失敗時返回 None
+        """
+        if not driver_available():
+            ERROR_PRINT("[ERROR] 資料庫驅動不可用")
+            return None
+
+        try:
+            with transaction() as tx:
+                tx.execute("""
+                    UPDATE restaurants
+                    SET priorRating = averageRating, priorWeight = ?
+                    WHERE restaurantID = ? AND priorWeight = 0 AND reviewCount = 0 AND averageRating > 0
+                """, (RATING_PRIOR_WEIGHT, restaurant_id))
+                # averageRating 放在最前面，以更新前的總和與筆數計算（不依賴 SET 的求值順序）
+                updated = tx.execute("""
+                    UPDATE restaurants
+                    SET averageRating = (priorRating * priorWeight + ratingSum + ?) / (priorWeight + reviewCount + 1),
+                        ratingSum = ratingSum + ?,
+                        reviewCount = reviewCount + 1
+                    WHERE restaurantID = ?
+                """, (rating, rating, restaurant_id))
+                if updated == 0:
+                    return None
+
+                review_id = tx.execute_returning_id("""
+                    INSERT INTO reviews (restaurantID, userID, rating, comment, timestamp)
+                    VALUES (?, ?, ?, ?, NOW())
+                """, (restaurant_id, user_id, rating, comment))
+
+                row = tx.fetch_one(
+                    "SELECT averageRating, reviewCount FROM restaurants WHERE restaurantID = ?",
+                    (restaurant_id,)
+                )
+
+            # 評分改變會影響相關性排序與自動完成的權重（索引內含評分）、搜尋結果與餐廳詳情；
+            # 其他程序由 RestaurantService._sync_ratings() 定期同步
+            RestaurantService.update_rating(restaurant_id, float(row['averageRating'] or 0))
+            return {
+                "review_id": review_id,
+                "average_rating": float(row['averageRating'] or 0),
+                "review_count": int(row['reviewCount'] or 0),
+            }
+
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 新增評論失敗:", e)
+            return None
+
+    @staticmethod
+    def get_reviews(
+        restaurant_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Review]:
+        """
+        取得餐廳的評論（由新到舊）
+
+        以 (timestamp, reviewID) 做 keyset 分頁：沿 (restaurantID, timestamp) 索引從上一頁的
+        最後一筆之後繼續讀取，不使用 OFFSET，翻到後面的頁數也不需要略過前面的筆數。
+
+        Args:
+            restaurant_id: 餐廳 ID
+            limit: 最多返回筆數
+            before: 上一頁最後一筆的 (時間, reviewID)，第一頁為 None
+
+        Returns:
+            評論列表
+        """
+        if not driver_available():
+            return []
+
+        try:
+            conditions = ["rv.restaurantID = ?"]
+            params: List[Any] = [restaurant_id]
+            if before is not None:
+                conditions.append("(rv.timestamp < ? OR (rv.timestamp = ? AND rv.reviewID < ?))")
+                params.extend([before[0], before[0], before[1]])
+            params.append(int(limit))
+
+            query = f"""
+                SELECT rv.reviewID, rv.restaurantID, rv.userID, rv.rating, rv.comment, rv.timestamp,
+                       u.username
+                FROM reviews rv
+                LEFT JOIN users u ON rv.userID = u.userID
+                WHERE {' AND '.join(conditions)}
+                ORDER BY rv.timestamp DESC, rv.reviewID DESC
+                LIMIT ?
+            """
+            rows = fetch_all(query, tuple(params))
+
+            return [
+                Review(
+                    review_id=row['reviewID'],
+                    restaurant_id=row['restaurantID'],
+                    user_id=row['userID'],
+                    rating=int(row['rating']),
+                    comment=row['comment'] or '',
+                    timestamp=row['timestamp'],
+                    username=row['username'] or '',
+                )
+                for row in rows
+            ]
+
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 讀取評論失敗:", e)
+            return []
+
+    @staticmethod
+    def get_rating_summary(restaurant_id: int) -> Optional[Dict[str, Any]]:
+        """取得餐廳的平均評分與評論數，餐廳不存在時返回 None"""
+        if not driver_available():
+            return None
+
+        try:
+            row = fetch_one(
+                "SELECT averageRating, reviewCount FROM restaurants WHERE restaurantID = ?",
+                (restaurant_id,)
+            )
+            if not row:
+                return None
+            return {
+                "average_rating": float(row['averageRating'] or 0),
+                "review_count": int(row['reviewCount'] or 0),
+            }
+
+        except DatabaseError as e:
+            ERROR_PRINT("[ERROR] 讀取評分失敗:", e)
+            return None
@@ -0,0 +1,229 @@
+"""
+搜尋查詢規劃
+依每個版本預先計算的統計估計各篩選條件的選擇率與成本，
+先用最小的索引取得候選，其餘條件依「成本 / 淘汰率」由小到大逐一篩選，
+候選為空時直接結束；執行過程（實際筆數與耗時）記錄在 QueryPlan 中供除錯。
+"""
+
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.filter_criteria import FilterCriteria, price_range_for
+
+# 素食篩選接受的選項
+VEGETARIAN_OPTIONS = frozenset(('蛋奶素', '全素'))
+
+# 每筆的相對成本：屬性比較為 1，子字串搜尋依比對字串長度計算（每 KEYWORD_CHARS_PER_COST 個字元為 1）
+LOOKUP_COST = 1.0
+KEYWORD_CHARS_PER_COST = 16
+
+# 估計關鍵字選擇率時抽樣的比對字串數
+KEYWORD_SAMPLE_SIZE = 128
+
+
+def _positions_by(values: Sequence[Any]) -> Dict[Any, Tuple[int, ...]]:
+    grouped: Dict[Any, List[int]] = {}
+    for i, value in enumerate(values):
+        grouped.setdefault(value, []).append(i)
+    return {value: tuple(positions) for value, positions in grouped.items()}
+
+
+@dataclass(frozen=True)
+class CatalogStatistics:
+    """
+    某一版餐廳資料的統計
+
+    類別與價格等級同時保存各值的位置（遞增），可直接當作索引取得候選。
+    """
+    count: int
+    by_food_type: Dict[str, Tuple[int, ...]]
+    by_price_range: Dict[int, Tuple[int, ...]]
+    vegetarian_count: int
+    sorted_ratings: Tuple[float, ...]
+    keyword_sample: Tuple[str, ...]    # 等距抽樣的比對字串
+    average_key_length: float
+
+    @classmethod
+    def build(cls, restaurants: Sequence[Any], search_keys: Sequence[str]) -> "CatalogStatistics":
+        count = len(restaurants)
+        step = max(1, count // KEYWORD_SAMPLE_SIZE)
+        return cls(
+            count=count,
+            by_food_type=_positions_by([r.food_type for r in restaurants]),
+            by_price_range=_positions_by([r.price_range for r in restaurants]),
+            vegetarian_count=sum(1 for r in restaurants if r.vegetarian_option in VEGETARIAN_OPTIONS),
+            sorted_ratings=tuple(sorted(r.average_rating for r in restaurants)),
+            keyword_sample=tuple(search_keys[::step]),
+            average_key_length=sum(map(len, search_keys)) / count if count else 0.0,
+        )
+
+    def fraction(self, rows: float) -> float:
+        return rows / self.count if self.count else 0.0
+
+
+@dataclass
+class Predicate:
+    """
+    單一篩選條件
+
+    test(position) 判斷該位置的餐廳是否符合；有 index 時可改由索引（遞增的位置）直接取得符合的候選。
+    """
+    name: str
+    selectivity: float                      # 預估通過的比例（0~1）
+    cost: float                             # 每筆的相對成本
+    test: Callable[[int], bool]
+    index: Optional[Sequence[int]] = None
+    exact: bool = False                     # 選擇率是否由統計精確得出
+
+    @property
+    def rank(self) -> float:
+        """越小越先執行：每淘汰一筆所需的成本"""
+        return self.cost / max(1.0 - self.selectivity, 1e-9)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "predicate": self.name,
+            "estimated_selectivity": round(self.selectivity, 4),
+            "exact": self.exact,
+            "cost": round(self.cost, 2),
+        }
+
+
+@dataclass
+class QueryPlan:
+    """查詢計畫：取得候選的方式與依序執行的篩選條件"""
+    count: int
+    access: Optional[Predicate]             # None 表示全表掃描
+    filters: List[Predicate]
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+    total_ms: Optional[float] = None
+    catalog_version: Optional[int] = None
+
+    def execute(self) -> List[int]:
+        """執行計畫，返回符合條件的位置（遞增）"""
+        started = time.perf_counter()
+        self.steps = []
+
+        step_started = started
+        if self.access is not None:
+            rows = self.access.index
+            step = dict(self.access.describe(), step="index")
+        else:
+            rows = range(self.count)
+            step = {"step": "scan"}
+        step.update(estimated_rows=round(self._estimated_rows(self.access), 1), rows_out=len(rows))
+        self._record(step, step_started)
+
+        for predicate in self.filters:
+            if not rows:
+                self.steps.append(dict(predicate.describe(), step="skipped"))
+                continue
+            step_started = time.perf_counter()
+            rows_in = len(rows)
+            rows = list(filter(predicate.test, rows))
+            self._record(dict(predicate.describe(), step="filter", rows_in=rows_in, rows_out=len(rows)), step_started)
+
+        self.total_ms = round((time.perf_counter() - started) * 1000, 3)
+        return list(rows)
+
+    def _estimated_rows(self, access: Optional[Predicate]) -> float:
+        return self.count * (access.selectivity if access is not None else 1.0)
+
+    def _record(self, step: Dict[str, Any], started: float) -> None:
+        step["ms"] = round((time.perf_counter() - started) * 1000, 3)
+        self.steps.append(step)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """除錯輸出：各步驟的預估選擇率、實際筆數與耗時"""
+        return {
+            "catalog_version": self.catalog_version,
+            "access": "index:" + self.access.name if self.access is not None else "scan",
+            "order": [predicate.name for predicate in self.filters],
+            "steps": self.steps,
+            "total_ms": self.total_ms,
+        }
+
+
+def plan_query(
+    criteria: FilterCriteria,
+    restaurants: Sequence[Any],
+    search_keys: Sequence[str],
+    stats: CatalogStatistics,
+    radius_positions: Optional[Sequence[int]] = None,
+    fuzzy_positions: Optional[Sequence[int]] = None,
+) -> QueryPlan:
+    """
+    為搜尋條件建立查詢計畫
+
+    Args:
+        criteria: 篩選條件
+        restaurants: 該版本的餐廳
+        search_keys: 與 restaurants 對應的關鍵字比對字串
+        stats: 該版本的統計
+        radius_positions: 地理索引找出的半徑內餐廳位置（遞增），沒有半徑條件時為 None
+        fuzzy_positions: 模糊比對符合的餐廳位置（遞增），提供時取代一般的關鍵字比對
+    """
+    predicates: List[Predicate] = []
+
+    if radius_positions is not None:
+        inside = frozenset(radius_positions)
+        predicates.append(Predicate(
+            "radius", stats.fraction(len(radius_positions)), LOOKUP_COST,
+            inside.__contains__, index=radius_positions, exact=True,
+        ))
+
+    if fuzzy_positions is not None:
+        matched = frozenset(fuzzy_positions)
+        predicates.append(Predicate(
+            "fuzzy", stats.fraction(len(fuzzy_positions)), LOOKUP_COST,
+            matched.__contains__, index=fuzzy_positions, exact=True,
+        ))
+    elif criteria.keyword:
+        keyword = criteria.keyword.lower()
+        sample = stats.keyword_sample
+        hits = sum(1 for key in sample if keyword in key)
+        predicates.append(Predicate(
+            "keyword", (hits + 1) / (len(sample) + 2),
+            max(LOOKUP_COST, stats.average_key_length / KEYWORD_CHARS_PER_COST),
+            lambda i: keyword in search_keys[i],
+        ))
+
+    if criteria.categories:
+        categories = frozenset(criteria.categories)
+        groups = [stats.by_food_type.get(category, ()) for category in categories]
+        index = groups[0] if len(groups) == 1 else sorted(i for group in groups for i in group)
+        predicates.append(Predicate(
+            "categories", stats.fraction(len(index)), LOOKUP_COST,
+            lambda i: restaurants[i].food_type in categories, index=index, exact=True,
+        ))
+
+    if criteria.vegetarian:
+        predicates.append(Predicate(
+            "vegetarian", stats.fraction(stats.vegetarian_count), LOOKUP_COST,
+            lambda i: restaurants[i].vegetarian_option in VEGETARIAN_OPTIONS, exact=True,
+        ))
+
+    # 價格篩選（精確匹配 price_range）
+    target_range = price_range_for(criteria.max_price)
+    if target_range is not None:
+        index = stats.by_price_range.get(target_range, ())
+        predicates.append(Predicate(
+            "price_range", stats.fraction(len(index)), LOOKUP_COST,
+            lambda i: restaurants[i].price_range == target_range, index=index, exact=True,
+        ))
+
+    if criteria.min_rating is not None:
+        min_rating = criteria.min_rating
+        passing = stats.count - bisect.bisect_left(stats.sorted_ratings, min_rating)
+        predicates.append(Predicate(
+            "min_rating", stats.fraction(passing), LOOKUP_COST,
+            lambda i: restaurants[i].average_rating >= min_rating, exact=True,
+        ))
+
+    # 以預估筆數最少的索引取得候選，其餘條件依 rank 排序
+    indexed = [p for p in predicates if p.index is not None]
+    access = min(indexed, key=lambda p: p.selectivity) if indexed else None
+    filters = sorted((p for p in predicates if p is not access), key=lambda p: p.rank)
+    return QueryPlan(stats.count, access, filters)
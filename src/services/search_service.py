@@ -2,9 +2,89 @@
 搜尋服務
 """
 
-from typing import List
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
 from models.filter_criteria import FilterCriteria
 from data.sample_data import Restaurant, SampleData
+from services.cache import ResultCache
+from services.dataset_watcher import DatasetChanges, DatasetWatcher, IncrementalDatasetLoader
+from services.fuzzy_index import MENU_NAME_WEIGHT, FuzzyIndex, is_fuzzy_query
+from services.geo_index import GeoGridIndex
+from services.ranking import top_k
+from services.relevance import RelevanceIndex
+from services.search_planner import CatalogStatistics, QueryPlan, plan_query
+from utils.debug import INFO_PRINT
+
+# 搜尋結果快取的筆數上限與存活時間（秒）；資料版本更新時整組失效
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 60.0
+
+
+def _search_key(restaurant: Restaurant) -> str:
+    """關鍵字比對用的字串：店名、地址與所有菜單名稱（小寫，以換行分隔）"""
+    parts = [restaurant.name, restaurant.address]
+    parts.extend(item.name for item in restaurant.menu_items)
+    return "\n".join(parts).lower()
+
+
+@dataclass(frozen=True)
+class CatalogVersion:
+    """
+    某一版的餐廳資料與索引
+
+    發布後不再修改（tuple 與凍結的 Restaurant）；更新時建立新版本並整體替換，
+    查詢開始時取得的版本在整個查詢期間保持一致，多執行緒讀取不需要鎖。
+    """
+    version: int
+    restaurants: Tuple[Restaurant, ...]
+    geo_index: GeoGridIndex
+    search_keys: Tuple[str, ...]       # 與 restaurants 對應的關鍵字比對字串
+    positions: Dict[str, int]          # restaurant_id -> 在 restaurants 中的位置
+    stats: CatalogStatistics           # 查詢規劃用的統計
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        restaurants: Iterable[Restaurant],
+        geo_index: GeoGridIndex,
+        previous: Optional["CatalogVersion"] = None,
+    ) -> "CatalogVersion":
+        """建立新版本；提供 previous 時，沿用未變動餐廳（同一物件）的比對字串"""
+        restaurants = tuple(restaurants)
+        reusable = {}
+        if previous is not None:
+            reusable = {id(r): key for r, key in zip(previous.restaurants, previous.search_keys)}
+        search_keys = tuple(reusable.get(id(r)) or _search_key(r) for r in restaurants)
+        return cls(
+            version=version,
+            restaurants=restaurants,
+            geo_index=geo_index,
+            search_keys=search_keys,
+            positions={r.restaurant_id: i for i, r in enumerate(restaurants)},
+            stats=CatalogStatistics.build(restaurants, search_keys),
+        )
+
+    @cached_property
+    def fuzzy_index(self) -> FuzzyIndex:
+        """店名與菜名的模糊搜尋索引（key 為位置），第一次使用時建立"""
+        def entries():
+            for i, r in enumerate(self.restaurants):
+                yield i, r.name, 1.0
+                for item in r.menu_items:
+                    yield i, item.name, MENU_NAME_WEIGHT
+        return FuzzyIndex(entries())
+
+    @cached_property
+    def relevance_index(self) -> RelevanceIndex:
+        """關鍵字相關性（BM25F）索引（key 為位置），第一次使用時建立"""
+        return RelevanceIndex(
+            (i, (r.name, "\n".join(item.name for item in r.menu_items), r.address), r.average_rating)
+            for i, r in enumerate(self.restaurants)
+        )
 
 
 class SearchService:
@@ -13,80 +93,194 @@ class SearchService:
     def __init__(self):
         """初始化搜尋服務"""
         # 載入餐廳資料（從 CSV）
-        self._restaurants = SampleData.create_sample_restaurants()
+        restaurants = SampleData.create_sample_restaurants()
+        self._catalog = CatalogVersion.build(1, restaurants, self._build_geo_index(restaurants))
+        self._write_lock = threading.RLock()
+        self._watcher: Optional[DatasetWatcher] = None
+        self._loader: Optional[IncrementalDatasetLoader] = None
+        self._result_cache = ResultCache('search_results', RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+    
+    @property
+    def catalog(self) -> CatalogVersion:
+        """目前發布的資料版本"""
+        return self._catalog
+    
+    @property
+    def version(self) -> int:
+        """目前資料的版本號（每次更新加一）"""
+        return self._catalog.version
     
     def reload_data(self):
         """重新載入資料"""
-        SampleData.clear_cache()
-        self._restaurants = SampleData.create_sample_restaurants()
+        with self._write_lock:
+            SampleData.clear_cache()
+            restaurants = SampleData.create_sample_restaurants()
+            self._publish(restaurants, self._build_geo_index(restaurants))
+            if self._loader is not None:
+                self._loader.prime()
+    
+    def apply_changes(self, changes: DatasetChanges):
+        """
+        套用資料集的增量變動
+
+        只更新變動餐廳在地理索引中的位置，其餘沿用上一版，再發布新版本。
+        """
+        with self._write_lock:
+            current = self._catalog
+            moved = [
+                r for r in changes.restaurants
+                if r.restaurant_id in changes.changed and r.latitude is not None and r.longitude is not None
+            ]
+            geo_index = current.geo_index.updated(
+                upserts=((r.restaurant_id, r.latitude, r.longitude) for r in moved),
+                removals=changes.removed | (changes.changed - {r.restaurant_id for r in moved}),
+            )
+            SampleData._cached_restaurants = changes.restaurants
+            self._publish(changes.restaurants, geo_index)
+        INFO_PRINT(
+            "[OK] 餐廳資料已更新", version=self.version,
+            changed=len(changes.changed), removed=len(changes.removed),
+        )
+    
+    def _publish(self, restaurants: Iterable[Restaurant], geo_index: GeoGridIndex):
+        # 以單一參考替換，查詢端不需要鎖
+        current = self._catalog
+        self._catalog = CatalogVersion.build(current.version + 1, restaurants, geo_index, previous=current)
+    
+    def watch_dataset(self, interval: Optional[float] = None) -> DatasetWatcher:
+        """
+        開始監看 dataset/ 的 CSV，變更時自動增量更新
+
+        Args:
+            interval: 輪詢間隔（秒），預設為 DatasetWatcher 的設定
+        """
+        if self._watcher is not None:
+            return self._watcher
+        dataset_path = SampleData._get_dataset_path()
+        self._loader = IncrementalDatasetLoader(dataset_path)
+        self._loader.prime()
+        kwargs = {"interval": interval} if interval is not None else {}
+        self._watcher = DatasetWatcher(dataset_path, self._reload_changed, **kwargs).start()
+        return self._watcher
+    
+    def stop_watching(self):
+        """停止監看 dataset/"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
+    def _reload_changed(self):
+        with self._write_lock:
+            changes = self._loader.apply(self._catalog.restaurants)
+            if changes:
+                self.apply_changes(changes)
+    
+    @staticmethod
+    def _build_geo_index(restaurants: Iterable[Restaurant]) -> GeoGridIndex:
+        """以有經緯度的餐廳建立地理索引（key 為 restaurant_id）"""
+        return GeoGridIndex(
+            (r.restaurant_id, r.latitude, r.longitude)
+            for r in restaurants
+            if r.latitude is not None and r.longitude is not None
+        )
+    
+    def get_distance_km(self, restaurant: Restaurant, latitude: float, longitude: float) -> Optional[float]:
+        """餐廳與指定位置的距離（公里），餐廳沒有座標時返回 None"""
+        return self._catalog.geo_index.distance_to(restaurant.restaurant_id, latitude, longitude)
     
     def search_restaurants(self, criteria: FilterCriteria) -> List[Restaurant]:
         """
         根據條件搜尋餐廳
         
+        直接讀取目前發布的版本（不複製、不加鎖），依查詢計畫（見 services.search_planner）
+        先以索引取得候選，再依成本與選擇率排序的條件逐一篩選。
+        結果以正規化後的條件快取，資料版本更新時失效。
+        
         Args:
             criteria: 篩選條件
             
         Returns:
             符合條件的餐廳列表
         """
-        results = self._restaurants.copy()
+        catalog = self._catalog
+        criteria = criteria.normalized()
+        key = criteria.cache_key()
+        cached = self._result_cache.get(key, catalog.version)
+        if cached is not None:
+            return list(cached)
+        results = self._execute(catalog, criteria)[0]
+        self._result_cache.set(key, catalog.version, tuple(results))
+        return results
+    
+    def explain(self, criteria: FilterCriteria) -> Tuple[List[Restaurant], QueryPlan]:
+        """搜尋並返回執行過的查詢計畫（含各步驟的筆數與耗時），不使用結果快取"""
+        return self._execute(self._catalog, criteria.normalized())
+    
+    @staticmethod
+    def _execute(catalog: CatalogVersion, criteria: FilterCriteria) -> Tuple[List[Restaurant], QueryPlan]:
+        restaurants = catalog.restaurants
         
-        # 關鍵字搜尋
-        if criteria.keyword:
-            keyword_lower = criteria.keyword.lower()
-            results = [
-                r for r in results
-                if keyword_lower in r.name.lower() or
-                   keyword_lower in r.address.lower() or
-                   any(keyword_lower in item.name.lower() for item in r.menu_items)
-            ]
+        # 距離篩選（以地理索引取出半徑內的餐廳，依原本順序排列）
+        distances = {}
+        radius_positions = None
+        if criteria.has_location() and criteria.radius_km is not None:
+            distances = {
+                key: d for d, key in
+                catalog.geo_index.within_radius(criteria.latitude, criteria.longitude, criteria.radius_km)
+            }
+            positions = catalog.positions
+            radius_positions = sorted(positions[key] for key in distances)
         
-        # 類別篩選
-        if criteria.categories:
-            results = [
-                r for r in results
-                if r.food_type in criteria.categories
-            ]
+        # 模糊搜尋（店名與菜名容許錯字），分數供 similarity 排序使用
+        similarity = {}
+        fuzzy_positions = None
+        if criteria.fuzzy and criteria.keyword and is_fuzzy_query(criteria.keyword):
+            scores = catalog.fuzzy_index.search(criteria.keyword)
+            fuzzy_positions = sorted(scores)
+            similarity = {restaurants[i].restaurant_id: score for i, score in scores.items()}
         
-        # 素食篩選
-        if criteria.vegetarian:
-            results = [
-                r for r in results
-                if r.vegetarian_option in ['蛋奶素', '全素']
-            ]
+        plan = plan_query(
+            criteria, restaurants, catalog.search_keys, catalog.stats, radius_positions, fuzzy_positions
+        )
+        plan.catalog_version = catalog.version
+        matched = plan.execute()
+        results = [restaurants[i] for i in matched]
         
-        # 價格篩選（精確匹配 price_range）
-        if criteria.max_price is not None:
-            # max_price 對應 price_range: 200->1, 400->2, 600->3
-            if criteria.max_price <= 200:
-                target_range = 1
-            elif criteria.max_price <= 400:
-                target_range = 2
-            elif criteria.max_price <= 600:
-                target_range = 3
-            else:
-                target_range = None  # $$$$ 顯示所有
-            
-            if target_range is not None:
-                results = [
-                    r for r in results
-                    if r.price_range == target_range  # 精確匹配
-                ]
+        # 關鍵字相關性（只在依 relevance 排序時計算；有 limit 時只計算可能排進前 limit 筆的餐廳）
+        relevance = {}
+        if criteria.sort_by == 'relevance' and criteria.keyword and fuzzy_positions is None:
+            scores = catalog.relevance_index.rank(criteria.keyword, matched, criteria.limit)
+            relevance = {restaurants[i].restaurant_id: score for i, score in scores.items()}
         
-        # 評分篩選
-        if criteria.min_rating is not None:
-            results = [
-                r for r in results
-                if r.average_rating >= criteria.min_rating
-            ]
+        # 沒有半徑限制時，只為符合條件的餐廳計算距離
+        if criteria.has_location() and criteria.radius_km is None:
+            for r in results:
+                d = catalog.geo_index.distance_to(r.restaurant_id, criteria.latitude, criteria.longitude)
+                if d is not None:
+                    distances[r.restaurant_id] = d
         
-        # 排序
-        if criteria.sort_by == 'rating':
-            results.sort(key=lambda r: r.average_rating, reverse=True)
-        elif criteria.sort_by == 'price':
-            results.sort(key=lambda r: r.price_range)
-        # 'distance' 排序需要位置資訊，暫時不實作
-        
-        return results
+        # 排序（有 limit 時只取前 limit 筆，不做完整排序）
+        context = {'distances': distances, 'similarity': similarity, 'relevance': relevance}
+        return top_k(results, criteria.sort_by, criteria.limit, context), plan
+
+
+_instance: Optional[SearchService] = None
+_instance_lock = threading.Lock()
+
+
+def get_search_service() -> SearchService:
+    """取得程序共用的搜尋服務"""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = SearchService()
+    return _instance
+
 
+def start_dataset_watch_from_env() -> Optional[DatasetWatcher]:
+    """DATASET_WATCH=1 時開始監看 dataset/（每個 worker 程序各自呼叫）"""
+    if os.getenv("DATASET_WATCH", "").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    interval = os.getenv("DATASET_WATCH_INTERVAL")
+    return get_search_service().watch_dataset(float(interval) if interval else None)
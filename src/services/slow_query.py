@@ -0,0 +1,213 @@
+"""
+慢查詢紀錄
+超過門檻的查詢會記錄 SQL 形狀（參數已移除）、耗時、筆數與 EXPLAIN 結果，
+保存在固定大小的環狀緩衝區並寫入輪替的本機日誌檔
+
+多個 worker 時各程序寫入自己的檔案（slow_query.<pid>.log）並各自輪替，
+不會有多個程序同時輪替同一個檔案而遺失紀錄
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, default))
+    except ValueError:
+        return default
+
+
+# 慢查詢門檻（毫秒），設為 0 或負數則停用
+SLOW_QUERY_THRESHOLD_MS = _env_float("SLOW_QUERY_MS", 200.0)
+
+# 環狀緩衝區大小與統計的最大查詢形狀數
+SLOW_QUERY_BUFFER_SIZE = int(_env_float("SLOW_QUERY_BUFFER", 200))
+MAX_TRACKED_SHAPES = 500
+
+# 同一個查詢形狀在此秒數內只做一次 EXPLAIN
+EXPLAIN_INTERVAL_SECONDS = 60.0
+
+# 日誌檔（預設為專案根目錄的 logs/slow_query.log，實際檔名加上程序 ID），超過大小即輪替
+_DEFAULT_LOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "logs", "slow_query.log"
+)
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG", _DEFAULT_LOG_PATH)
+SLOW_QUERY_LOG_MAX_BYTES = 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+
+@lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """
+    取得查詢形狀
+
+    移除字串與數字常值、把 IN (?, ?, ...) 收斂為 IN (...)，並壓縮空白，
+    讓只差在參數的查詢歸為同一類。
+    """
+    shape = _STRING_LITERAL.sub("?", query)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class SlowQueryLog:
+    """慢查詢紀錄器"""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        buffer_size: int = SLOW_QUERY_BUFFER_SIZE,
+        log_path: Optional[str] = SLOW_QUERY_LOG_PATH,
+    ):
+        self.threshold_ms = threshold_ms
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._by_shape: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._log_path = log_path
+        self._logger: Optional[logging.Logger] = None
+        self._logger_pid: Optional[int] = None
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return self.threshold_ms > 0 and duration_ms >= self.threshold_ms
+
+    def record(
+        self,
+        query: str,
+        duration_ms: float,
+        rowcount: Optional[int],
+        explain: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+    ) -> None:
+        """
+        記錄一筆慢查詢
+
+        Args:
+            query: 原始 SQL（參數以 ? 佔位，不記錄參數值）
+            duration_ms: 耗時（毫秒）
+            rowcount: 返回或影響的筆數
+            explain: 以 EXPLAIN 語句取得執行計畫的函式（在原連線上執行）
+        """
+        shape = normalize_query(query)
+        now = time.time()
+
+        with self._lock:
+            stats = self._by_shape.get(shape)
+            need_explain = stats is None or now - stats["explained_at"] >= EXPLAIN_INTERVAL_SECONDS
+
+        plan = None
+        if explain is not None and need_explain and shape.upper().startswith(_EXPLAINABLE):
+            try:
+                plan = explain(f"EXPLAIN {query}")
+            except Exception as e:  # EXPLAIN 失敗不影響原查詢
+                plan = [{"error": str(e)}]
+
+        entry = {
+            "timestamp": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+            "shape": shape,
+            "duration_ms": round(duration_ms, 2),
+            "rows": rowcount,
+            "explain": plan,
+        }
+
+        with self._lock:
+            self._recent.append(entry)
+            stats = self._by_shape.get(shape)
+            if stats is None:
+                if len(self._by_shape) >= MAX_TRACKED_SHAPES:
+                    # 淘汰累計時間最少的形狀
+                    victim = min(self._by_shape, key=lambda s: self._by_shape[s]["total_ms"])
+                    del self._by_shape[victim]
+                stats = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": None,
+                         "explain": None, "explained_at": 0.0}
+                self._by_shape[shape] = stats
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["rows"] = rowcount
+            if plan is not None:
+                stats["explain"] = plan
+                stats["explained_at"] = now
+
+        self._write(entry)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """最近的慢查詢（新到舊）"""
+        with self._lock:
+            entries = list(self._recent)
+        return entries[::-1][:limit]
+
+    def top_offenders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """依累計時間排序的查詢形狀"""
+        with self._lock:
+            items = [(shape, dict(stats)) for shape, stats in self._by_shape.items()]
+        items.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+        return [
+            {
+                "shape": shape,
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 2),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "max_ms": round(stats["max_ms"], 2),
+                "last_rows": stats["rows"],
+                "explain": stats["explain"],
+            }
+            for shape, stats in items[:limit]
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._by_shape.clear()
+
+    def _process_log_path(self, pid: int) -> str:
+        """目前程序的日誌檔：在副檔名前加上程序 ID"""
+        root, ext = os.path.splitext(self._log_path)
+        return f"{root}.{pid}{ext or '.log'}"
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """寫入目前程序的輪替日誌檔（首次寫入時才建立檔案，fork 後改寫新程序自己的檔案）"""
+        if not self._log_path:
+            return
+        try:
+            pid = os.getpid()
+            if self._logger is None or self._logger_pid != pid:
+                path = self._process_log_path(pid)
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                logger = logging.getLogger("slow_query")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                # fork 前由 master 建立的 handler 指向 master 的檔案，換成這個程序的
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                logger.addHandler(RotatingFileHandler(
+                    path,
+                    maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                    backupCount=SLOW_QUERY_LOG_BACKUPS,
+                    encoding="utf-8",
+                ))
+                self._logger = logger
+                self._logger_pid = pid
+            self._logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+        except OSError:
+            # 無法寫檔時仍保留記憶體中的紀錄
+            self._log_path = None
+
+
+# 全域慢查詢紀錄器
+SLOW_QUERY_LOG = SlowQueryLog()
@@ -1,8 +1,27 @@
 from typing import Optional, Dict, Any
 from werkzeug.security import generate_password_hash, check_password_hash
-from services.db import execute_returning_id, fetch_one, execute
+from services.cache import UserScopedCache, invalidate_user
+from services.db import execute_returning_id, fetch_one, execute, DuplicateKeyError
+
+# 個人資料快取的存活秒數（其他 worker 寫入後最多延遲這段時間）
+PROFILE_CACHE_TTL = 300
+
+# 回傳給前端的個人資料欄位（不含 hashedPassword）
+PROFILE_COLUMNS = ('userID', 'username', 'mode', 'budget', 'targetCalories', 'targetProtein', 'targetFat', 'created_at')
+
+# update_profile 可修改的欄位：參數名稱 -> 資料表欄位
+PROFILE_UPDATABLE = {
+    'mode': 'mode',
+    'budget': 'budget',
+    'target_calories': 'targetCalories',
+    'target_protein': 'targetProtein',
+    'target_fat': 'targetFat',
+}
 
 class UserService:
+    # 每位使用者的個人資料，在個人資料或飲食記錄寫入時失效（invalidate_user）
+    _profile_cache = UserScopedCache('profile', max_entries_per_user=1, ttl_seconds=PROFILE_CACHE_TTL)
+
     def create_user(self, username: str, password: str, mode: str = 'NORMAL', 
                     budget: float = 0, target_calories: int = None, 
                     target_protein: float = None, target_fat: float = None) -> Optional[int]:
@@ -10,12 +29,6 @@ class UserService:
         註冊新使用者
         :return: 新使用者的 ID，如果使用者名稱已存在則拋出異常或返回 None
         """
-        # 檢查使用者名稱是否已存在
-        # Use ? for mariadb placeholder
-        existing_user = fetch_one("SELECT userID FROM users WHERE username = ?", (username,))
-        if existing_user:
-            raise ValueError("Username already exists")
-
         hashed_password = generate_password_hash(password)
         
         query = """
@@ -24,7 +37,11 @@ class UserService:
         """
         params = (username, hashed_password, mode, budget, target_calories, target_protein, target_fat)
         
-        user_id = execute_returning_id(query, params)
+        # 使用者名稱重複由 UNIQUE 限制判斷，不另外先查詢
+        try:
+            user_id = execute_returning_id(query, params)
+        except DuplicateKeyError:
+            raise ValueError("Username already exists") from None
         return user_id
 
     def verify_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
@@ -43,10 +60,33 @@ class UserService:
 
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
-        根據 ID 取得使用者資料
+        根據 ID 取得使用者資料（快取，返回的 dict 可自由修改）
         """
-        query = "SELECT * FROM users WHERE userID = ?"
-        user = fetch_one(query, (user_id,))
-        if user:
-            user.pop('hashedPassword', None)
-        return user
+        user = self._profile_cache.get(user_id, 'profile')
+        if user is None:
+            query = f"SELECT {', '.join(PROFILE_COLUMNS)} FROM users WHERE userID = ?"
+            user = fetch_one(query, (user_id,))
+            if not user:
+                return None
+            self._profile_cache.set(user_id, 'profile', user)
+        return dict(user)
+
+    def update_profile(self, user_id: int, **fields: Any) -> bool:
+        """
+        更新個人資料（模式、預算與營養目標）
+        :param fields: PROFILE_UPDATABLE 中的欄位，值為 None 表示清除目標
+        :return: 使用者存在時返回 True
+        """
+        unknown = set(fields) - set(PROFILE_UPDATABLE)
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return self.get_user_by_id(user_id) is not None
+
+        assignments = ', '.join(f"{PROFILE_UPDATABLE[name]} = ?" for name in fields)
+        query = f"UPDATE users SET {assignments} WHERE userID = ?"
+        updated = execute(query, (*fields.values(), user_id))
+        # 目標改變也會影響今日進度與推薦，該使用者的快取整組失效
+        invalidate_user(user_id)
+        # 值未改變時影響筆數為 0，需另外確認使用者是否存在
+        return updated > 0 or self.get_user_by_id(user_id) is not None
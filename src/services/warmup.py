@@ -0,0 +1,147 @@
+"""
+啟動預熱
+在開始接收請求前載入餐廳目錄、索引與模板，並確認資料庫可連線。
+
+正式環境（gunicorn --preload）在 master 程序預熱一次，fork 出的 worker
+透過 copy-on-write 共用這些唯讀資料；狀態供 /readyz 回報。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.debug import INFO_PRINT, WARN_PRINT
+
+# pending：尚未預熱（例如開發伺服器）、running：預熱中、ready：完成、skipped：已停用
+_state: Dict[str, Any] = {"state": "pending", "started_at": None, "duration_ms": None, "steps": []}
+_lock = threading.Lock()
+
+
+def _warm_csv_catalog(app) -> Optional[str]:
+    # 同時建立搜尋服務的地理索引、模糊搜尋與相關性索引
+    from services.search_service import get_search_service
+    catalog = get_search_service().catalog
+    catalog.fuzzy_index
+    catalog.relevance_index
+    return f"{len(catalog.restaurants)} restaurants"
+
+
+def _warm_database(app) -> Optional[str]:
+    # 目前每個查詢各自開關連線，沒有連線池可預先建立；
+    # 這裡先匯入驅動並確認可連線，連線不會留到 fork 之後
+    from services.db import driver_available, fetch_one
+    if not driver_available():
+        raise RuntimeError("尚未安裝 mariadb Python 驅動")
+    fetch_one("SELECT 1 AS ok")
+    return "reachable"
+
+
+def _warm_geo_index(app) -> Optional[str]:
+    from services.restaurant_service import RestaurantService
+    index = RestaurantService.get_geo_index()
+    if index is None:
+        raise RuntimeError("無法從資料庫載入餐廳座標")
+    return f"{len(index)} points"
+
+
+def _warm_autocomplete(app) -> Optional[str]:
+    from services.restaurant_service import RestaurantService
+    index = RestaurantService.get_autocomplete_index()
+    if index is None:
+        raise RuntimeError("無法從資料庫載入自動完成索引")
+    return f"{len(index)} entries"
+
+
+def _warm_menu_catalog(app) -> Optional[str]:
+    from services.menu_catalog import MenuCatalogService
+    catalog = MenuCatalogService.get_catalog()
+    if not len(catalog):
+        raise RuntimeError("菜單目錄為空或無法從資料庫載入")
+    # 預先建立熱量排序（cached_property），讓 worker 直接共用
+    catalog.calorie_order
+    catalog.sorted_calories
+    # 推薦與餐點規劃的服務在第一次呼叫時才匯入，預熱時先載入
+    import services.recommendation_service  # noqa: F401
+    import services.meal_planner  # noqa: F401
+    return f"{len(catalog)} items"
+
+
+def _warm_templates(app) -> Optional[str]:
+    names = app.jinja_env.list_templates(extensions=("html",))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return f"{len(names)} templates"
+
+
+# (名稱, 函式)，依序執行；單一步驟失敗只記錄，不中斷其他步驟
+WARMUP_STEPS: List = [
+    ("csv_catalog", _warm_csv_catalog),
+    ("database", _warm_database),
+    ("geo_index", _warm_geo_index),
+    ("autocomplete", _warm_autocomplete),
+    ("menu_catalog", _warm_menu_catalog),
+    ("templates", _warm_templates),
+]
+
+
+def register_warmup_step(name: str, func: Callable[[Any], Optional[str]]) -> None:
+    """註冊額外的預熱步驟，func(app) 返回簡短說明或拋出例外"""
+    WARMUP_STEPS.append((name, func))
+
+
+def warm_up(app) -> Dict[str, Any]:
+    """
+    執行所有預熱步驟
+
+    Args:
+        app: Flask 應用程式
+
+    Returns:
+        預熱狀態（同 get_status()）
+    """
+    with _lock:
+        _state.update(state="running", started_at=time.time(), duration_ms=None, steps=[])
+
+    started = time.perf_counter()
+    steps = []
+    with app.app_context():
+        for name, func in WARMUP_STEPS:
+            step_started = time.perf_counter()
+            try:
+                detail, ok = func(app), True
+            except Exception as e:
+                detail, ok = str(e), False
+            elapsed_ms = round((time.perf_counter() - step_started) * 1000, 2)
+            steps.append({"name": name, "ok": ok, "duration_ms": elapsed_ms, "detail": detail})
+            if ok:
+                INFO_PRINT(f"[OK] 預熱 {name}", detail=detail, ms=elapsed_ms)
+            else:
+                WARN_PRINT(f"[WARN] 預熱 {name} 失敗:", detail)
+
+    with _lock:
+        _state.update(
+            state="ready",
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            steps=steps,
+        )
+    return get_status()
+
+
+def mark_skipped() -> None:
+    """記錄已停用預熱（WARMUP=0）"""
+    with _lock:
+        _state.update(state="skipped")
+
+
+def get_status() -> Dict[str, Any]:
+    """
+    取得預熱狀態
+
+    ready 表示可以接收請求（只有預熱進行中為 False），
+    degraded 列出失敗的步驟（例如資料庫無法連線時）
+    """
+    with _lock:
+        status = dict(_state, steps=list(_state["steps"]))
+    status["ready"] = status["state"] != "running"
+    status["degraded"] = [step["name"] for step in status["steps"] if not step["ok"]]
+    return status
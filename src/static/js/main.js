@@ -750,7 +750,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 <img src="${store.heroImg || 'placeholder-store-1.jpg'}" alt="${store.name}">
                 <div class="store-info">
                     <p class="store-name">${store.name}</p>
-                    <span class="distance">${store.distance || '0.8 km'}</span>
+                    <span class="distance">${store.distance || ''}</span>
                 </div>
                 <div class="store-rating">
                     <span class="stars">${store.rating ? store.rating.split(' ')[0] : '★★★★☆'}</span>
@@ -782,7 +782,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         document.getElementById('detail-rating-stars').innerHTML = `<i class="fa-solid fa-star"></i> ${metaText}`;
         document.getElementById('detail-price-meta').textContent = store.priceMeta || '$';
-        document.getElementById('detail-distance').textContent = store.distance || '0.8 km';
+        document.getElementById('detail-distance').textContent = store.distance || '';
         document.getElementById('detail-address').textContent = store.address || '';
 
         const menuContainer = document.getElementById('detail-menu-cards');
@@ -841,7 +841,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 <img src="${store.heroImg || 'placeholder-store-1.jpg'}" alt="${store.name}">
                 <div class="store-info">
                     <p class="store-name">${store.name}</p>
-                    <span class="distance">${store.distance || '0.8 km'}</span>
+                    <span class="distance">${store.distance || ''}</span>
                 </div>
                 <div class="store-rating">
                     <span class="stars">${store.rating ? store.rating.split(' ')[0] : '★★★★☆'}</span>
@@ -939,6 +939,35 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
+    // 搜尋輸入框自動完成（停止輸入 150ms 後才查詢）
+    const suggestionList = document.getElementById('search-suggestions');
+    let suggestTimer = null;
+    if (searchInput && suggestionList) {
+        searchInput.addEventListener('input', () => {
+            clearTimeout(suggestTimer);
+            const prefix = searchInput.value.trim();
+            if (!prefix) {
+                suggestionList.innerHTML = '';
+                return;
+            }
+            suggestTimer = setTimeout(async () => {
+                try {
+                    const response = await fetch(`${API_BASE}/autocomplete?q=${encodeURIComponent(prefix)}`);
+                    const result = await response.json();
+                    if (!result.success || searchInput.value.trim() !== prefix) return;
+                    suggestionList.innerHTML = '';
+                    result.data.forEach(suggestion => {
+                        const option = document.createElement('option');
+                        option.value = suggestion.text;
+                        suggestionList.appendChild(option);
+                    });
+                } catch (error) {
+                    console.error('自動完成錯誤:', error);
+                }
+            }, 150);
+        });
+    }
+
     // 類別和價格篩選變更時重新載入
     categoryButtons.forEach(button => {
         button.addEventListener('click', () => {
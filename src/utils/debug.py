@@ -9,25 +9,76 @@
     WARN_PRINT("這是一個警告訊息")
     ERROR_PRINT("這是一個錯誤訊息")
 
+    # 參數分開傳入時，字串組合延後到背景執行緒才進行（停用時完全不組合；可變參數在呼叫當下先轉成字串）
+    DEBUG_PRINT("[DEBUG] 搜尋結果筆數:", len(results))
+
+    # 額外的關鍵字參數會成為結構化欄位
+    INFO_PRINT("[OK] 使用者登入", user=username)
+
+    # 高頻率的除錯訊息可以抽樣輸出（此例約 1% 會輸出）
+    DEBUG_PRINT("[DEBUG] 快取命中", key, sample=0.01)
+
+    # 附上例外堆疊
+    ERROR_PRINT("[ERROR] 登入時發生錯誤", exc_info=True)
+
 環境變數控制：
-    DEBUG_MODE=1     # 啟用除錯訊息輸出
-    VERBOSE_MODE=1   # 啟用詳細訊息輸出（包含 INFO）
+    DEBUG_MODE=1          # 啟用除錯訊息輸出
+    VERBOSE_MODE=1        # 啟用詳細訊息輸出（包含 INFO）
+    ERROR_OUTPUT=0        # 停用錯誤訊息輸出（預設啟用）
+    DEBUG_SAMPLE_RATE=0.1 # 除錯訊息的預設抽樣比例（預設 1，全部輸出）
+    LOG_FORMAT=json       # 以 JSON 一行一筆輸出（預設為純文字）
+
+輸出由背景的 QueueListener 執行緒負責，呼叫端只把紀錄放入佇列；
+各函式在模組載入時依設定決定實作，停用的等級直接綁定為空函式。
 """
 
+import atexit
+import json
+import logging
 import os
+import queue
+import random
 import sys
-from typing import Any
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # pragma: no cover
+    load_dotenv = None  # type: ignore
+
+# 設定在模組載入時讀取一次，先載入 ENV/.env 讓設定檔生效
+if load_dotenv is not None:
+    load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", "ENV", ".env"))
 
 
 def _get_env_bool(key: str, default: bool = False) -> bool:
     """從環境變數讀取布林值"""
-    value = os.getenv(key, "").lower()
+    value = os.getenv(key, "").strip().lower()
+    if not value:
+        return default
     return value in ("1", "true", "yes", "on", "enabled")
 
 
+def _get_env_float(key: str, default: float) -> float:
+    """從環境變數讀取浮點數"""
+    try:
+        return float(os.getenv(key, default))
+    except ValueError:
+        return default
+
+
 # 讀取環境變數設定
 _DEBUG_ENABLED = _get_env_bool("DEBUG_MODE", default=False)
 _VERBOSE_ENABLED = _get_env_bool("VERBOSE_MODE", default=False)
+_ERROR_ENABLED = _get_env_bool("ERROR_OUTPUT", default=True)
+_DEBUG_SAMPLE_RATE = min(max(_get_env_float("DEBUG_SAMPLE_RATE", 1.0), 0.0), 1.0)
+_JSON_FORMAT = os.getenv("LOG_FORMAT", "").strip().lower() == "json"
+
+# 控制用的關鍵字參數（其餘關鍵字參數視為結構化欄位）
+_PRINT_KWARGS = ("sep", "end", "file", "flush")
 
 
 def is_debug_enabled() -> bool:
@@ -40,40 +91,166 @@ def is_verbose_enabled() -> bool:
     return _VERBOSE_ENABLED
 
 
-def DEBUG_PRINT(*args: Any, **kwargs: Any) -> None:
-    """
-    條件輸出除錯訊息
-    只有在 DEBUG_MODE=1 時才會輸出
-    """
-    if _DEBUG_ENABLED:
-        print(*args, **kwargs, file=sys.stderr)
+# 內容不會再改變的型別，可安全地延後到背景執行緒才轉成字串
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), Decimal, date, time, timedelta)
 
 
-def INFO_PRINT(*args: Any, **kwargs: Any) -> None:
-    """
-    條件輸出資訊訊息
-    只有在 VERBOSE_MODE=1 或 DEBUG_MODE=1 時才會輸出
-    """
-    if _VERBOSE_ENABLED or _DEBUG_ENABLED:
-        print(*args, **kwargs)
+class _LazyMessage:
+    """延遲組合的訊息：與 print() 相同以 sep 串接參數，直到被格式化時才執行"""
 
+    __slots__ = ("args", "sep")
 
-def WARN_PRINT(*args: Any, **kwargs: Any) -> None:
-    """
-    條件輸出警告訊息
-    只有在 VERBOSE_MODE=1 或 DEBUG_MODE=1 時才會輸出
-    """
-    if _VERBOSE_ENABLED or _DEBUG_ENABLED:
-        print(*args, **kwargs, file=sys.stderr)
+    def __init__(self, args: tuple, sep: str):
+        self.args = args
+        self.sep = sep
+
+    def freeze(self) -> None:
+        """
+        把可變的參數（dict、list、物件等）先轉成字串
+
+        在放入佇列時呼叫，背景執行緒輸出的是呼叫當下的內容，
+        而不是呼叫端之後修改過的內容；不可變的參數仍延後組合
+        """
+        if not all(type(arg) in _IMMUTABLE_TYPES for arg in self.args):
+            self.args = tuple(arg if type(arg) in _IMMUTABLE_TYPES else str(arg) for arg in self.args)
+
+    def __str__(self) -> str:
+        return self.sep.join(str(arg) for arg in self.args)
+
+
+class _Formatter(logging.Formatter):
+    """純文字（與原本 print 輸出相同，結構化欄位附加在後）或 JSON 格式"""
 
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        fields = getattr(record, "fields", None) or {}
 
-def ERROR_PRINT(*args: Any, **kwargs: Any) -> None:
+        if _JSON_FORMAT:
+            payload = {
+                "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                "level": record.levelname,
+                "message": message,
+                **fields,
+            }
+            if record.exc_info:
+                payload["exception"] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class _InProcessQueueHandler(QueueHandler):
     """
-    條件輸出錯誤訊息
-    預設總是輸出（除非明確禁用）
-    可以通過環境變數 ERROR_OUTPUT=0 來禁用
+    同程序佇列用的 QueueHandler
+
+    預設的 prepare() 會在呼叫端執行緒格式化訊息（為了可序列化），
+    此處直接放入原始紀錄，讓格式化在背景執行緒進行；
+    只有可變的參數在呼叫端先轉成字串（見 _LazyMessage.freeze）。
     """
-    error_output = _get_env_bool("ERROR_OUTPUT", default=True)
-    if error_output:
-        print(*args, **kwargs, file=sys.stderr)
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, _LazyMessage):
+            record.msg.freeze()
+        return record
+
+
+def _build_logger():
+    # 與原本的 print 行為一致：INFO 輸出到 stdout，其他等級輸出到 stderr
+    formatter = _Formatter()
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(formatter)
+    stdout_handler.addFilter(lambda record: record.levelno == logging.INFO)
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setFormatter(formatter)
+    stderr_handler.addFilter(lambda record: record.levelno != logging.INFO)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stdout_handler, stderr_handler, respect_handler_level=False)
+    listener.start()
+
+    logger = logging.getLogger("app")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [_InProcessQueueHandler(log_queue)]
+    return logger, listener
+
+
+_logger, _listener = _build_logger()
+
+
+def _restart_listener_after_fork() -> None:
+    # fork 後子程序沒有背景執行緒（例如 gunicorn worker），換一個新佇列並重新啟動
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _logger.handlers[0].queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    # 程式結束前把佇列中剩餘的紀錄輸出完
+    _listener.stop()
+
+
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+atexit.register(_stop_listener)
+
+
+def _emit(level: int, args: tuple, kwargs: dict) -> None:
+    exc_info = kwargs.pop("exc_info", None)
+    sep = kwargs.pop("sep", " ")
+    for key in _PRINT_KWARGS:
+        kwargs.pop(key, None)
+    if exc_info is True:
+        exc_info = sys.exc_info()
+    record = _logger.makeRecord(
+        _logger.name, level, "", 0, _LazyMessage(args, sep), None, exc_info,
+        extra={"fields": kwargs} if kwargs else None,
+    )
+    _logger.handle(record)
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    """停用等級的輸出函式（不做任何事）"""
+
+
+def _debug_print(*args: Any, sample: Optional[float] = None, **kwargs: Any) -> None:
+    rate = _DEBUG_SAMPLE_RATE if sample is None else sample
+    if rate < 1.0 and random.random() >= rate:
+        return
+    _emit(logging.DEBUG, args, kwargs)
+
+
+def _info_print(*args: Any, **kwargs: Any) -> None:
+    _emit(logging.INFO, args, kwargs)
+
+
+def _warn_print(*args: Any, **kwargs: Any) -> None:
+    _emit(logging.WARNING, args, kwargs)
+
+
+def _error_print(*args: Any, **kwargs: Any) -> None:
+    _emit(logging.ERROR, args, kwargs)
+
+
+# 條件輸出除錯訊息，只有在 DEBUG_MODE=1 時才會輸出（支援 sample= 抽樣）
+DEBUG_PRINT = _debug_print if _DEBUG_ENABLED else _noop
+
+# 條件輸出資訊訊息，只有在 VERBOSE_MODE=1 或 DEBUG_MODE=1 時才會輸出
+INFO_PRINT = _info_print if (_VERBOSE_ENABLED or _DEBUG_ENABLED) else _noop
+
+# 條件輸出警告訊息，只有在 VERBOSE_MODE=1 或 DEBUG_MODE=1 時才會輸出
+WARN_PRINT = _warn_print if (_VERBOSE_ENABLED or _DEBUG_ENABLED) else _noop
+
+# 條件輸出錯誤訊息，預設總是輸出，可以通過環境變數 ERROR_OUTPUT=0 來禁用
+ERROR_PRINT = _error_print if _ERROR_ENABLED else _noop
+
+
+def flush_logs() -> None:
+    """等待背景執行緒輸出所有已排入的紀錄（測試或程式結束前使用）"""
+    _listener.stop()
+    _listener.start()
@@ -0,0 +1,20 @@
+"""
+WSGI 進入點（正式環境）
+載入 app 後先執行預熱，再交給 WSGI 伺服器接收請求
+
+使用方法（於專案根目錄）：
+    gunicorn -c src/gunicorn.conf.py
+
+環境變數：
+    WARMUP=0    # 停用預熱（預設啟用）
+"""
+
+import os
+
+from app import app
+from services.warmup import mark_skipped, warm_up
+
+if os.getenv("WARMUP", "1").strip().lower() in ("0", "false", "no", "off"):
+    mark_skipped()
+else:
+    warm_up(app)